@@ -0,0 +1,332 @@
+"""
+Council Benchmark - Offline Orchestration Benchmarks on a Fake LM.
+
+This script measures orchestration overhead and concurrency scaling of the
+council without an API key: every model is replaced by the deterministic
+fake_lm.FakeLM (via SOVEREIGN_FAKE_LM), so wall-clock differences between
+commits come from the orchestration code, not from the provider.
+
+Scenarios:
+    - router:      route_query() with the LLM router (pre-router disabled)
+    - department:  Department.forward() for the finance department
+    - pipeline:    the dashboard pipeline (router -> micro council ->
+                   openings -> rebuttals -> Sovereign) via
+                   batch_council.run_pipeline, without the UI
+    - round_table: king_base.run_round_table()
+
+Each scenario runs in its own subprocess (fresh imports, fresh executor,
+response cache off) in a scratch directory, once per --concurrency value
+(SOVEREIGN_MAX_LLM_CALLS). Per scenario it reports wall-clock per
+iteration, fake LM calls and injected failures per model, peak thread
+count and peak RSS.
+
+With --http the scenarios instead call a stand_in_server.py started in this
+process, so litellm, connection reuse, injected 429/5xx and retries are
+part of the measurement; calls and failures then come from the server.
+
+Output:
+    .benchmarks/<commit>.json, or --out. --compare prints the change in
+    mean wall-clock against an earlier result file.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --scenarios router department --concurrency 1 4 8 --time-scale 0.1
+    python benchmark.py --profile profile.json --compare .benchmarks/1a2b3c4.json
+    python benchmark.py --http --scenarios pipeline --concurrency 2 8
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+ROOT = pathlib.Path(__file__).resolve().parent
+DEMO_DIR = ROOT / "demo-cloud-version"
+
+DEEP_QUERY = "Should we pause the AWS migration to cut burn and protect runway given the budget risk?"
+QUERIES = [
+    "Should we pause the AWS migration to save cash?",
+    "What is our current monthly burn rate?",
+    "Is it worth hiring two senior engineers before the Q3 launch?",
+    "How do we reduce churn in the enterprise segment?",
+]
+
+
+# --- Scenarios (run in the child process) ---
+
+def _setup_router():
+    from router import route_query
+
+    def run(i):
+        route_query(QUERIES[i % len(QUERIES)], use_pre_router=False)
+    return run
+
+
+def _setup_department():
+    from micro_council import consult_finance
+
+    def run(i):
+        consult_finance(f"{QUERIES[i % len(QUERIES)]} (iteration {i})")
+    return run
+
+
+def _setup_pipeline():
+    from batch_council import DEFAULT_PERSONA, run_pipeline
+
+    def run(i):
+        record = {"id": f"bench-{i}", "query": DEEP_QUERY, "persona": DEFAULT_PERSONA}
+        run_pipeline(record, tempfile.mkdtemp(prefix="checkpoints-", dir="."))
+    return run
+
+
+def _setup_round_table():
+    from king_base import run_round_table
+
+    def run(i):
+        run_round_table(f"{QUERIES[i % len(QUERIES)]} (iteration {i})", rounds=2)
+    return run
+
+
+SCENARIOS = {
+    "router": _setup_router,
+    "department": _setup_department,
+    "pipeline": _setup_pipeline,
+    "round_table": _setup_round_table,
+}
+
+# Scenarios that queue their calls on llm_executor and so respond to --concurrency.
+EXECUTOR_SCENARIOS = {"router", "department", "pipeline"}
+
+
+class ThreadSampler:
+    """Background sampler of threading.active_count() (excluding itself)."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count() - 1)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def run_child(name, iterations, result_path):
+    """Set up and time one scenario in this process; write the metrics as JSON."""
+    sys.path[:0] = [str(DEMO_DIR), str(ROOT)]
+    from fake_lm import FakeLM
+
+    setup_start = time.perf_counter()
+    run = SCENARIOS[name]()
+    setup = time.perf_counter() - setup_start
+    rss_before = _peak_rss_mb()
+
+    FakeLM.reset_counters()
+    walls = []
+    with ThreadSampler() as threads:
+        for i in range(iterations):
+            start = time.perf_counter()
+            run(i)
+            walls.append(time.perf_counter() - start)
+
+    metrics = {
+        "setup_s": setup,
+        "wall_s": walls,
+        "wall_mean_s": sum(walls) / len(walls),
+        "wall_min_s": min(walls),
+        "calls": sum(FakeLM.calls.values()),
+        "calls_per_iteration": sum(FakeLM.calls.values()) / iterations,
+        "calls_by_model": dict(FakeLM.calls),
+        "failures": sum(FakeLM.failures.values()),
+        "peak_threads": threads.peak,
+        "rss_after_setup_mb": rss_before,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    if "llm_executor" in sys.modules:
+        metrics["executor"] = sys.modules["llm_executor"].get_executor().stats()
+
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(metrics, f)
+
+
+# --- Driver ---
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_scenario(name, iterations, profile, concurrency=None, verbose=False, api_base=None):
+    """
+    Run one scenario in a subprocess and return its metrics (or an error).
+
+    With ``api_base`` the scenario talks HTTP to a stand-in server instead
+    of using the in-process FakeLM.
+    """
+    env = dict(os.environ)
+    if api_base:
+        env.pop("SOVEREIGN_FAKE_LM", None)
+        env["SOVEREIGN_API_BASE"] = api_base
+        env.setdefault("OPENROUTER_API_KEY", "stand-in")
+    else:
+        env["SOVEREIGN_FAKE_LM"] = json.dumps(profile)
+    env["SOVEREIGN_LLM_CACHE"] = "off"
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(DEMO_DIR), str(ROOT), env.get("PYTHONPATH")]))
+    if concurrency:
+        env["SOVEREIGN_MAX_LLM_CALLS"] = str(concurrency)
+
+    with tempfile.TemporaryDirectory(prefix="council-bench-") as scratch:
+        result_path = os.path.join(scratch, "result.json")
+        command = [sys.executable, str(ROOT / "benchmark.py"), "--child", name,
+                   "--iterations", str(iterations), "--result", result_path]
+        output = None if verbose else subprocess.DEVNULL
+        proc = subprocess.run(command, cwd=scratch, env=env, stdout=output, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+        with open(result_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def _server_delta(before, after, iterations):
+    """Request counts per model between two stand-in /stats snapshots, as benchmark metrics."""
+    by_model = {}
+    for model, counts in after["models"].items():
+        previous = before["models"].get(model, {})
+        delta = {k: v - previous.get(k, 0) for k, v in counts.items() if k != "peak_in_flight"}
+        if delta.get("requests"):
+            by_model[model] = delta
+    requests = sum(d["requests"] for d in by_model.values())
+    return {
+        "calls": requests,
+        "calls_per_iteration": requests / iterations,
+        "calls_by_model": {model: d["requests"] for model, d in by_model.items()},
+        "failures": sum(v for d in by_model.values() for k, v in d.items() if k.startswith("error_") or k == "rate_limited"),
+        "server": {"connections": after["connections"] - before["connections"], "models": by_model},
+    }
+
+
+def compare(results, baseline_path):
+    """Print mean wall-clock deltas against an earlier result file."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n[BENCH] Compared with {baseline_path} ({baseline.get('commit') or 'unknown commit'})")
+    for key, metrics in results.items():
+        before = baseline["results"].get(key, {})
+        if "wall_mean_s" not in metrics or "wall_mean_s" not in before:
+            continue
+        delta = (metrics["wall_mean_s"] - before["wall_mean_s"]) / before["wall_mean_s"]
+        print(f"   {key:<18} {before['wall_mean_s']:.3f}s -> {metrics['wall_mean_s']:.3f}s ({delta:+.1%}) | "
+              f"calls {before['calls_per_iteration']:.0f} -> {metrics['calls_per_iteration']:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline council benchmarks on a deterministic fake LM.")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--iterations", type=int, default=3, help="Timed runs per scenario.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[None],
+                        help="SOVEREIGN_MAX_LLM_CALLS values to sweep (executor-driven scenarios).")
+    parser.add_argument("--profile", default="default", help="Fake LM profile: 'default', a JSON file or inline JSON.")
+    parser.add_argument("--time-scale", type=float, help="Multiply all fake latencies (e.g. 0.1 for quick runs).")
+    parser.add_argument("--out", help="Result file. Default: .benchmarks/<commit>.json")
+    parser.add_argument("--compare", help="Earlier result file to compare against.")
+    parser.add_argument("--http", action="store_true",
+                        help="Go through the real HTTP path against an in-process stand_in_server.py.")
+    parser.add_argument("--verbose", action="store_true", help="Show the scenarios' own output.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.iterations, args.result)
+        return
+
+    sys.path.insert(0, str(ROOT))
+    from fake_lm import load_profile
+
+    profile = load_profile(args.profile)
+    if args.time_scale is not None:
+        profile["time_scale"] = args.time_scale
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    report = {
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "iterations": args.iterations,
+        "backend": "http" if args.http else "fake_lm",
+        "profile": profile,
+        "results": {},
+    }
+
+    server = api_base = None
+    if args.http:
+        import stand_in_server
+        server = stand_in_server.make_server(port=0, profile=profile)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        api_base = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    print(f"\n[BENCH] {len(args.scenarios)} scenarios x {args.iterations} iterations "
+          f"(time scale {profile['time_scale']}, {report['backend']}, commit {commit or 'n/a'})")
+    for name in args.scenarios:
+        for concurrency in (args.concurrency if name in EXECUTOR_SCENARIOS else [None]):
+            key = name if concurrency is None else f"{name}@{concurrency}"
+            print(f"   [RUN] {key}...", end="", flush=True)
+            before = server.state.snapshot() if server else None
+            metrics = run_scenario(name, args.iterations, profile, concurrency, args.verbose, api_base)
+            if server and "error" not in metrics:
+                metrics.update(_server_delta(before, server.state.snapshot(), args.iterations))
+            report["results"][key] = metrics
+            if "error" in metrics:
+                print(f" [FAILED] {metrics['error']}")
+                continue
+            print(f" mean {metrics['wall_mean_s']:.3f}s | min {metrics['wall_min_s']:.3f}s | "
+                  f"{metrics['calls_per_iteration']:.0f} calls/iter | {metrics['failures']} failures | "
+                  f"peak {metrics['peak_threads']} threads | {metrics['peak_rss_mb'] or 0:.0f} MB")
+
+    if server:
+        server.shutdown()
+
+    out = pathlib.Path(args.out or ROOT / ".benchmarks" / f"{commit or 'results'}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[BENCH] Results written to {out}")
+
+    if args.compare:
+        compare(report["results"], args.compare)
+
+
+if __name__ == "__main__":
+    main()
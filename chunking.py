@@ -0,0 +1,91 @@
+"""
+Chunking - Document Tree to Chunks, Shared by Both Engines.
+
+demo-cloud-version/ingest.py (Chroma) and sovereign-engine/quantized_index.py
+(local index) read the same document trees. Both use this module, so a
+file gets the same department label and the same chunks in either engine.
+
+Layout:
+    <root>/<department>/.../*.md|*.txt
+    The top-level folder name becomes the chunk's department label
+    (aliases such as 'engineering' -> TECH are applied). Files directly
+    under <root> are labelled GENERAL.
+
+Chunks:
+    Paragraphs packed into at most ``max_chars`` characters; a longer
+    paragraph is split. Chunk ids are "<relative path>#<index>" and each
+    chunk's metadata carries department, source, path, chunk index and a
+    content hash.
+"""
+
+import hashlib
+import os
+import pathlib
+
+
+TEXT_EXTENSIONS = {".txt", ".md", ".markdown", ".rst", ".csv"}
+DEPARTMENT_ALIASES = {
+    "ENGINEERING": "TECH",
+    "INFRA": "TECH",
+    "INFRASTRUCTURE": "TECH",
+    "SECURITY": "TECH",
+    "MARKETING": "GROWTH",
+    "SALES": "GROWTH",
+    "PRODUCT": "GROWTH",
+    "FINANCES": "FINANCE",
+    "ACCOUNTING": "FINANCE",
+}
+
+
+def department_for(relpath):
+    """Department label for a file, taken from its top-level folder."""
+    parts = pathlib.PurePath(relpath).parts
+    if len(parts) < 2:
+        return "GENERAL"
+    label = parts[0].upper().replace("-", "_").replace(" ", "_")
+    return DEPARTMENT_ALIASES.get(label, label)
+
+
+def iter_files(root):
+    """Yield document paths under ``root`` in a stable order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if pathlib.Path(name).suffix.lower() in TEXT_EXTENSIONS:
+                yield pathlib.Path(dirpath) / name
+
+
+def chunk_text(text, max_chars=1000):
+    """Pack paragraphs into chunks of at most ``max_chars`` characters."""
+    current = ""
+    for paragraph in (p.strip() for p in text.split("\n\n")):
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            if current:
+                yield current
+                current = ""
+            yield paragraph[:max_chars]
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            yield current
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        yield current
+
+
+def iter_chunks(root, max_chars=1000):
+    """Stream (id, text, metadata) for every chunk of every document."""
+    for path in iter_files(root):
+        relpath = path.relative_to(root).as_posix()
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        for index, chunk in enumerate(chunk_text(text, max_chars)):
+            yield f"{relpath}#{index}", chunk, {
+                "department": department_for(relpath),
+                "source": path.stem,
+                "path": relpath,
+                "chunk": index,
+                "content_hash": hashlib.sha256(chunk.encode("utf-8")).hexdigest(),
+            }
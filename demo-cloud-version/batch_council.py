@@ -0,0 +1,333 @@
+"""
+Batch Council Runner - Resumable Overnight Processing of Strategic Queries.
+
+This module runs the full router -> micro council -> boardroom debate ->
+Sovereign pipeline over a JSONL file of queries, several queries at a
+time. Each query's phase outputs are checkpointed to disk as they
+complete, so a crash or a rate-limit stall resumes where it stopped.
+
+Input (one JSON object per line):
+    {"id": "q1", "query": "Should we pause the AWS migration?", "persona": "..."}
+    "id" and "persona" are optional.
+
+Output:
+    - One JSONL record per finished query, streamed as queries complete.
+    - Aggregate throughput and per-phase latency stats, printed and
+      written next to the output file as <output>.stats.json.
+    - Per-call trace spans as <output>.trace.json (Chrome trace / Perfetto)
+      and <output>.trace.jsonl.
+
+Usage:
+    python batch_council.py queries.jsonl --out results.jsonl --parallel 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pathlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import dspy
+
+import llm_cache
+import llm_executor
+import tracing
+from config import get_cfo_model, get_cmo_model, get_cto_model, BOSS_MODEL
+from llm_executor import bind_run
+from macro_council import DepartmentHead, Sovereign
+from micro_council import run_micro_council
+from retriever import RetrievalContext, embedding_cache, warmup
+from router import route_query
+
+
+DEFAULT_PERSONA = "Balance Stability, Budget, and Growth equally. Seek sustainable compromises."
+DEPT_NAMES = {"fin": "Finance", "gro": "Growth", "tec": "Tech"}
+PHASES = ("route", "fast_lane", "micro", "openings", "rebuttals", "verdict")
+
+
+def load_queries(path):
+    """
+    Read query records from JSONL, assigning a stable id where missing.
+
+    Records whose id was already seen (including a repeated query and
+    persona without an explicit id) are dropped, so each id runs once.
+    """
+    records, seen, duplicates = [], set(), 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record.setdefault("persona", DEFAULT_PERSONA)
+            if "id" not in record:
+                digest = hashlib.sha1(f"{record['query']}\n{record['persona']}".encode("utf-8"))
+                record["id"] = digest.hexdigest()[:12]
+            if record["id"] in seen:
+                duplicates += 1
+                continue
+            seen.add(record["id"])
+            records.append(record)
+    if duplicates:
+        print(f"   [BATCH] Skipped {duplicates} duplicate query id(s) in {path}")
+    return records
+
+
+def finished_ids(output_path):
+    """
+    Ids already written to ``output_path``.
+
+    A run killed mid-write can leave a truncated last line; it is cut off
+    (that query runs again) so new results are appended on a clean line.
+    """
+    if not os.path.exists(output_path):
+        return set()
+    finished, good_end, last = set(), 0, b""
+    with open(output_path, "rb") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    finished.add(json.loads(line)["id"])
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    if f.read().strip():
+                        raise ValueError(f"{output_path} has an unreadable line at byte {good_end}")
+                    print(f"   [BATCH] {output_path} ends in a truncated line (run interrupted); dropping it")
+                    with open(output_path, "r+b") as out:
+                        out.truncate(good_end)
+                    break
+            good_end += len(line)
+            last = line
+    if last and not last.endswith(b"\n"):
+        with open(output_path, "ab") as out:
+            out.write(b"\n")
+    return finished
+
+
+def checkpoint_name(record_id):
+    """
+    File name for a query id.
+
+    Ids made only of letters, digits, "_" and "-" are used as is. Any other
+    id (dots, slashes, "..") is slugified and suffixed with a hash of the
+    raw id, so it stays inside the checkpoint directory and distinct ids
+    never share a file.
+    """
+    record_id = str(record_id)
+    if re.fullmatch(r"[A-Za-z0-9_-]{1,100}", record_id):
+        return f"{record_id}.json"
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "_", record_id).strip("_")[:60]
+    digest = hashlib.sha1(record_id.encode("utf-8")).hexdigest()[:12]
+    return f"{slug}-{digest}.json" if slug else f"{digest}.json"
+
+
+class Checkpoint:
+    """Per-query phase outputs persisted to ``<dir>/<checkpoint_name(id)>``."""
+
+    def __init__(self, directory, record):
+        self.path = pathlib.Path(directory) / checkpoint_name(record["id"])
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        else:
+            self.state = {"id": record["id"], "query": record["query"], "persona": record["persona"], "phases": {}}
+
+    def done(self, phase):
+        return phase in self.state["phases"]
+
+    def get(self, phase):
+        return self.state["phases"][phase]["output"]
+
+    def save(self, phase, output, latency):
+        self.state["phases"][phase] = {"output": output, "latency": latency}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+def _answer_directly(query):
+    def execute():
+        with dspy.context(lm=BOSS_MODEL):
+            return dspy.Predict("query -> answer")(query=query).answer
+    return llm_cache.run("fast_lane", BOSS_MODEL, "query -> answer", {"query": query}, execute)
+
+
+def _run_micro(query):
+    retrieval = RetrievalContext()
+    outputs = {}
+    for role, result in run_micro_council(query, retrieval=retrieval):
+        if role in ("finance", "growth", "tech"):
+            outputs[role] = {"report": result.report, "timings": result.timings}
+        else:
+            outputs[role] = result
+    outputs["retrieval"] = retrieval.stats()
+    return outputs
+
+
+def _in_parallel(tasks):
+    """Run a dict of zero-arg callables concurrently under the current run id."""
+    with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+        futures = {key: pool.submit(bind_run(task)) for key, task in tasks.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+
+def run_pipeline(record, checkpoint_dir, on_phase=None):
+    """
+    Run (or resume) the full council pipeline for one query.
+
+    Args:
+        record: Query record with id, query and persona.
+        checkpoint_dir: Directory holding per-query checkpoints.
+        on_phase: Optional callback(phase, latency) for phases executed now.
+
+    Returns:
+        dict: The final checkpoint state, including every phase output.
+    """
+    query, persona = record["query"], record["persona"]
+    checkpoint = Checkpoint(checkpoint_dir, record)
+
+    def phase(name, compute):
+        if checkpoint.done(name):
+            return checkpoint.get(name)
+        start = time.perf_counter()
+        with tracing.scope(phase=name):
+            output = compute()
+        latency = time.perf_counter() - start
+        checkpoint.save(name, output, latency)
+        if on_phase:
+            on_phase(name, latency)
+        return output
+
+    routing = phase("route", lambda: dict(route_query(query).items()))
+    if routing["route"] == "FAST_LANE":
+        phase("fast_lane", lambda: _answer_directly(query))
+        return checkpoint.state
+
+    reports = phase("micro", lambda: _run_micro(query))
+
+    chiefs = {
+        "fin": DepartmentHead(f"Head of {DEPT_NAMES['fin']}", get_cfo_model()),
+        "gro": DepartmentHead(f"Head of {DEPT_NAMES['gro']}", get_cmo_model()),
+        "tec": DepartmentHead(f"Head of {DEPT_NAMES['tec']}", get_cto_model()),
+    }
+    dept_reports = {"fin": reports["finance"]["report"], "gro": reports["growth"]["report"], "tec": reports["tech"]["report"]}
+
+    args = phase("openings", lambda: _in_parallel({
+        key: (lambda key=key: chiefs[key].give_opening(dept_reports[key], query)) for key in chiefs
+    }))
+
+    def opponents(key):
+        return " | ".join(f"{DEPT_NAMES[other]}: {args[other]}" for other in chiefs if other != key)
+
+    rebuttals = phase("rebuttals", lambda: _in_parallel({
+        key: (lambda key=key: chiefs[key].give_rebuttal(args[key], opponents(key))) for key in chiefs
+    }))
+
+    def decide():
+        verdict = Sovereign().forward(query, persona=persona, args=args, rebuttals=rebuttals)
+        return {"internal_thought_process": verdict.internal_thought_process, "final_decision": verdict.final_decision}
+
+    phase("verdict", decide)
+    return checkpoint.state
+
+
+def _latency_stats(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": values[len(values) // 2],
+        "p95": values[min(len(values) - 1, int(0.95 * len(values)))],
+        "max": values[-1],
+    }
+
+
+def run_batch(input_path, output_path, checkpoint_dir=".council_checkpoints", parallel=4):
+    """
+    Run every query in ``input_path`` that is not yet in ``output_path``.
+
+    Returns:
+        dict: Aggregate stats (throughput, failures, per-phase latency).
+    """
+    records = load_queries(input_path)
+    pathlib.Path(checkpoint_dir).mkdir(parents=True, exist_ok=True)
+
+    finished = finished_ids(output_path)
+    pending = [r for r in records if r["id"] not in finished]
+
+    print(f"\n[BATCH] {len(records)} queries, {len(finished)} already done, {len(pending)} to run ({parallel} in parallel)")
+    if pending:
+        warmup()
+
+    lock = threading.Lock()
+    phase_latencies = {name: [] for name in PHASES}
+    failures = {}
+
+    def record_phase(name, latency):
+        with lock:
+            phase_latencies[name].append(latency)
+
+    def process(record):
+        with llm_executor.run_scope(f"batch-{record['id']}"):
+            return run_pipeline(record, checkpoint_dir, on_phase=record_phase)
+
+    start = time.perf_counter()
+    completed = 0
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=parallel) as pool:
+        futures = {pool.submit(process, record): record for record in pending}
+        for future in as_completed(futures):
+            record = futures[future]
+            try:
+                state = future.result()
+            except Exception as e:
+                failures[record["id"]] = str(e)
+                print(f"   [FAILED] {record['id']}: {e} (checkpoint kept, rerun to resume)")
+                continue
+            out.write(json.dumps(state, ensure_ascii=False) + "\n")
+            out.flush()
+            completed += 1
+            print(f"   [DONE {completed}/{len(pending)}] {record['id']} ({state['phases']['route']['output']['route']})")
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "queries_total": len(records),
+        "queries_completed": completed,
+        "queries_failed": len(failures),
+        "failures": failures,
+        "elapsed_s": elapsed,
+        "throughput_qpm": completed / elapsed * 60 if elapsed else 0.0,
+        "phase_latency_s": {name: _latency_stats(v) for name, v in phase_latencies.items() if v},
+        "executor": llm_executor.get_executor().stats(),
+        "embedding_cache": embedding_cache.stats(),
+    }
+    cache = llm_cache.get_cache()
+    if cache:
+        stats["cache"] = cache.stats()
+
+    with open(f"{output_path}.stats.json", "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+    tracing.tracer.write_chrome_trace(f"{output_path}.trace.json")
+    tracing.tracer.write_jsonl(f"{output_path}.trace.jsonl")
+
+    print(f"\n[BATCH] {completed} completed, {len(failures)} failed in {elapsed:.1f}s "
+          f"({stats['throughput_qpm']:.2f} queries/min)")
+    for name, s in stats["phase_latency_s"].items():
+        print(f"   {name:<10} n={s['count']:<4} mean {s['mean']:.1f}s | p50 {s['p50']:.1f}s | "
+              f"p95 {s['p95']:.1f}s | max {s['max']:.1f}s")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the full council over a JSONL file of queries.")
+    parser.add_argument("input", help="JSONL file with one {\"query\": ...} object per line.")
+    parser.add_argument("--out", default="council_results.jsonl", help="JSONL output, appended as queries finish.")
+    parser.add_argument("--checkpoints", default=".council_checkpoints", help="Directory for per-query checkpoints.")
+    parser.add_argument("--parallel", type=int, default=4, help="Queries processed concurrently.")
+    cli = parser.parse_args()
+
+    run_batch(cli.input, cli.out, checkpoint_dir=cli.checkpoints, parallel=cli.parallel)
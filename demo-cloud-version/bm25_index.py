@@ -0,0 +1,166 @@
+"""
+BM25 Index - In-Process Inverted Index for Exact-Token Retrieval.
+
+Strategic queries lean on exact tokens ("AWS", "SSO", "burn rate", "SLA")
+that embedding search can rank poorly. This module keeps a compact
+inverted index over the knowledge base and scores chunks with Okapi BM25.
+Phrases are covered by indexing adjacent-word bigrams next to unigrams.
+retriever.py fuses the BM25 ranking with the vector ranking.
+
+Storage:
+    - Postings: term -> (doc ids, term frequencies) as compact arrays,
+      doc ids ascending.
+    - Department postings: label -> ascending doc ids. Filtered queries
+      intersect each term's postings with the department postings
+      (multi-department scopes are merged once and cached).
+    - Only chunk ids are kept per doc; texts and metadata stay in the
+      retrieval backend, which retriever.py reads for lexical-only hits.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from collections import Counter, defaultdict
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9$%][a-z0-9$%.\-]*[a-z0-9%]|[a-z0-9$%]")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "for", "from", "has",
+    "have", "if", "in", "is", "it", "of", "on", "or", "our", "so", "that", "the",
+    "this", "to", "we", "was", "were", "what", "with", "should", "how", "can",
+    "s", "t",
+}
+
+
+def tokenize(text):
+    """Lowercased unigrams (stopwords removed) plus adjacent-word bigrams."""
+    words = [w for w in TOKEN_PATTERN.findall(text.lower()) if w not in STOPWORDS]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def intersect(left, right):
+    """Positions in ``left`` whose id also occurs in ``right`` (both ascending)."""
+    i = j = 0
+    out = []
+    while i < len(left) and j < len(right):
+        if left[i] == right[j]:
+            out.append(i)
+            i += 1
+            j += 1
+        elif left[i] < right[j]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an in-memory inverted index.
+
+    Attributes:
+        ids: Chunk ids by doc number.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids = []
+        self._lengths = array("I")
+        self._total_length = 0
+        self._postings = defaultdict(lambda: (array("I"), array("H")))
+        self._departments = defaultdict(lambda: array("I"))
+        self._scopes = {}
+
+    @classmethod
+    def from_records(cls, records, **params):
+        """Build from an iterable of (id, document, metadata) tuples."""
+        index = cls(**params)
+        for record in records:
+            index.add(*record)
+        return index
+
+    @classmethod
+    def from_collection(cls, collection, page_size=5_000, **params):
+        """Build from every chunk of a Chroma collection."""
+        index = cls(**params)
+        for offset in range(0, collection.count(), page_size):
+            page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            for record in zip(page["ids"], page["documents"], page["metadatas"]):
+                index.add(*record)
+        return index
+
+    def add(self, doc_id, document, metadata):
+        """Append one chunk. Doc numbers are assigned in insertion order."""
+        doc = len(self.ids)
+        self.ids.append(doc_id)
+
+        terms = Counter(tokenize(document))
+        self._lengths.append(sum(terms.values()))
+        self._total_length += self._lengths[-1]
+        for term, tf in terms.items():
+            docs, freqs = self._postings[term]
+            docs.append(doc)
+            freqs.append(min(tf, 65_535))
+        self._departments[metadata.get("department", "GENERAL")].append(doc)
+        self._scopes.clear()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _scope(self, departments):
+        """Ascending doc ids in ``departments``; merged once per label set."""
+        labels = tuple(sorted(set(departments)))
+        if len(labels) == 1:
+            return self._departments.get(labels[0], ())
+        if labels not in self._scopes:
+            self._scopes[labels] = array("I", heapq.merge(*(self._departments.get(label, ()) for label in labels)))
+        return self._scopes[labels]
+
+    def search(self, query, k, departments=None):
+        """
+        Top-k chunks by BM25 score.
+
+        Args:
+            query: Query text.
+            k: Number of results.
+            departments: Optional department labels to restrict to.
+
+        Returns:
+            list[tuple]: (doc number, score), best first.
+        """
+        n = len(self.ids)
+        if n == 0:
+            return []
+        avg_len = self._total_length / n
+
+        allowed = self._scope(departments) if departments is not None else None
+
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            if term not in self._postings:
+                continue
+            docs, freqs = self._postings[term]
+            positions = intersect(docs, allowed) if allowed is not None else range(len(docs))
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for p in positions:
+                doc, tf = docs[p], freqs[p]
+                norm = tf + self.k1 * (1 - self.b + self.b * self._lengths[doc] / avg_len)
+                scores[doc] += idf * tf * (self.k1 + 1) / norm
+
+        return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Fuse several ranked id lists with RRF.
+
+    Returns:
+        list: Ids ordered by fused score, best first.
+    """
+    fused = defaultdict(float)
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            fused[item] += 1.0 / (k + rank + 1)
+    return sorted(fused, key=lambda item: -fused[item])
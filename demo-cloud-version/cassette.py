@@ -0,0 +1,262 @@
+"""
+Cassette - Record/Replay of Council LLM Traffic.
+
+This module wraps every model built by config.create_model so that a full
+council run (router through Sovereign) can be recorded to a compact,
+gzip-compressed JSONL cassette and later replayed with no network. The
+response cache is bypassed while a cassette is active so every call is
+recorded or replayed.
+
+Cassette:
+    Header line, then one line per LM call: request key, model, phase and
+    department (from tracing.scope), start offset and duration, the
+    request messages and the response choices/usage, or the error raised.
+
+Replay:
+    - Calls are matched by request key (model + messages + call kwargs);
+      repeated identical requests are served in recorded order.
+    - speed "recorded" sleeps each call's recorded duration, "fast"
+      returns immediately.
+    - Phases listed in live_phases ("what-if" reruns) go to the real model.
+    - A request not on the cassette is handled per on_miss: "error"
+      (CassetteMiss), "live" (call the real model) or "nearest" (next
+      unused recording of the same model, phase and department, for
+      downstream phases whose prompts changed after a live phase).
+
+Usage:
+    SOVEREIGN_CASSETTE=run.cassette.gz SOVEREIGN_CASSETTE_MODE=record streamlit run dashboard.py
+    SOVEREIGN_CASSETTE=run.cassette.gz SOVEREIGN_CASSETTE_SPEED=fast python batch_council.py q.jsonl
+    SOVEREIGN_CASSETTE=run.cassette.gz SOVEREIGN_CASSETTE_LIVE=verdict SOVEREIGN_CASSETTE_ON_MISS=nearest ...
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from types import SimpleNamespace
+
+import dspy
+
+import config
+import tracing
+
+
+VERSION = 1
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+class CassetteMiss(KeyError):
+    """A replayed request that is not on the cassette."""
+
+
+class CassetteError(RuntimeError):
+    """Replay of an error that was raised while recording."""
+
+
+def request_key(model, messages, kwargs):
+    payload = json.dumps([model, messages, kwargs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _serialize(response):
+    choices = []
+    for choice in response.choices:
+        message = choice.message if hasattr(choice, "message") else None
+        choices.append({
+            "content": message.content if message is not None else choice["text"],
+            "finish_reason": getattr(choice, "finish_reason", None),
+        })
+    return {"model": getattr(response, "model", None), "choices": choices, "usage": dict(response.usage or {})}
+
+
+def _deserialize(data):
+    return SimpleNamespace(
+        model=data["model"],
+        choices=[
+            SimpleNamespace(message=SimpleNamespace(content=c["content"], tool_calls=None), finish_reason=c["finish_reason"])
+            for c in data["choices"]
+        ],
+        usage=data["usage"],
+    )
+
+
+class Cassette:
+    """
+    One cassette file, in record or replay mode.
+
+    Attributes:
+        path: Cassette file (gzip JSONL).
+        mode: "record" or "replay".
+        speed: "recorded" or "fast" (replay only).
+        live_phases: Phases that bypass the cassette during replay.
+        on_miss: "error", "live" or "nearest" (replay only).
+    """
+
+    def __init__(self, path, mode="replay", speed="recorded", live_phases=(), on_miss="error"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.live_phases = set(live_phases)
+        self.on_miss = on_miss
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._start = time.time()
+
+        if mode == "record":
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+            self._write({"cassette": VERSION, "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S")})
+            print(f"   [CASSETTE] Recording LLM traffic to {path}")
+        else:
+            self._file = None
+            self._by_key = defaultdict(deque)
+            self._by_slot = defaultdict(deque)
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if header.get("cassette") != VERSION:
+                    raise ValueError(f"{path} is not a version {VERSION} cassette")
+                try:
+                    for line in f:
+                        entry = json.loads(line)
+                        self._by_key[entry["key"]].append(entry)
+                        self._by_slot[(entry["model"], entry["phase"], entry["department"])].append(entry)
+                except (EOFError, json.JSONDecodeError):
+                    print(f"   [CASSETTE] {path} is truncated (recording interrupted); using the complete calls")
+            total = sum(len(q) for q in self._by_key.values())
+            print(f"   [CASSETTE] Replaying {total} recorded calls from {path} ({speed})")
+
+    def _write(self, record):
+        with self._lock:
+            self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+
+    def record(self, entry):
+        self._write(entry)
+        with self._lock:
+            self.counts["recorded"] += 1
+
+    def take(self, key, model, phase, department):
+        """Pop the recording for a request, or None on a miss."""
+        with self._lock:
+            entries = self._by_key.get(key)
+            slot = self._by_slot[(model, phase, department)]
+            if entries:
+                entry = entries.popleft()
+            elif self.on_miss == "nearest" and slot:
+                entry = slot[0]
+                self._by_key[entry["key"]].remove(entry)
+                self.counts["nearest"] += 1
+            else:
+                return None
+            self._by_slot[(entry["model"], entry["phase"], entry["department"])].remove(entry)
+            self.counts["replayed"] += 1
+            return entry
+
+    def count(self, event):
+        with self._lock:
+            self.counts[event] += 1
+
+    def stats(self):
+        with self._lock:
+            return {"mode": self.mode, "path": self.path, **self.counts}
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        counts = ", ".join(f"{v} {k}" for k, v in sorted(self.counts.items())) or "no calls"
+        print(f"   [CASSETTE] Closed {self.path}: {counts}")
+
+    def wrap(self, lm):
+        return CassetteLM(lm, self)
+
+
+class CassetteLM(dspy.BaseLM):
+    """dspy LM that records calls of, or replays calls for, a wrapped LM."""
+
+    def __init__(self, lm, cassette):
+        super().__init__(model=lm.model, model_type=getattr(lm, "model_type", "chat"), cache=False)
+        self.kwargs = lm.kwargs
+        self.inner = lm
+        self.cassette = cassette
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        messages = messages or [{"role": "user", "content": prompt}]
+        key = request_key(self.model, messages, kwargs)
+        phase, department = tracing.current_phase(), tracing.current_department()
+
+        if self.cassette.mode == "record":
+            return self._record(key, phase, department, messages, kwargs)
+
+        if phase in self.cassette.live_phases:
+            self.cassette.count("live")
+            return self.inner.forward(messages=messages, **kwargs)
+
+        entry = self.cassette.take(key, self.model, phase, department)
+        if entry is None:
+            if self.cassette.on_miss != "live":
+                raise CassetteMiss(f"{self.model} call in phase {phase!r} ({department}) is not on {self.cassette.path}")
+            self.cassette.count("live")
+            return self.inner.forward(messages=messages, **kwargs)
+
+        if self.cassette.speed == "recorded":
+            time.sleep(entry["duration"])
+        if "error" in entry:
+            raise CassetteError(entry["error"])
+        response = _deserialize(entry["response"])
+        if dspy.settings.usage_tracker:
+            dspy.settings.usage_tracker.add_usage(self.model, dict(response.usage))
+        return response
+
+    def _record(self, key, phase, department, messages, kwargs):
+        entry = {
+            "key": key,
+            "model": self.model,
+            "phase": phase,
+            "department": department,
+            "offset": time.time() - self.cassette._start,
+            "messages": messages,
+        }
+        start = time.perf_counter()
+        try:
+            response = self.inner.forward(messages=messages, **kwargs)
+        except Exception as e:
+            entry["duration"] = time.perf_counter() - start
+            entry["error"] = f"{type(e).__name__}: {e}"
+            self.cassette.record(entry)
+            raise
+        entry["duration"] = time.perf_counter() - start
+        entry["response"] = _serialize(response)
+        self.cassette.record(entry)
+        return response
+
+
+def get_cassette():
+    """Return the process-wide cassette, or None when SOVEREIGN_CASSETTE is unset."""
+    global _cassette
+    if not config.CASSETTE_PATH:
+        return None
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(
+                config.CASSETTE_PATH,
+                mode=config.CASSETTE_MODE,
+                speed=config.CASSETTE_SPEED,
+                live_phases=config.CASSETTE_LIVE_PHASES,
+                on_miss=config.CASSETTE_ON_MISS,
+            )
+            atexit.register(_cassette.close)
+        return _cassette
+
+
+def wrap(lm):
+    """Wrap ``lm`` with the process-wide cassette (no-op without one)."""
+    cassette = get_cassette()
+    return cassette.wrap(lm) if cassette else lm
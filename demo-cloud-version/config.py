@@ -1,6 +1,7 @@
 import dspy
 import os
 import pathlib
+import sys
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,12 +20,43 @@ if not api_key:
 
 os.environ["OPENAI_API_KEY"] = api_key if api_key else "MISSING_KEY"
 
+# Modules shared by both engines (fake_lm.py, lexical_router.py, ...) live
+# at the repository root.
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
+# OpenAI-compatible endpoint. Point it at stand_in_server.py (repository
+# root) to load-test the real HTTP path without network access.
+API_BASE = os.getenv("SOVEREIGN_API_BASE", "https://openrouter.ai/api/v1")
+
+# Offline runs: a deterministic fake LM (fake_lm.py at the repository root)
+# replaces every model. Value: "default", a profile JSON file or inline JSON.
+FAKE_LM_PROFILE = os.getenv("SOVEREIGN_FAKE_LM")
+
+# Record/replay of all LLM traffic (see cassette.py). Mode "record" or
+# "replay"; replay speed "recorded" or "fast"; comma-separated phases that
+# still call the live model; on a replay miss: "error", "live" or "nearest".
+CASSETTE_PATH = os.getenv("SOVEREIGN_CASSETTE")
+CASSETTE_MODE = os.getenv("SOVEREIGN_CASSETTE_MODE", "replay")
+CASSETTE_SPEED = os.getenv("SOVEREIGN_CASSETTE_SPEED", "recorded")
+CASSETTE_LIVE_PHASES = {p.strip() for p in os.getenv("SOVEREIGN_CASSETTE_LIVE", "").split(",") if p.strip()}
+CASSETTE_ON_MISS = os.getenv("SOVEREIGN_CASSETTE_ON_MISS", "error")
+
 def create_model(model_name):
-    return dspy.LM(
-        model="openai/" + model_name,
-        api_base="https://openrouter.ai/api/v1",
-        max_tokens=2000
-    )
+    if FAKE_LM_PROFILE:
+        from fake_lm import FakeLM
+        lm = FakeLM(model_name, FAKE_LM_PROFILE)
+    else:
+        lm = dspy.LM(
+            model="openai/" + model_name,
+            api_base=API_BASE,
+            max_tokens=2000
+        )
+    if CASSETTE_PATH:
+        import cassette
+        return cassette.wrap(lm)
+    return lm
 
 def get_worker_a(): return create_model("mistralai/mistral-7b-instruct:free")
 def get_worker_b(): return create_model("meta-llama/llama-3.2-3b-instruct:free")
@@ -43,4 +75,42 @@ BOSS_MODEL = create_model("meta-llama/llama-3.3-70b-instruct:free")
 def get_sovereign_model(): return BOSS_MODEL
 def get_finance_worker_1(): return TEAM_FINANCE[0]
 def get_growth_worker_1(): return TEAM_GROWTH[0]
-def get_tech_worker_1(): return TEAM_TECH[0]
\ No newline at end of file
+def get_tech_worker_1(): return TEAM_TECH[0]
+
+# Shared LLM executor limits (see llm_executor.py). `:free` models are
+# rate limited per key, so keep their concurrency low.
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("SOVEREIGN_MAX_LLM_CALLS", "8"))
+DEFAULT_MODEL_CONCURRENCY = 2
+MODEL_CONCURRENCY = {
+    "meta-llama/llama-3.3-70b-instruct:free": 3,
+    "nousresearch/hermes-3-llama-3.1-405b:free": 1,
+}
+
+# Persistent LLM response cache (see llm_cache.py). Only the roles listed
+# here are cached; leave the Sovereign out when it samples at temperature>0.
+# Bypassed while a cassette is active so that every call is recorded/replayed.
+LLM_CACHE_ENABLED = os.getenv("SOVEREIGN_LLM_CACHE", "on").lower() not in ("0", "off", "false") and not CASSETTE_PATH
+LLM_CACHE_PATH = os.getenv("SOVEREIGN_LLM_CACHE_PATH", ".llm_cache.sqlite3")
+LLM_CACHE_MAX_ENTRIES = 50_000
+LLM_CACHE_TTL = 7 * 24 * 3600
+LLM_CACHE_ROLES = {
+    "router", "fast_lane", "draft", "review", "boss",
+    "analyst", "advisor", "opening", "rebuttal",
+}
+
+# Persistent Chroma store built by ingest.py. Unset = in-memory demo data.
+KNOWLEDGE_BASE_PATH = os.getenv("SOVEREIGN_KB_PATH")
+
+# Retrieval backend: "chroma" (default) or "numpy" for the memory-mapped
+# VectorIndex built with `python vector_index.py build --out <path>`.
+RETRIEVER_BACKEND = os.getenv("SOVEREIGN_RETRIEVER", "chroma")
+VECTOR_INDEX_PATH = os.getenv("SOVEREIGN_VECTOR_INDEX", "vector_index")
+
+# Hybrid retrieval: fuse BM25 (bm25_index.py) with vector search. With
+# better top-k precision RAG_N_RESULTS can be lowered to shrink rag_context.
+RETRIEVER_HYBRID = os.getenv("SOVEREIGN_HYBRID", "on").lower() not in ("0", "off", "false")
+HYBRID_CANDIDATE_FACTOR = 4
+RAG_N_RESULTS = int(os.getenv("SOVEREIGN_RAG_N_RESULTS", "3"))
+
+# Query-text -> embedding LRU in retriever.py.
+EMBEDDING_CACHE_SIZE = int(os.getenv("SOVEREIGN_EMBEDDING_CACHE", "1024"))
@@ -1,12 +1,82 @@
+import json
+
+import altair as alt
 import streamlit as st
 import dspy
 from config import get_cfo_model, get_cmo_model, get_cto_model, BOSS_MODEL
-from micro_council import consult_finance, consult_growth, consult_tech, consult_data_analyst, consult_strategic_advisor
+from micro_council import run_micro_council
+from retriever import RetrievalContext, embedding_cache, warmup
 from macro_council import DepartmentHead, Sovereign
 from router import route_query
+import llm_cache
+import llm_executor
+import llm_stream
+import tracing
 
 st.set_page_config(page_title="Council of Kings", page_icon="👑", layout="wide")
 
+# Warm the retriever while the user is still typing the first query (once per process).
+warmup(background=True)
+
+
+def render_waterfall(run_id):
+    """Per-call latency waterfall, per-phase summary and trace downloads for one run."""
+    spans = tracing.tracer.spans(run_id)
+    if not spans:
+        st.caption("No traced calls in this run.")
+        return
+
+    origin = min(s.start for s in spans)
+    rows = [
+        {
+            "call": f"{s.kind} [{s.department}]" if s.department else s.kind,
+            "phase": s.phase or "-",
+            "model": s.model or "-",
+            "start": s.start - origin,
+            "end": (s.end or s.start) - origin,
+            "seconds": round(s.duration, 2),
+            "retries": s.retries,
+            "cached": s.cached,
+            "tokens": s.prompt_tokens + s.completion_tokens,
+        }
+        for s in sorted(spans, key=lambda s: s.start)
+    ]
+    for index, row in enumerate(rows):
+        row["call"] = f"{index + 1:02d} {row['call']}"
+
+    chart = alt.Chart(alt.Data(values=rows)).mark_bar().encode(
+        x=alt.X("start:Q", title="seconds since first call"),
+        x2="end:Q",
+        y=alt.Y("call:N", sort=None, title=None),
+        color=alt.Color("phase:N"),
+        tooltip=["call:N", "phase:N", "model:N", "seconds:Q", "retries:Q", "cached:N", "tokens:Q"],
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+    for column, by in zip(st.columns(2), ("phase", "model")):
+        column.dataframe([
+            {by: name, "calls": g["spans"], "seconds": round(g["seconds"], 2),
+             "prompt tokens": g["prompt_tokens"], "completion tokens": g["completion_tokens"]}
+            for name, g in tracing.tracer.summary(run_id, by=by).items()
+        ], hide_index=True)
+
+    col_json, col_jsonl = st.columns(2)
+    col_json.download_button(
+        "⬇️ Chrome trace (JSON)", json.dumps(tracing.tracer.chrome_trace(run_id)),
+        file_name=f"council_trace_{run_id}.json", mime="application/json",
+    )
+    col_jsonl.download_button(
+        "⬇️ Spans (JSONL)", tracing.tracer.jsonl(run_id),
+        file_name=f"council_trace_{run_id}.jsonl", mime="application/x-ndjson",
+    )
+
+
+def stream_caption(token_stream):
+    timings = token_stream.timings()
+    if timings["cached"]:
+        return f"⚡ cached · {timings['total']:.2f}s"
+    return f"⏱️ first token {timings['ttft']:.1f}s · total {timings['total']:.1f}s"
+
 st.markdown("""
 <style>
     .reportview-container { background: #0e1117; }
@@ -53,19 +123,29 @@ if st.button("🚀 CONVENE THE COUNCIL"):
     if not query:
         st.error("Please enter a query first.")
     else:
+        run_id = llm_executor.begin_run()
+
         st.subheader("🔍 Phase 0: Query Routing")
-        routing = route_query(query)
+        with tracing.scope(phase="route"):
+            routing = route_query(query)
 
         if routing.route == "FAST_LANE":
             st.info(f"**Routing Decision:** FAST_LANE (Complexity Score: {routing.score:.1f}/10)")
             st.caption(f"Reasoning: {routing.reasoning}")
 
-            with st.spinner("Processing simple query with direct response..."):
-                with dspy.context(lm=BOSS_MODEL):
-                    simple_response = dspy.Predict("query -> answer")(query=query).answer
-
             st.success("### 📜 RESPONSE")
-            st.markdown(f"#### {simple_response}")
+            response_slot = st.empty()
+            response_slot.caption("Processing simple query with direct response...")
+            with tracing.scope(phase="fast_lane"):
+                answer_stream = llm_stream.stream(
+                    "fast_lane", BOSS_MODEL, dspy.Predict("query -> answer"), {"query": query},
+                    ["answer"], lambda p: p.answer, signature="query -> answer",
+                )
+            for _, text in answer_stream:
+                response_slot.markdown(f"#### {text}")
+            simple_response = answer_stream.result()
+            response_slot.markdown(f"#### {simple_response}")
+            st.caption(stream_caption(answer_stream))
             st.info("💰 **Cost Saved:** Bypassed full council assembly (15+ API calls avoided)")
 
         else:
@@ -77,35 +157,59 @@ if st.button("🚀 CONVENE THE COUNCIL"):
             status_box = st.status("Activation Signal Sent... Waking up 15 Agents...", expanded=True)
 
             status_box.write("📊 Data Analyst: Extracting quantitative insights...")
-            data_analysis = consult_data_analyst(query)
-            st.info(f"**📊 Data Analyst Report:** {data_analysis}")
-
-            st.write("")
-            col1, col2, col3 = st.columns(3)
-
             status_box.write(f"💰 Consulting {dept_name_fin} Dept (3 Agents working)...")
-            rep_fin = consult_finance(query)
-            col1.success(f"✅ {dept_name_fin} Report Ready")
-            with col1.expander("📄 View Full Report"):
-                st.write(rep_fin)
-
             status_box.write(f"📈 Consulting {dept_name_gro} Dept (3 Agents working)...")
-            rep_gro = consult_growth(query)
-            col2.success(f"✅ {dept_name_gro} Report Ready")
-            with col2.expander("📄 View Full Report"):
-                st.write(rep_gro)
-
             status_box.write(f"💻 Consulting {dept_name_tec} Dept (3 Agents working)...")
-            rep_tec = consult_tech(query)
-            col3.success(f"✅ {dept_name_tec} Report Ready")
-            with col3.expander("📄 View Full Report"):
-                st.write(rep_tec)
 
-            status_box.write("🎯 Strategic Advisor: Performing meta-analysis...")
-            strategic_analysis = consult_strategic_advisor(query, rep_fin, rep_gro, rep_tec)
-            st.warning(f"**🎯 Strategic Advisor Meta-Analysis:** {strategic_analysis}")
+            analyst_slot = st.empty()
+            st.write("")
+            col1, col2, col3 = st.columns(3)
+            advisor_slot = st.empty()
+
+            dept_slots = {
+                "finance": (col1.empty(), dept_name_fin),
+                "growth": (col2.empty(), dept_name_gro),
+                "tech": (col3.empty(), dept_name_tec),
+            }
+            for slot, name in dept_slots.values():
+                slot.info(f"⏳ {name} Dept deliberating...")
+
+            retrieval = RetrievalContext()
+            reports = {}
+            with tracing.scope(phase="micro"):
+                for role, result in run_micro_council(query, retrieval=retrieval):
+                    reports[role] = result
+
+                    if role == "analyst":
+                        status_box.write("✅ Data Analyst finished")
+                        analyst_slot.info(f"**📊 Data Analyst Report:** {result}")
+                    elif role == "advisor":
+                        status_box.write("✅ Strategic Advisor finished")
+                        advisor_slot.warning(f"**🎯 Strategic Advisor Meta-Analysis:** {result}")
+                    else:
+                        slot, name = dept_slots[role]
+                        status_box.write(f"✅ {name} Dept finished")
+                        if len(reports.keys() & set(dept_slots)) == len(dept_slots):
+                            status_box.write("🎯 Strategic Advisor: Performing meta-analysis...")
+                        timings = result.timings
+                        with slot.container():
+                            st.success(f"✅ {name} Report Ready")
+                            st.caption(
+                                f"⏱️ {timings['total']:.1f}s total · retrieval {timings['retrieval']:.1f}s · "
+                                f"drafts+reviews {timings['review_stage']:.1f}s · head {timings['boss']:.1f}s"
+                            )
+                            with st.expander("📄 View Full Report"):
+                                st.write(result.report)
+
+            rep_fin, rep_gro, rep_tec = (reports[role].report for role in ("finance", "growth", "tech"))
 
             status_box.update(label="✅ Phase 1 Complete: All Intelligence Gathered (15 Agents)", state="complete", expanded=False)
+            retrieval_stats = retrieval.stats()
+            embed_stats = embedding_cache.stats()
+            st.caption(
+                f"🔎 Retrieval: {retrieval_stats['misses']} vector-store lookups, {retrieval_stats['hits']} reused from this run · "
+                f"query embeddings {embed_stats['hits']} cached / {embed_stats['misses']} computed ({embed_stats['hit_rate']:.0%})"
+            )
 
             st.write("---")
             st.subheader("🗣️ Phase 2: Boardroom Debate (The Chiefs Speak)")
@@ -115,55 +219,104 @@ if st.button("🚀 CONVENE THE COUNCIL"):
             cto = DepartmentHead(f"Head of {dept_name_tec}", get_cto_model())
 
             col_a, col_b, col_c = st.columns(3)
-
-            with col_a:
-                st.markdown(f"### 💰 {dept_name_fin}")
-                with st.spinner("Mistral Small formulating argument..."):
-                    arg_fin = cfo.give_opening(rep_fin, query)
-                st.info(arg_fin)
-
-            with col_b:
-                st.markdown(f"### 📈 {dept_name_gro}")
-                with st.spinner("Hermes 405B formulating argument..."):
-                    arg_gro = cmo.give_opening(rep_gro, query)
-                st.info(arg_gro)
-
-            with col_c:
-                st.markdown(f"### 💻 {dept_name_tec}")
-                with st.spinner("Llama 70B formulating argument..."):
-                    arg_tec = cto.give_opening(rep_tec, query)
-                st.info(arg_tec)
+            chiefs = {
+                "fin": (cfo, rep_fin, col_a, f"💰 {dept_name_fin}", "Mistral Small formulating argument..."),
+                "gro": (cmo, rep_gro, col_b, f"📈 {dept_name_gro}", "Hermes 405B formulating argument..."),
+                "tec": (cto, rep_tec, col_c, f"💻 {dept_name_tec}", "Llama 70B formulating argument..."),
+            }
+
+            # All three chiefs stream at once; tokens are painted as they arrive.
+            channel = llm_stream.StreamChannel()
+            opening_streams, opening_slots = {}, {}
+            for key, (head, report, column, title, waiting) in chiefs.items():
+                with column:
+                    st.markdown(f"### {title}")
+                    opening_slots[key] = (st.empty(), st.empty())
+                    opening_slots[key][0].caption(waiting)
+                with tracing.scope(phase="openings"):
+                    opening_streams[key] = head.give_opening(report, query, stream=True, channel=channel, key=key)
+
+            for key, _, text in channel.events():
+                opening_slots[key][0].info(text)
+
+            args = {key: s.result() for key, s in opening_streams.items()}
+            for key, s in opening_streams.items():
+                opening_slots[key][0].info(args[key])
+                opening_slots[key][1].caption(stream_caption(s))
+            arg_fin, arg_gro, arg_tec = args["fin"], args["gro"], args["tec"]
 
             st.write("---")
             st.subheader("⚔️ Phase 3: Cross-Examination (Rebuttals)")
 
-            with st.spinner("Chiefs are analyzing each other's arguments..."):
-                reb_fin = cfo.give_rebuttal(arg_fin, f"{dept_name_gro}: {arg_gro} | {dept_name_tec}: {arg_tec}")
-                reb_gro = cmo.give_rebuttal(arg_gro, f"{dept_name_fin}: {arg_fin} | {dept_name_tec}: {arg_tec}")
-                reb_tec = cto.give_rebuttal(arg_tec, f"{dept_name_fin}: {arg_fin} | {dept_name_gro}: {arg_gro}")
-
-            with st.chat_message("user", avatar="💰"):
-                st.write(f"**{dept_name_fin} Rebuttal:** {reb_fin}")
-            with st.chat_message("assistant", avatar="📈"):
-                st.write(f"**{dept_name_gro} Rebuttal:** {reb_gro}")
-            with st.chat_message("user", avatar="💻"):
-                st.write(f"**{dept_name_tec} Rebuttal:** {reb_tec}")
+            rebuttals = {
+                "fin": (cfo, arg_fin, f"{dept_name_gro}: {arg_gro} | {dept_name_tec}: {arg_tec}", "user", "💰", dept_name_fin),
+                "gro": (cmo, arg_gro, f"{dept_name_fin}: {arg_fin} | {dept_name_tec}: {arg_tec}", "assistant", "📈", dept_name_gro),
+                "tec": (cto, arg_tec, f"{dept_name_fin}: {arg_fin} | {dept_name_gro}: {arg_gro}", "user", "💻", dept_name_tec),
+            }
+
+            channel = llm_stream.StreamChannel()
+            rebuttal_streams, rebuttal_slots = {}, {}
+            for key, (head, own, opponents, speaker, avatar, name) in rebuttals.items():
+                with st.chat_message(speaker, avatar=avatar):
+                    rebuttal_slots[key] = (st.empty(), st.empty())
+                    rebuttal_slots[key][0].write(f"**{name} Rebuttal:** _analyzing the other chiefs' arguments..._")
+                with tracing.scope(phase="rebuttals"):
+                    rebuttal_streams[key] = head.give_rebuttal(own, opponents, stream=True, channel=channel, key=key)
+
+            for key, _, text in channel.events():
+                rebuttal_slots[key][0].write(f"**{rebuttals[key][5]} Rebuttal:** {text}")
+
+            rebs = {key: s.result() for key, s in rebuttal_streams.items()}
+            for key, s in rebuttal_streams.items():
+                rebuttal_slots[key][0].write(f"**{rebuttals[key][5]} Rebuttal:** {rebs[key]}")
+                rebuttal_slots[key][1].caption(stream_caption(s))
+            reb_fin, reb_gro, reb_tec = rebs["fin"], rebs["gro"], rebs["tec"]
 
             st.write("---")
             st.header("👑 Phase 4: The Sovereign Verdict")
 
             sov = Sovereign()
-            with st.spinner("The Sovereign is triangulating the optimal strategy..."):
-                verdict = sov.forward(
+            with tracing.scope(phase="verdict"):
+                verdict_stream = sov.forward(
                     query,
                     persona=selected_persona,
                     args={'fin': arg_fin, 'gro': arg_gro, 'tec': arg_tec},
-                    rebuttals={'fin': reb_fin, 'gro': reb_gro, 'tec': reb_tec}
+                    rebuttals={'fin': reb_fin, 'gro': reb_gro, 'tec': reb_tec},
+                    stream=True,
                 )
 
             with st.expander("🧠 Open Sovereign's Internal Monologue (Reasoning Process)", expanded=False):
                 st.markdown(f"**Strategic Lens:** {selected_persona}")
-                st.write(verdict.internal_thought_process)
+                thought_slot = st.empty()
 
             st.success("### 📜 OFFICIAL DECREE")
-            st.markdown(f"#### {verdict.final_decision}")
\ No newline at end of file
+            decree_slot = st.empty()
+            decree_slot.caption("The Sovereign is triangulating the optimal strategy...")
+
+            for field, text in verdict_stream:
+                if field == "internal_thought_process":
+                    thought_slot.write(text)
+                else:
+                    decree_slot.markdown(f"#### {text}")
+
+            verdict = verdict_stream.result()
+            thought_slot.write(verdict.internal_thought_process)
+            decree_slot.markdown(f"#### {verdict.final_decision}")
+            st.caption(stream_caption(verdict_stream))
+
+        executor_stats = llm_executor.get_executor().stats()
+        st.caption(
+            f"⚙️ LLM executor: {executor_stats['completed']} calls completed · "
+            f"queue depth {executor_stats['queue_depth']} · "
+            f"wait avg {executor_stats['wait_avg']:.2f}s / p95 {executor_stats['wait_p95']:.2f}s"
+        )
+        cache = llm_cache.get_cache()
+        if cache:
+            cache_stats = cache.stats()
+            st.caption(
+                f"🗄️ Response cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']:.0%}) · {cache_stats['entries']} entries"
+            )
+
+        with st.expander("📊 Latency waterfall", expanded=False):
+            render_waterfall(run_id)
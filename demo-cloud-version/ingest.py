@@ -0,0 +1,138 @@
+"""
+Knowledge Base Ingestion - Streaming Bulk Loader for Company Documents.
+
+This module loads a directory tree of internal documents into the
+persistent Chroma store used by retriever.py. Files are streamed, chunked
+and embedded/upserted in fixed-size batches, so memory stays flat no
+matter how large the corpus is.
+
+Layout:
+    <root>/<department>/.../*.md|*.txt, chunked by chunking.py (shared
+    with the sovereign engine). The top-level folder name becomes the
+    chunk's department label. Each label gets its own shard.
+
+Incremental:
+    Chunk ids are derived from the file path and chunk index, and each
+    chunk stores a content hash. Unchanged chunks are skipped without
+    being re-embedded. After the walk, chunks of files that are gone, or
+    past the end of files that now have fewer chunks, are deleted
+    (--keep-missing skips this, e.g. when ingesting a partial tree).
+
+Usage:
+    python ingest.py ./company_docs --kb ./knowledge_base
+"""
+
+import argparse
+import time
+
+import config
+from chunking import iter_chunks
+
+
+def _flush(store, embedding_function, batch, stats):
+    ids = [chunk_id for chunk_id, _, _ in batch]
+    existing = store.get(ids=ids, include=["metadatas"])
+    known = {i: m.get("content_hash") for i, m in zip(existing["ids"], existing["metadatas"])}
+
+    changed = [(i, text, meta) for i, text, meta in batch if known.get(i) != meta["content_hash"]]
+    stats["skipped"] += len(batch) - len(changed)
+    if not changed:
+        return
+
+    documents = [text for _, text, _ in changed]
+    store.upsert(
+        ids=[i for i, _, _ in changed],
+        documents=documents,
+        metadatas=[meta for _, _, meta in changed],
+        embeddings=embedding_function(documents),
+    )
+    stats["upserted"] += len(changed)
+
+
+def _prune(store, seen, stats, page_size=5_000):
+    """Delete ingested chunks whose file is gone or no longer has that chunk index."""
+    stale = []
+    for offset in range(0, store.count(), page_size):
+        page = store.get(include=["metadatas"], limit=page_size, offset=offset)
+        for chunk_id, meta in zip(page["ids"], page["metadatas"]):
+            path = meta.get("path")
+            if path is not None and meta.get("chunk", 0) >= seen.get(path, 0):
+                stale.append(chunk_id)
+
+    for start in range(0, len(stale), page_size):
+        store.delete(stale[start:start + page_size])
+    stats["deleted"] += len(stale)
+
+
+def ingest(root, store, embedding_function, batch_size=256, max_chars=1000, prune=True):
+    """
+    Stream every document under ``root`` into ``store``.
+
+    ``store`` is a retriever.ShardedStore: chunks land in the global
+    collection and in their department's shard, which is created the
+    first time a department label is seen.
+
+    With ``prune``, chunks left over from files that were deleted or
+    shortened since the last run are removed once the walk completes.
+
+    Returns:
+        dict: Counts of files, chunks, upserted, skipped and deleted
+        chunks, and rates.
+    """
+    stats = {"files": 0, "chunks": 0, "upserted": 0, "skipped": 0, "deleted": 0}
+    start = time.perf_counter()
+    seen = {}
+    batch = []
+
+    for chunk_id, text, meta in iter_chunks(root, max_chars):
+        if meta["path"] not in seen:
+            stats["files"] += 1
+        seen[meta["path"]] = meta["chunk"] + 1
+        stats["chunks"] += 1
+        batch.append((chunk_id, text, meta))
+
+        if len(batch) >= batch_size:
+            _flush(store, embedding_function, batch, stats)
+            batch = []
+            elapsed = time.perf_counter() - start
+            print(f"   [INGEST] {stats['files']} docs / {stats['chunks']} chunks "
+                  f"({stats['files'] / elapsed:.1f} docs/s, {stats['skipped']} unchanged)")
+
+    if batch:
+        _flush(store, embedding_function, batch, stats)
+    if prune:
+        _prune(store, seen, stats)
+
+    elapsed = time.perf_counter() - start
+    stats["elapsed_s"] = elapsed
+    stats["docs_per_s"] = stats["files"] / elapsed if elapsed else 0.0
+    stats["chunks_per_s"] = stats["chunks"] / elapsed if elapsed else 0.0
+    stats["shards"] = store.labels()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest a document tree into the company knowledge base.")
+    parser.add_argument("root", help="Directory whose top-level folders are departments.")
+    parser.add_argument("--kb", default=config.KNOWLEDGE_BASE_PATH, help="Persistent store path (default: $SOVEREIGN_KB_PATH).")
+    parser.add_argument("--batch-size", type=int, default=256, help="Chunks embedded and upserted per batch.")
+    parser.add_argument("--chunk-chars", type=int, default=1000, help="Maximum characters per chunk.")
+    parser.add_argument("--keep-missing", action="store_true",
+                        help="Keep chunks of files that are no longer under root.")
+    cli = parser.parse_args()
+
+    if not cli.kb:
+        parser.error("a persistent store is required: pass --kb or set SOVEREIGN_KB_PATH")
+
+    import retriever
+
+    print(f"\n--- INGESTING {cli.root} -> {cli.kb} ---")
+    stats = ingest(cli.root, retriever.open_store(cli.kb), retriever.embedding_function,
+                   batch_size=cli.batch_size, max_chars=cli.chunk_chars, prune=not cli.keep_missing)
+    print(f"\n   DOCS:       {stats['files']} ({stats['docs_per_s']:.1f} docs/s)")
+    print(f"   CHUNKS:     {stats['chunks']} ({stats['chunks_per_s']:.1f} chunks/s)")
+    print(f"   UPSERTED:   {stats['upserted']}")
+    print(f"   UNCHANGED:  {stats['skipped']}")
+    print(f"   DELETED:    {stats['deleted']}")
+    print(f"   SHARDS:     {', '.join(stats['shards'])}")
+    print(f"   ELAPSED:    {stats['elapsed_s']:.1f}s\n")
@@ -6,13 +6,24 @@ reports prior to macro-council deliberation. Useful for validating
 micro-agent output quality and inference latency.
 
 Output:
-    Formatted departmental reports with execution timing metrics.
+    Formatted departmental reports with execution timing metrics and a
+    per-stage timing breakdown for each department.
 """
 
 from micro_council import consult_finance, consult_growth, consult_tech
+import llm_cache
 import time
 
 
+def format_timings(timings):
+    """Render a department's per-stage timing breakdown on one line."""
+    drafts = ", ".join(f"{t:.1f}s" for t in timings["drafts"])
+    return (
+        f"Timing: total {timings['total']:.1f}s | retrieval {timings['retrieval']:.1f}s | "
+        f"drafts [{drafts}] | drafts+reviews {timings['review_stage']:.1f}s | head {timings['boss']:.1f}s"
+    )
+
+
 def generate_official_reports():
     """
     Execute full micro-council inference and display formatted reports.
@@ -47,20 +58,16 @@ def generate_official_reports():
     print(f"OFFICIAL DEPARTMENT REPORTS (Generated in {duration:.1f}s)")
     print("="*80)
 
-    print(f"\n[DEPARTMENT A: FINANCE]")
-    print("-" * 40)
-    print(report_finance)
-    print("-" * 40)
-
-    print(f"\n[DEPARTMENT B: GROWTH]")
-    print("-" * 40)
-    print(report_growth)
-    print("-" * 40)
-
-    print(f"\n[DEPARTMENT C: TECH]")
-    print("-" * 40)
-    print(report_tech)
-    print("-" * 40)
+    for label, dept in [("A: FINANCE", report_finance), ("B: GROWTH", report_growth), ("C: TECH", report_tech)]:
+        print(f"\n[DEPARTMENT {label}]")
+        print("-" * 40)
+        print(dept.report)
+        print("-" * 40)
+        print(format_timings(dept.timings))
+    cache = llm_cache.get_cache()
+    if cache:
+        stats = cache.stats()
+        print(f"\nResponse cache: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%})")
     print("\nReports ready for macro-council deliberation.")
 
 
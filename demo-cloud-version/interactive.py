@@ -7,13 +7,15 @@ with complexity scores and reasoning.
 
 Usage:
     python interactive.py
+    python interactive.py --batch queries.txt   (or --batch - for stdin)
     
 Commands:
     exit, quit: Terminate the console session.
 """
 
-import sys
-from router import route_query
+import argparse
+from router import route_query, route_queries
+from router_batch import run_batch
 
 
 def start_console():
@@ -54,5 +56,14 @@ def start_console():
             print(f"   ERROR: {e}\n")
 
 
+
 if __name__ == "__main__":
-    start_console()
+    parser = argparse.ArgumentParser(description="Sovereign router console.")
+    parser.add_argument("--batch", metavar="PATH", help="Route every line of PATH ('-' for stdin) and report throughput.")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent classifications in batch mode.")
+    cli = parser.parse_args()
+
+    if cli.batch:
+        run_batch(cli.batch, route_queries, max_workers=cli.workers)
+    else:
+        start_console()
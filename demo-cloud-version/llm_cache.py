@@ -0,0 +1,241 @@
+"""
+LLM Response Cache - Persistent Content-Addressed Store for Council Calls.
+
+Identical council calls (same model, same signature, same inputs) are
+served from a SQLite file instead of being recomputed. Re-running a query
+against an unchanged knowledge base therefore costs close to zero API
+calls and returns in milliseconds.
+
+Keying:
+    sha256 over the model id and its generation kwargs, the signature name,
+    instructions and field names, and the input field values.
+
+Policy:
+    - Per-role opt-in (config.LLM_CACHE_ROLES), so e.g. a temperature>0
+      Sovereign can stay live while drafts and reviews are cached.
+    - TTL expiry on read.
+    - LRU eviction once the store exceeds its entry bound.
+
+Cache hits never enter the llm_executor queue. Every call, hit or miss,
+is recorded as a tracing span.
+"""
+
+import hashlib
+import json
+import pathlib
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+import dspy
+
+import config
+import llm_executor
+import tracing
+
+
+_MISS = object()
+
+
+def _signature_of(obj):
+    """Accept a Signature class, a predictor, or a string signature."""
+    return getattr(obj, "signature", obj)
+
+
+def _encode(value):
+    if isinstance(value, dspy.Prediction):
+        return {"__prediction__": value.toDict()}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict) and "__prediction__" in value:
+        return dspy.Prediction(**value["__prediction__"])
+    return value
+
+
+class LLMCache:
+    """
+    SQLite-backed response cache with TTL and LRU eviction.
+
+    Attributes:
+        path: Location of the SQLite file.
+        roles: Roles whose calls are cached; all others bypass the cache.
+        max_entries: Entry bound that triggers LRU eviction.
+        ttl: Seconds after which an entry is treated as a miss.
+    """
+
+    def __init__(self, path, roles, max_entries=50_000, ttl=7 * 24 * 3600):
+        self.path = str(path)
+        self.roles = set(roles)
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, role TEXT, model TEXT, payload TEXT,"
+            " created REAL, accessed REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.commit()
+
+    def key(self, role, lm, signature, inputs):
+        """Content address for a call, or None if ``role`` is not cached."""
+        if role not in self.roles:
+            return None
+
+        signature = _signature_of(signature)
+        if isinstance(signature, str):
+            sig_name, instructions, fields = signature, "", []
+        else:
+            sig_name = signature.__name__
+            instructions = signature.instructions
+            fields = list(signature.fields)
+
+        material = json.dumps({
+            "model": llm_executor.model_key(lm),
+            "lm_kwargs": getattr(lm, "kwargs", {}),
+            "signature": sig_name,
+            "instructions": instructions,
+            "fields": fields,
+            "inputs": inputs,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Cached value for ``key``, or the module-level miss sentinel."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return _MISS
+
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return _decode(json.loads(row[0]))
+
+    def put(self, key, role, lm, value):
+        now = time.time()
+        payload = json.dumps(_encode(value), default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, role, llm_executor.model_key(lm), payload, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries beyond the bound. Caller holds the lock."""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            # Evict a little extra so we don't pay this on every insert.
+            excess += self.max_entries // 20
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)", (excess,)
+            )
+            self.evictions += cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide cache, or None when caching is disabled."""
+    global _cache
+    if not config.LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            path = pathlib.Path(config.LLM_CACHE_PATH)
+            if not path.is_absolute():
+                path = pathlib.Path(__file__).parent / path
+            _cache = LLMCache(
+                path,
+                roles=config.LLM_CACHE_ROLES,
+                max_entries=config.LLM_CACHE_MAX_ENTRIES,
+                ttl=config.LLM_CACHE_TTL,
+            )
+        return _cache
+
+
+def submit(role, lm, signature, inputs, func, *args, retry=None, **kwargs):
+    """
+    Cache-aware llm_executor.submit.
+
+    Args:
+        role: Council role of the call (e.g. "draft", "review", "sovereign").
+        lm: Model the call runs against.
+        signature: Signature class, predictor or string signature of the call.
+        inputs: Input field values sent to the model.
+        func: Job performing the live call; its return value is what gets cached.
+        retry: Optional llm_executor.Backoff. Failed attempts are queued
+            again (llm_executor.submit_with_retry) instead of sleeping
+            inside the job.
+
+    Returns:
+        concurrent.futures.Future: Already resolved on a cache hit.
+    """
+    cache = get_cache()
+    key = cache.key(role, lm, signature, inputs) if cache else None
+    trace_context = tracing.capture()
+
+    if key is not None:
+        value = cache.get(key)
+        if value is not _MISS:
+            tracing.record_cache_hit(role, lm, trace_context)
+            future = Future()
+            future.set_result(value)
+            return future
+
+    def call():
+        value = func(*args, **kwargs)
+        if key is not None:
+            cache.put(key, role, lm, value)
+        return value
+
+    if retry is None:
+        return llm_executor.submit(lm, tracing.traced(role, lm, trace_context, call))
+    return llm_executor.submit_with_retry(
+        lm, lambda attempt: tracing.traced(role, lm, trace_context, call, retries=attempt), retry,
+    )
+
+
+def run(role, lm, signature, inputs, func, *args, retry=None, **kwargs):
+    """Blocking variant of submit()."""
+    return submit(role, lm, signature, inputs, func, *args, retry=retry, **kwargs).result()
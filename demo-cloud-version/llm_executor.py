@@ -0,0 +1,293 @@
+"""
+LLM Executor - Process-wide Bounded Scheduler for Model Calls.
+
+Every dspy.Predict call in the council goes through a single long-lived
+executor instead of ad-hoc thread pools. The executor enforces a global
+cap on in-flight calls plus a per-model cap, so running departments
+concurrently (or serving several dashboard users) cannot fan out into an
+unbounded number of OpenRouter requests and trip 429s on `:free` models.
+
+Scheduling:
+    - Jobs are queued per run (a dashboard click, a batch query, ...).
+    - Workers pick jobs round-robin across runs, skipping any job whose
+      model is already at its concurrency cap, so one large run cannot
+      starve the others.
+    - Queue depth, in-flight counts and queue wait times are exposed via
+      LLMExecutor.stats().
+
+Retries:
+    submit_with_retry() queues each attempt as its own job and waits out
+    the backoff on a timer, so a failing call does not hold a global or
+    per-model slot while it sleeps.
+
+Run identity is carried in a context variable. Use run_scope() (or
+begin_run() for script-style callers) to tag calls, and bind_run() when
+handing work to another thread.
+"""
+
+import contextvars
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import config
+
+
+_current_run = contextvars.ContextVar("llm_run", default="default")
+
+
+def current_run():
+    """Return the run id that LLM calls from this context are queued under."""
+    return _current_run.get()
+
+
+@contextmanager
+def run_scope(run_id=None):
+    """Queue every LLM call made inside the block under ``run_id``."""
+    token = _current_run.set(run_id or uuid.uuid4().hex[:8])
+    try:
+        yield _current_run.get()
+    finally:
+        _current_run.reset(token)
+
+
+def begin_run(run_id=None):
+    """
+    Tag the current context with a run id without a ``with`` block.
+
+    Intended for script-style callers such as the Streamlit dashboard,
+    whose script thread ends together with the run.
+    """
+    run_id = run_id or uuid.uuid4().hex[:8]
+    _current_run.set(run_id)
+    return run_id
+
+
+def bind_run(func):
+    """
+    Wrap ``func`` so it runs under the caller's context in another thread.
+
+    The whole contextvars context is carried over: the run id, and the
+    trace phase/department set with tracing.scope().
+    """
+    context = contextvars.copy_context()
+
+    def bound(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return bound
+
+
+def model_key(lm):
+    """Identifier used to apply per-model concurrency limits."""
+    return getattr(lm, "model", None) or repr(lm)
+
+
+class _Job:
+    __slots__ = ("func", "args", "kwargs", "model", "run_id", "future", "enqueued")
+
+    def __init__(self, func, args, kwargs, model, run_id):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.model = model
+        self.run_id = run_id
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class LLMExecutor:
+    """
+    Bounded, fair executor for blocking LLM calls.
+
+    Attributes:
+        max_concurrency: Global cap on in-flight calls (one worker thread each).
+        model_limits: Mapping of model id to its concurrency cap.
+        default_model_limit: Cap for models not listed in ``model_limits``.
+    """
+
+    def __init__(self, max_concurrency=8, model_limits=None, default_model_limit=2, wait_window=1000):
+        self.max_concurrency = max_concurrency
+        self.model_limits = dict(model_limits or {})
+        self.default_model_limit = default_model_limit
+
+        self._cond = threading.Condition()
+        self._runs = OrderedDict()
+        self._inflight = Counter()
+        self._waits = deque(maxlen=wait_window)
+        self._completed = 0
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"llm-executor-{i}", daemon=True)
+            for i in range(max_concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def limit_for(self, model):
+        """Concurrency cap for ``model``, matching with or without the provider prefix."""
+        if model in self.model_limits:
+            return self.model_limits[model]
+        return self.model_limits.get(model.split("/", 1)[-1], self.default_model_limit)
+
+    def submit(self, lm, func, *args, **kwargs):
+        """
+        Queue ``func(*args, **kwargs)`` as a call against ``lm``.
+
+        Returns:
+            concurrent.futures.Future: Resolves with the call's result.
+        """
+        job = _Job(func, args, kwargs, model_key(lm), current_run())
+        with self._cond:
+            self._runs.setdefault(job.run_id, deque()).append(job)
+            self._cond.notify()
+        return job.future
+
+    def run(self, lm, func, *args, **kwargs):
+        """Blocking variant of submit()."""
+        return self.submit(lm, func, *args, **kwargs).result()
+
+    def stats(self):
+        """
+        Snapshot of scheduler state.
+
+        Returns:
+            dict: ``queue_depth`` (total and per run/model), ``in_flight``
+            (total and per model), ``completed`` and queue wait statistics
+            in seconds over the most recent calls.
+        """
+        with self._cond:
+            queued = [job for jobs in self._runs.values() for job in jobs]
+            waits = sorted(self._waits)
+            return {
+                "queue_depth": len(queued),
+                "queued_by_run": dict(Counter(job.run_id for job in queued)),
+                "queued_by_model": dict(Counter(job.model for job in queued)),
+                "in_flight": sum(self._inflight.values()),
+                "in_flight_by_model": {m: n for m, n in self._inflight.items() if n},
+                "completed": self._completed,
+                "wait_avg": sum(waits) / len(waits) if waits else 0.0,
+                "wait_p95": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                "wait_max": waits[-1] if waits else 0.0,
+            }
+
+    def _next_job(self):
+        """Pop the next runnable job, round-robin across runs. Caller holds the lock."""
+        for run_id, jobs in self._runs.items():
+            for job in jobs:
+                if self._inflight[job.model] < self.limit_for(job.model):
+                    jobs.remove(job)
+                    if jobs:
+                        self._runs.move_to_end(run_id)
+                    else:
+                        del self._runs[run_id]
+                    return job
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+                self._inflight[job.model] += 1
+                self._waits.append(time.perf_counter() - job.enqueued)
+
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(job.func(*job.args, **job.kwargs))
+                except BaseException as e:
+                    job.future.set_exception(e)
+
+            with self._cond:
+                self._inflight[job.model] -= 1
+                self._completed += 1
+                self._cond.notify_all()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide executor, creating it from config on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = LLMExecutor(
+                max_concurrency=config.MAX_CONCURRENT_LLM_CALLS,
+                model_limits=config.MODEL_CONCURRENCY,
+                default_model_limit=config.DEFAULT_MODEL_CONCURRENCY,
+            )
+        return _executor
+
+
+def submit(lm, func, *args, **kwargs):
+    """Queue an LLM call on the shared executor. See LLMExecutor.submit."""
+    return get_executor().submit(lm, func, *args, **kwargs)
+
+
+def run(lm, func, *args, **kwargs):
+    """Run an LLM call on the shared executor and wait for its result."""
+    return get_executor().run(lm, func, *args, **kwargs)
+
+
+class Backoff:
+    """
+    Retry policy for submit_with_retry().
+
+    Attributes:
+        max_retries: Attempts before giving up.
+        base_delay: Seconds before the first retry; doubles on each retry.
+        verbose: Print a marker on each retry.
+    """
+
+    def __init__(self, max_retries=3, base_delay=1.0, verbose=True):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.verbose = verbose
+
+    def delay(self, attempt):
+        return self.base_delay * (2 ** attempt)
+
+
+def submit_with_retry(lm, make_job, policy):
+    """
+    Queue an LLM call on the shared executor, retrying failures.
+
+    Every attempt is a separate job built by ``make_job(attempt)``. Between
+    attempts the call is off the executor: the backoff runs on a timer
+    thread, and the retry is queued again under the caller's run.
+
+    Returns:
+        concurrent.futures.Future: Result of the first successful attempt,
+        or an Exception naming the last error after ``policy.max_retries``
+        failures.
+    """
+    outer = Future()
+    context = contextvars.copy_context()
+
+    def attempt(n):
+        submit(lm, make_job(n)).add_done_callback(lambda inner: settle(n, inner))
+
+    def settle(n, inner):
+        error = inner.exception()
+        if error is None:
+            outer.set_result(inner.result())
+        elif not isinstance(error, Exception):
+            outer.set_exception(error)
+        elif n == policy.max_retries - 1:
+            outer.set_exception(Exception(f"Failed after {policy.max_retries} attempts: {error}"))
+        else:
+            delay = policy.delay(n)
+            if policy.verbose:
+                print(f" [RETRY {n + 1}/{policy.max_retries} after {delay}s]", end="", flush=True)
+            timer = threading.Timer(delay, context.copy().run, (attempt, n + 1))
+            timer.daemon = True
+            timer.start()
+
+    attempt(0)
+    return outer
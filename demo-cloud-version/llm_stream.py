@@ -0,0 +1,191 @@
+"""
+LLM Streaming - Token Streams from Council Calls to the UI Thread.
+
+Council calls normally block until the whole completion is back. This
+module runs a predictor through dspy.streamify inside an llm_executor job
+and forwards the partial text of the requested output fields through a
+queue, so the caller (e.g. the Streamlit script thread, which must do all
+rendering itself) can paint tokens as they arrive.
+
+Architecture:
+    - TokenStream: one call; partial text per field, TTFT and total time,
+      and a Future for the final value.
+    - StreamChannel: queue shared by several streams so the UI can
+      interleave e.g. three chiefs speaking at once.
+    - stream(): cache-aware entry point. A cache hit replays the stored
+      value as a single update with TTFT 0.
+
+Usage:
+    s = llm_stream.stream("opening", lm, predictor, inputs, ["argument"], lambda p: p.argument)
+    for field, text in s:
+        placeholder.markdown(text)
+    argument = s.result()
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+
+import dspy
+
+import llm_cache
+
+
+_DONE = object()
+
+# Per-call timings of recent streams (role, model, ttft, total, cached).
+history = deque(maxlen=1000)
+
+
+class StreamChannel:
+    """Queue of (key, field, text_so_far) updates from one or more streams."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._open = 0
+        self._lock = threading.Lock()
+
+    def _register(self):
+        with self._lock:
+            self._open += 1
+
+    def put(self, key, field, text):
+        self._queue.put((key, field, text))
+
+    def close(self, key):
+        self._queue.put((key, None, _DONE))
+
+    def events(self):
+        """Yield (key, field, text_so_far) until every registered stream has finished."""
+        while self._open:
+            key, field, text = self._queue.get()
+            if text is _DONE:
+                with self._lock:
+                    self._open -= 1
+                continue
+            yield key, field, text
+
+
+class TokenStream:
+    """
+    A single streaming call.
+
+    Attributes:
+        key: Identifier used on a shared channel.
+        texts: Field name -> text received so far.
+        ttft: Seconds from submission to the first token (None until then).
+        total: Seconds from submission to completion.
+        cached: True when served from the response cache.
+    """
+
+    def __init__(self, key=None, channel=None):
+        self.key = key
+        self.channel = channel or StreamChannel()
+        self.channel._register()
+        self.texts = {}
+        self.future = None
+        self.ttft = None
+        self.total = None
+        self.cached = False
+        self._start = time.perf_counter()
+
+    def _emit(self, field, chunk):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self._start
+        self._set(field, self.texts.get(field, "") + chunk)
+
+    def _set(self, field, text):
+        self.texts[field] = text
+        self.channel.put(self.key, field, text)
+
+    def _reset(self):
+        """Clear partial output before a retry."""
+        for field in self.texts:
+            self._set(field, "")
+
+    def _finish(self):
+        self.total = time.perf_counter() - self._start
+        if self.ttft is None:
+            self.ttft = self.total
+        self.channel.close(self.key)
+
+    def __iter__(self):
+        """(field, text_so_far) updates; only for streams with a private channel."""
+        for _, field, text in self.channel.events():
+            yield field, text
+
+    def result(self):
+        return self.future.result()
+
+    def timings(self):
+        return {"ttft": self.ttft, "total": self.total, "cached": self.cached}
+
+
+def _run_streaming(token_stream, lm, predictor, inputs, fields):
+    token_stream._reset()
+    listeners = [dspy.streaming.StreamListener(signature_field_name=field) for field in fields]
+    with dspy.context(lm=lm):
+        program = dspy.streamify(predictor, stream_listeners=listeners, async_streaming=False)
+        prediction = None
+        for item in program(**inputs):
+            if isinstance(item, dspy.streaming.StreamResponse):
+                token_stream._emit(item.signature_field_name, item.chunk)
+            elif isinstance(item, dspy.Prediction):
+                prediction = item
+
+    # The listener strips field markers heuristically; settle on the parsed values.
+    for field in fields:
+        token_stream._set(field, getattr(prediction, field))
+    return prediction
+
+
+def stream(role, lm, predictor, inputs, fields, extract, retry=None, key=None, channel=None, signature=None):
+    """
+    Cache-aware streaming call through llm_executor.
+
+    Args:
+        role: Council role of the call (cache policy, as in llm_cache).
+        lm: Model the call runs against.
+        predictor: dspy.Predict to run.
+        inputs: Input field values.
+        fields: Output fields to stream, in display order.
+        extract: Maps the final Prediction to the value the caller wants
+            (and the value that gets cached).
+        retry: Optional llm_executor.Backoff (see llm_cache.submit).
+        key: Identifier of this stream on a shared channel.
+        channel: Shared StreamChannel, or None for a private one.
+        signature: Signature used for the cache key when it differs from
+            the predictor's (e.g. the "query -> answer" string).
+
+    Returns:
+        TokenStream: Iterate it (or its channel) for updates; result()
+        returns the extracted value.
+    """
+    token_stream = TokenStream(key, channel)
+    ran = threading.Event()
+
+    def job():
+        ran.set()
+        return extract(_run_streaming(token_stream, lm, predictor, inputs, fields))
+
+    try:
+        token_stream.future = llm_cache.submit(role, lm, signature or predictor, inputs, job, retry=retry)
+    except BaseException:
+        # Nothing will finish this stream; close it so channel.events() does not wait on it.
+        token_stream._finish()
+        raise
+    if token_stream.future.done() and not ran.is_set():
+        value = token_stream.future.result()
+        token_stream.cached = True
+        for field in fields:
+            token_stream._set(field, getattr(value, field) if isinstance(value, dspy.Prediction) else value)
+        token_stream.ttft = 0.0
+        token_stream._finish()
+    else:
+        token_stream.future.add_done_callback(lambda _: token_stream._finish())
+
+    def record(_):
+        history.append({"role": role, "model": getattr(lm, "model", str(lm)), **token_stream.timings()})
+    token_stream.future.add_done_callback(record)
+    return token_stream
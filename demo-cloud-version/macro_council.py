@@ -11,20 +11,13 @@ Architecture:
 """
 
 import dspy
-import time
 import config
+import llm_cache
+import llm_stream
+from llm_executor import Backoff
 
 
-def retry_with_backoff(func, max_retries=3, base_delay=1.0):
-    for attempt in range(max_retries):
-        try:
-            return func()
-        except Exception as e:
-            if attempt == max_retries - 1:
-                raise Exception(f"Failed after {max_retries} attempts: {str(e)}")
-            delay = base_delay * (2 ** attempt)
-            print(f" [RETRY {attempt + 1}/{max_retries} after {delay}s]", end="", flush=True)
-            time.sleep(delay)
+RETRY_POLICY = Backoff()
 
 class OpeningSignature(dspy.Signature):
     role = dspy.InputField()
@@ -55,17 +48,29 @@ class DepartmentHead(dspy.Module):
         self.opener = dspy.Predict(OpeningSignature)
         self.reply = dspy.Predict(RebuttalSignature)
 
-    def give_opening(self, report, query):
+    def give_opening(self, report, query, stream=False, channel=None, key=None):
+        """Opening argument; with stream=True, a llm_stream.TokenStream on the 'argument' field."""
+        inputs = dict(role=self.role, query=query, micro_reports=report)
+        if stream:
+            return llm_stream.stream("opening", self.lm, self.opener, inputs, ["argument"],
+                                     lambda p: p.argument, RETRY_POLICY, key, channel)
+
         def execute():
             with dspy.context(lm=self.lm):
-                return self.opener(role=self.role, query=query, micro_reports=report).argument
-        return retry_with_backoff(execute)
+                return self.opener(**inputs).argument
+        return llm_cache.run("opening", self.lm, OpeningSignature, inputs, execute, retry=RETRY_POLICY)
+
+    def give_rebuttal(self, my_arg, context, stream=False, channel=None, key=None):
+        """Rebuttal; with stream=True, a llm_stream.TokenStream on the 'rebuttal' field."""
+        inputs = dict(role=self.role, my_argument=my_arg, opponent_arguments=context)
+        if stream:
+            return llm_stream.stream("rebuttal", self.lm, self.reply, inputs, ["rebuttal"],
+                                     lambda p: p.rebuttal, RETRY_POLICY, key, channel)
 
-    def give_rebuttal(self, my_arg, context):
         def execute():
             with dspy.context(lm=self.lm):
-                return self.reply(role=self.role, my_argument=my_arg, opponent_arguments=context).rebuttal
-        return retry_with_backoff(execute)
+                return self.reply(**inputs).rebuttal
+        return llm_cache.run("rebuttal", self.lm, RebuttalSignature, inputs, execute, retry=RETRY_POLICY)
 
 class Sovereign(dspy.Module):
     def __init__(self):
@@ -73,14 +78,22 @@ class Sovereign(dspy.Module):
         self.lm = config.get_sovereign_model()
         self.brain = dspy.Predict(SovereignSignature)
 
-    def forward(self, query, persona, args, rebuttals):
+    def forward(self, query, persona, args, rebuttals, stream=False, channel=None):
+        inputs = dict(
+            query=query,
+            persona=persona,
+            cfo_pos=f"Argument: {args['fin']} | Rebuttal: {rebuttals['fin']}",
+            cmo_pos=f"Argument: {args['gro']} | Rebuttal: {rebuttals['gro']}",
+            cto_pos=f"Argument: {args['tec']} | Rebuttal: {rebuttals['tec']}"
+        )
+
+        if stream:
+            # Reasoning first, then the decision, as the signature orders them.
+            return llm_stream.stream("sovereign", self.lm, self.brain, inputs,
+                                     ["internal_thought_process", "final_decision"],
+                                     lambda p: p, RETRY_POLICY, "sovereign", channel)
+
         def execute():
             with dspy.context(lm=self.lm):
-                return self.brain(
-                    query=query,
-                    persona=persona,
-                    cfo_pos=f"Argument: {args['fin']} | Rebuttal: {rebuttals['fin']}",
-                    cmo_pos=f"Argument: {args['gro']} | Rebuttal: {rebuttals['gro']}",
-                    cto_pos=f"Argument: {args['tec']} | Rebuttal: {rebuttals['tec']}"
-                )
-        return retry_with_backoff(execute)
\ No newline at end of file
+                return self.brain(**inputs)
+        return llm_cache.run("sovereign", self.lm, SovereignSignature, inputs, execute, retry=RETRY_POLICY)
\ No newline at end of file
@@ -1,20 +1,14 @@
 import dspy
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from config import TEAM_FINANCE, TEAM_GROWTH, TEAM_TECH, BOSS_MODEL
-from retriever import search_graph_rag
+import llm_cache
+import tracing
+from llm_executor import Backoff, bind_run
+from retriever import search_graph_rag, search_departments, RetrievalContext
 
 
-def retry_with_backoff(func, max_retries=3, base_delay=1.0):
-    for attempt in range(max_retries):
-        try:
-            return func()
-        except Exception as e:
-            if attempt == max_retries - 1:
-                raise Exception(f"Failed after {max_retries} attempts: {str(e)}")
-            delay = base_delay * (2 ** attempt)
-            print(f" [RETRY {attempt + 1}/{max_retries} after {delay}s]", end="", flush=True)
-            time.sleep(delay)
+RETRY_POLICY = Backoff()
 
 
 class DraftSignature(dspy.Signature):
@@ -57,113 +51,175 @@ class StrategicAdvisorSignature(dspy.Signature):
     meta_analysis = dspy.OutputField(desc="Cross-departmental strategic assessment")
 
 
+PEER_MAP = [[1, 2], [0, 2], [0, 1]]
+
+
 class Department(dspy.Module):
-    def __init__(self, name, goal, team_models):
+    def __init__(self, name, goal, team_models, streaming=True):
         super().__init__()
         self.name = name
         self.goal = goal
         self.workers = team_models
+        self.streaming = streaming
         self.boss_lm = BOSS_MODEL
         self.boss = dspy.Predict(BossSignature)
 
     def _draft_worker(self, worker_id, model, context, query):
-        def execute():
-            drafter = dspy.Predict(DraftSignature)
-            with dspy.context(lm=model):
-                res = drafter(department_goal=self.goal, rag_context=context, query=query)
-                return res.draft_answer
-        return retry_with_backoff(execute)
+        drafter = dspy.Predict(DraftSignature)
+        with dspy.context(lm=model):
+            res = drafter(department_goal=self.goal, rag_context=context, query=query)
+            return res.draft_answer
 
     def _review_draft(self, judge_model, draft_text):
-        def execute():
-            reviewer = dspy.Predict(PeerReviewSignature)
-            with dspy.context(lm=judge_model):
-                res = reviewer(department_goal=self.goal, proposal_text=draft_text)
-                try:
-                    score = float(str(res.score).split('/')[0].strip())
-                except:
-                    score = 5.0
-                return score
-        return retry_with_backoff(execute)
-
-    def forward(self, query):
-        print(f"\n[{self.name}] ACTIVATING TEAM (3 WORKERS + BOSS)")
-
-        context = search_graph_rag(query, self.name)
-
-        worker_names = ["Worker 1 (Mistral)", "Worker 2 (Gemma)", "Worker 3 (Llama)"]
+        reviewer = dspy.Predict(PeerReviewSignature)
+        with dspy.context(lm=judge_model):
+            res = reviewer(department_goal=self.goal, proposal_text=draft_text)
+            try:
+                score = float(str(res.score).split('/')[0].strip())
+            except:
+                score = 5.0
+            return score
+
+    def _submit_draft(self, worker_id, context, query):
+        model = self.workers[worker_id]
+        inputs = dict(department_goal=self.goal, rag_context=context, query=query)
+        return llm_cache.submit("draft", model, DraftSignature, inputs,
+                                self._draft_worker, worker_id, model, context, query, retry=RETRY_POLICY)
+
+    def _submit_review(self, judge_idx, draft_text):
+        judge = self.workers[judge_idx]
+        inputs = dict(department_goal=self.goal, proposal_text=draft_text)
+        return llm_cache.submit("review", judge, PeerReviewSignature, inputs,
+                                self._review_draft, judge, draft_text, retry=RETRY_POLICY)
+
+    def _deliberate_phased(self, context, query, timings):
+        """Drafts, then reviews, with a barrier between the two phases."""
+        start = time.perf_counter()
 
         print(f"   |- All 3 workers drafting in parallel...")
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            draft_futures = {
-                executor.submit(self._draft_worker, i, self.workers[i], context, query): i
-                for i in range(3)
-            }
-            drafts = [None] * 3
-            for future in as_completed(draft_futures):
-                worker_id = draft_futures[future]
-                drafts[worker_id] = future.result()
+        draft_futures = {self._submit_draft(i, context, query): i for i in range(3)}
+        drafts = [None] * 3
+        for future in as_completed(draft_futures):
+            worker_id = draft_futures[future]
+            drafts[worker_id] = future.result()
+            timings["drafts"][worker_id] = time.perf_counter() - start
         print(" [DONE]")
 
         print("   |- Peer review protocol (6 reviews in parallel)...")
-        peer_map = [[1, 2], [0, 2], [0, 1]]
-        with ThreadPoolExecutor(max_workers=6) as executor:
-            review_futures = []
-            for i in range(3):
-                for judge_idx in peer_map[i]:
-                    future = executor.submit(self._review_draft, self.workers[judge_idx], drafts[i])
-                    review_futures.append((i, future))
-
-            all_scores = []
-            for i in range(3):
-                scores_for_draft = []
-                for draft_id, future in review_futures:
-                    if draft_id == i:
-                        scores_for_draft.append(future.result())
-                all_scores.extend(scores_for_draft)
-
-        reviews = []
-        score_idx = 0
+        reviews = [[] for _ in range(3)]
+        review_futures = []
         for i in range(3):
-            scores = [all_scores[score_idx], all_scores[score_idx + 1]]
-            reviews.append(scores)
-            score_idx += 2
+            for judge_idx in PEER_MAP[i]:
+                review_futures.append((i, self._submit_review(judge_idx, drafts[i])))
+
+        for draft_id, future in review_futures:
+            reviews[draft_id].append(future.result())
+        timings["review_stage"] = time.perf_counter() - start
         print(" [DONE]")
 
-        print(f"   |- {self.name} HEAD synthesizing...", end="", flush=True)
-        report = ""
-        for i in range(3):
-            avg = sum(reviews[i])/len(reviews[i])
-            report += f"\n[DRAFT {i+1}]: {drafts[i][:150]}... (Avg: {avg})"
+        return drafts, reviews
+
+    def _deliberate_streaming(self, context, query, timings):
+        """Each draft's two reviews start the moment that draft lands."""
+        start = time.perf_counter()
+
+        print(f"   |- All 3 workers drafting, reviews streaming as drafts land...")
+        drafts = [None] * 3
+        reviews = [[] for _ in range(3)]
+        draft_futures = {self._submit_draft(i, context, query): i for i in range(3)}
+        review_futures = {}
+        for future in as_completed(draft_futures):
+            i = draft_futures[future]
+            drafts[i] = future.result()
+            timings["drafts"][i] = time.perf_counter() - start
+            print(f"   |  Draft {i+1} landed ({timings['drafts'][i]:.1f}s), dispatching 2 peer reviews")
+            for judge_idx in PEER_MAP[i]:
+                review_futures[self._submit_review(judge_idx, drafts[i])] = i
+
+        for future in as_completed(review_futures):
+            reviews[review_futures[future]].append(future.result())
+        timings["review_stage"] = time.perf_counter() - start
+        print("   |- All 6 scores in [DONE]")
+
+        return drafts, reviews
+
+    def forward(self, query, retrieval=None):
+        """
+        Run retrieval, drafting, peer review and boss synthesis.
+
+        Args:
+            query: Strategic question for the department.
+            retrieval: Optional run-scoped RetrievalContext to share
+                retrieved context with the other agents of the run.
+
+        Returns:
+            dspy.Prediction: ``report`` holds the boss's final answer and
+            ``timings`` the per-stage breakdown in seconds: ``retrieval``,
+            ``drafts`` (per worker, measured from dispatch), ``review_stage``
+            (dispatch until the last score), ``boss`` and ``total``.
+        """
+        with tracing.scope(department=self.name):
+            print(f"\n[{self.name}] ACTIVATING TEAM (3 WORKERS + BOSS)")
+            start = time.perf_counter()
+            timings = {"drafts": [None] * 3}
+
+            if retrieval is not None:
+                context = retrieval.search(query, self.name)
+            else:
+                context = search_graph_rag(query, self.name)
+            timings["retrieval"] = time.perf_counter() - start
+
+            if self.streaming:
+                drafts, reviews = self._deliberate_streaming(context, query, timings)
+            else:
+                drafts, reviews = self._deliberate_phased(context, query, timings)
+
+            print(f"   |- {self.name} HEAD synthesizing...", end="", flush=True)
+            boss_start = time.perf_counter()
+            report = ""
+            for i in range(3):
+                avg = sum(reviews[i])/len(reviews[i])
+                report += f"\n[DRAFT {i+1}]: {drafts[i][:150]}... (Avg: {avg})"
+
+            def execute_boss():
+                with dspy.context(lm=self.boss_lm):
+                    final = self.boss(department_goal=self.goal, query=query, report_data=report)
+                    return final.final_answer
 
-        def execute_boss():
-            with dspy.context(lm=self.boss_lm):
-                final = self.boss(department_goal=self.goal, query=query, report_data=report)
-                return final.final_answer
+            inputs = dict(department_goal=self.goal, query=query, report_data=report)
+            result = llm_cache.run("boss", self.boss_lm, BossSignature, inputs, execute_boss, retry=RETRY_POLICY)
+            timings["boss"] = time.perf_counter() - boss_start
+            timings["total"] = time.perf_counter() - start
+            print(f" [DECISION MADE in {timings['total']:.1f}s]")
+            return dspy.Prediction(report=result, timings=timings)
 
-        result = retry_with_backoff(execute_boss)
-        print(" [DECISION MADE]")
-        return result
 
+def consult_finance(query, retrieval=None):
+    return Department("FINANCE DEPT", "Maximize ROI", TEAM_FINANCE)(query, retrieval=retrieval)
 
-def consult_finance(query):
-    return Department("FINANCE DEPT", "Maximize ROI", TEAM_FINANCE)(query)
 
+def consult_growth(query, retrieval=None):
+    return Department("GROWTH DEPT", "Maximize User Base", TEAM_GROWTH)(query, retrieval=retrieval)
 
-def consult_growth(query):
-    return Department("GROWTH DEPT", "Maximize User Base", TEAM_GROWTH)(query)
 
+def consult_tech(query, retrieval=None):
+    return Department("TECH DEPT", "System Stability", TEAM_TECH)(query, retrieval=retrieval)
 
-def consult_tech(query):
-    return Department("TECH DEPT", "System Stability", TEAM_TECH)(query)
 
+def consult_data_analyst(query, retrieval=None):
+    with tracing.scope(department="DATA ANALYST"):
+        return _consult_data_analyst(query, retrieval)
 
-def consult_data_analyst(query):
+
+def _consult_data_analyst(query, retrieval):
     print("\n[DATA ANALYST] ACTIVATING (Specialist Agent)")
 
-    context_finance = search_graph_rag(query, "FINANCE DEPT")
-    context_growth = search_graph_rag(query, "GROWTH DEPT")
-    context_tech = search_graph_rag(query, "TECH DEPT")
+    scopes = ["FINANCE DEPT", "GROWTH DEPT", "TECH DEPT"]
+    if retrieval is not None:
+        contexts = retrieval.search_many(query, scopes)
+    else:
+        contexts = search_departments(query, scopes)
+    context_finance, context_growth, context_tech = (contexts[scope] for scope in scopes)
 
     combined_context = f"FINANCE:\n{context_finance}\n\nGROWTH:\n{context_growth}\n\nTECH:\n{context_tech}"
 
@@ -175,12 +231,18 @@ def consult_data_analyst(query):
             result = analyst(query=query, rag_context=combined_context)
             return result.quantitative_summary
 
-    result = retry_with_backoff(execute)
+    inputs = dict(query=query, rag_context=combined_context)
+    result = llm_cache.run("analyst", BOSS_MODEL, DataAnalystSignature, inputs, execute, retry=RETRY_POLICY)
     print(" [ANALYSIS COMPLETE]")
     return result
 
 
 def consult_strategic_advisor(query, finance_report, growth_report, tech_report):
+    with tracing.scope(department="STRATEGIC ADVISOR"):
+        return _consult_strategic_advisor(query, finance_report, growth_report, tech_report)
+
+
+def _consult_strategic_advisor(query, finance_report, growth_report, tech_report):
     print("\n[STRATEGIC ADVISOR] ACTIVATING (Specialist Agent)")
     print("   |- Performing meta-analysis of all departmental reports...", end="", flush=True)
 
@@ -196,6 +258,68 @@ def consult_strategic_advisor(query, finance_report, growth_report, tech_report)
             )
             return result.meta_analysis
 
-    result = retry_with_backoff(execute)
+    inputs = dict(query=query, finance_report=finance_report, growth_report=growth_report, tech_report=tech_report)
+    result = llm_cache.run("advisor", BOSS_MODEL, StrategicAdvisorSignature, inputs, execute, retry=RETRY_POLICY)
     print(" [META-ANALYSIS COMPLETE]")
-    return result
\ No newline at end of file
+    return result
+
+
+DEPARTMENT_ROLES = ("finance", "growth", "tech")
+
+
+def run_micro_council(query, retrieval=None):
+    """
+    Phase 1 orchestrator - runs the micro council as a dependency graph.
+
+    The Data Analyst and the three departments have no dependencies on each
+    other and are dispatched together. The Strategic Advisor fires as soon
+    as the last departmental report lands, so Phase 1 latency is bounded by
+    the slowest department rather than the sum of all four pipelines.
+    The orchestration threads only wait; the LLM calls themselves are
+    queued on the shared llm_executor (via llm_cache) under the caller's
+    run id.
+
+    Args:
+        query: Strategic question for the micro council.
+        retrieval: Optional RetrievalContext; one is created for the run if
+            omitted. Pass your own to read its hit/miss stats afterwards.
+
+    Yields:
+        tuple: (role, result) in completion order, where role is one of
+        "analyst", "finance", "growth", "tech" or "advisor". Department
+        results are the dspy.Prediction returned by Department.forward;
+        the analyst and advisor yield plain strings.
+    """
+    print("\n[PHASE 1] Dispatching Data Analyst + 3 departments in parallel...")
+    if retrieval is None:
+        retrieval = RetrievalContext()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = {
+            executor.submit(bind_run(consult_data_analyst), query, retrieval): "analyst",
+            executor.submit(bind_run(consult_finance), query, retrieval): "finance",
+            executor.submit(bind_run(consult_growth), query, retrieval): "growth",
+            executor.submit(bind_run(consult_tech), query, retrieval): "tech",
+        }
+        reports = {}
+        pending = set(futures)
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                role = futures[future]
+                result = future.result()
+                yield role, result
+
+                if role in DEPARTMENT_ROLES:
+                    reports[role] = result
+                    if len(reports) == len(DEPARTMENT_ROLES):
+                        advisor = executor.submit(
+                            bind_run(consult_strategic_advisor), query,
+                            reports["finance"].report, reports["growth"].report, reports["tech"].report
+                        )
+                        futures[advisor] = "advisor"
+                        pending.add(advisor)
+
+    stats = retrieval.stats()
+    print(f"\n[PHASE 1] Retrieval context: {stats['hits']} hits / {stats['misses']} misses")
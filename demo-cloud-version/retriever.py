@@ -1,67 +1,652 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import chromadb
 from chromadb.config import Settings
+from chromadb.utils import embedding_functions
 
+import config
+import tracing
 
-client = chromadb.Client(Settings(anonymized_telemetry=False))
-
-try:
-    collection = client.get_collection("company_knowledge")
-except:
-    collection = client.create_collection("company_knowledge")
-
-    documents = [
-        "Current burn rate is $50k per month with 18 months of runway remaining. Q4 expenses exceeded budget by 12%.",
-        "AWS migration project is approved but paused due to cost concerns. Estimated cost: $15k/month vs current $8k/month.",
-        "Engineering headcount budget is frozen except for critical backend roles. Sales hiring is completely frozen.",
-        "User base grew 15% last quarter, reaching 12,000 active users. However, enterprise churn rate is 5% monthly.",
-        "Product-led growth is the 2025 strategic priority per CEO directive. Focus on self-service onboarding.",
-        "Competitor analysis shows we're 30% cheaper but lack enterprise features like SSO and audit logs.",
-        "Legacy on-premise servers are experiencing daily crashes. Uptime SLA is currently at 94% (target: 99.5%).",
-        "Technical debt backlog estimated at 400 engineering hours. Priority items: database migration, API refactor.",
-        "Security audit identified 3 critical vulnerabilities. Remediation required before enterprise sales can proceed.",
-        "Kubernetes migration is 60% complete. Remaining work: database stateful sets and monitoring integration.",
-    ]
-
-    metadatas = [
-        {"department": "FINANCE", "source": "CFO Q4 Report"},
-        {"department": "FINANCE", "source": "Infrastructure Budget"},
-        {"department": "FINANCE", "source": "HR Policy Doc"},
-        {"department": "GROWTH", "source": "Growth Metrics Dashboard"},
-        {"department": "GROWTH", "source": "Strategy Memo 2025"},
-        {"department": "GROWTH", "source": "Competitive Intelligence"},
-        {"department": "TECH", "source": "Incident Reports"},
-        {"department": "TECH", "source": "Engineering Roadmap"},
-        {"department": "TECH", "source": "Security Audit"},
-        {"department": "TECH", "source": "Infrastructure Status"},
-    ]
-
-    ids = [f"doc_{i}" for i in range(len(documents))]
-
-    collection.add(documents=documents, metadatas=metadatas, ids=ids)
-
-
-def search_graph_rag(query, department_focus):
-    print(f"   [GraphRAG] Querying vector store for: {department_focus}...")
 
-    dept_key = department_focus.split()[0] if department_focus else None
+DEPARTMENTS = ["FINANCE", "GROWTH", "TECH"]
+
+embedding_function = embedding_functions.DefaultEmbeddingFunction()
+
+SEED_DOCUMENTS = [
+    "Current burn rate is $50k per month with 18 months of runway remaining. Q4 expenses exceeded budget by 12%.",
+    "AWS migration project is approved but paused due to cost concerns. Estimated cost: $15k/month vs current $8k/month.",
+    "Engineering headcount budget is frozen except for critical backend roles. Sales hiring is completely frozen.",
+    "User base grew 15% last quarter, reaching 12,000 active users. However, enterprise churn rate is 5% monthly.",
+    "Product-led growth is the 2025 strategic priority per CEO directive. Focus on self-service onboarding.",
+    "Competitor analysis shows we're 30% cheaper but lack enterprise features like SSO and audit logs.",
+    "Legacy on-premise servers are experiencing daily crashes. Uptime SLA is currently at 94% (target: 99.5%).",
+    "Technical debt backlog estimated at 400 engineering hours. Priority items: database migration, API refactor.",
+    "Security audit identified 3 critical vulnerabilities. Remediation required before enterprise sales can proceed.",
+    "Kubernetes migration is 60% complete. Remaining work: database stateful sets and monitoring integration.",
+]
+
+SEED_METADATAS = [
+    {"department": "FINANCE", "source": "CFO Q4 Report"},
+    {"department": "FINANCE", "source": "Infrastructure Budget"},
+    {"department": "FINANCE", "source": "HR Policy Doc"},
+    {"department": "GROWTH", "source": "Growth Metrics Dashboard"},
+    {"department": "GROWTH", "source": "Strategy Memo 2025"},
+    {"department": "GROWTH", "source": "Competitive Intelligence"},
+    {"department": "TECH", "source": "Incident Reports"},
+    {"department": "TECH", "source": "Engineering Roadmap"},
+    {"department": "TECH", "source": "Security Audit"},
+    {"department": "TECH", "source": "Infrastructure Status"},
+]
+
+
+GLOBAL_COLLECTION = "company_knowledge"
+
+
+def shard_name(label):
+    """Chroma collection name of a department shard."""
+    slug = re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_")
+    return f"{GLOBAL_COLLECTION}__{slug}"
+
+
+class ShardedStore:
+    """
+    Knowledge base split into one Chroma collection per department plus a
+    global collection holding every chunk.
+
+    Scoped queries hit only their department's shard, so they are plain
+    top-k searches instead of filtered ones. Multi-department queries fan
+    out across shards in parallel and merge by distance. Writes go through
+    upsert(), which creates shards for new department labels on the fly,
+    and delete().
+
+    Attributes:
+        client: Chroma client owning the collections.
+        global_shard: Collection with every chunk (unscoped queries).
+        version: Bumped on every write through this store.
+
+    Every write also stamps the global collection's metadata with its time
+    (updated_at()), so other processes sharing a persistent store can tell
+    that its content changed even when the chunk count did not.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.global_shard = self._open(GLOBAL_COLLECTION)
+        self._shards = {}
+        self._lock = threading.Lock()
+        self.version = 0
 
-    if dept_key and dept_key in ["FINANCE", "GROWTH", "TECH"]:
-        results = collection.query(
-            query_texts=[query],
-            n_results=3,
-            where={"department": dept_key}
+        prefix = f"{GLOBAL_COLLECTION}__"
+        for existing in client.list_collections():
+            name = getattr(existing, "name", existing)
+            if name.startswith(prefix):
+                shard = self._open(name)
+                label = shard.metadata.get("department") if shard.metadata else None
+                self._shards[label or name[len(prefix):].upper()] = shard
+        if not self._shards and self.global_shard.count():
+            self._backfill()
+
+    def _open(self, name, label=None):
+        return self.client.get_or_create_collection(
+            name, embedding_function=embedding_function,
+            metadata={"department": label} if label else None,
         )
+
+    def _backfill(self, page_size=5_000):
+        """Populate department shards from a store written before sharding."""
+        print(f"   [SHARDS] Splitting {self.global_shard.count()} chunks into department shards...")
+        for offset in range(0, self.global_shard.count(), page_size):
+            page = self.global_shard.get(include=["documents", "metadatas", "embeddings"], limit=page_size, offset=offset)
+            self._upsert_shards(page["ids"], page["documents"], page["metadatas"], list(page["embeddings"]))
+
+    def shard(self, label, create=False):
+        """Collection for a department label, or None if it has no shard."""
+        with self._lock:
+            if label not in self._shards and create:
+                self._shards[label] = self._open(shard_name(label), label)
+                print(f"   [SHARDS] Created shard for new department: {label}")
+            return self._shards.get(label)
+
+    def labels(self):
+        with self._lock:
+            return sorted(self._shards)
+
+    def count(self):
+        return self.global_shard.count()
+
+    def get(self, **kwargs):
+        return self.global_shard.get(**kwargs)
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        """Write chunks to the global collection and their department shards."""
+        if embeddings is None:
+            embeddings = embedding_function(list(documents))
+        self.global_shard.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+        self._upsert_shards(ids, documents, metadatas, embeddings)
+        self._touch()
+
+    def delete(self, ids):
+        """Remove chunks from the global collection and their department shards."""
+        if not ids:
+            return
+        existing = self.global_shard.get(ids=list(ids), include=["metadatas"])
+        groups = {}
+        for chunk_id, meta in zip(existing["ids"], existing["metadatas"]):
+            groups.setdefault(meta.get("department", "GENERAL"), []).append(chunk_id)
+        self.global_shard.delete(ids=list(ids))
+        for label, shard_ids in groups.items():
+            shard = self.shard(label)
+            if shard is not None:
+                shard.delete(ids=shard_ids)
+        self._touch()
+
+    def _touch(self):
+        with self._lock:
+            self.version += 1
+        self.global_shard.modify(metadata={"updated_at": time.time()})
+
+    def updated_at(self):
+        """Time of the last write to the store by any process (0.0 if never stamped)."""
+        collection = self.client.get_collection(GLOBAL_COLLECTION, embedding_function=embedding_function)
+        return (collection.metadata or {}).get("updated_at", 0.0)
+
+    def _upsert_shards(self, ids, documents, metadatas, embeddings):
+        groups = {}
+        for record in zip(ids, documents, metadatas, embeddings):
+            groups.setdefault(record[2].get("department", "GENERAL"), []).append(record)
+        for label, records in groups.items():
+            shard_ids, shard_docs, shard_metas, shard_embeddings = map(list, zip(*records))
+            self.shard(label, create=True).upsert(
+                ids=shard_ids, documents=shard_docs, metadatas=shard_metas, embeddings=shard_embeddings,
+            )
+
+    def query(self, query_embeddings, n_results, departments=None):
+        """
+        Top-k per query over the global collection or the given shards.
+
+        Returns:
+            dict: Chroma-shaped results (ids, documents, metadatas, distances).
+        """
+        if not departments:
+            return _query_shard(self.global_shard, query_embeddings, n_results)
+
+        shards = [s for s in (self.shard(label) for label in departments) if s is not None]
+        if len(shards) == 1:
+            return _query_shard(shards[0], query_embeddings, n_results)
+
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        if not shards:
+            for column in results.values():
+                column.extend([] for _ in query_embeddings)
+            return results
+
+        with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+            partials = list(pool.map(lambda shard: _query_shard(shard, query_embeddings, n_results), shards))
+        for qi in range(len(query_embeddings)):
+            hits = sorted(
+                (hit for part in partials for hit in zip(
+                    part["distances"][qi], part["ids"][qi], part["documents"][qi], part["metadatas"][qi])),
+                key=lambda hit: hit[0],
+            )[:n_results]
+            results["distances"].append([h[0] for h in hits])
+            results["ids"].append([h[1] for h in hits])
+            results["documents"].append([h[2] for h in hits])
+            results["metadatas"].append([h[3] for h in hits])
+        return results
+
+
+def _query_shard(shard, query_embeddings, n_results):
+    n_results = min(n_results, shard.count())
+    if n_results == 0:
+        return {key: [[] for _ in query_embeddings] for key in ("ids", "documents", "metadatas", "distances")}
+    return shard.query(query_embeddings=query_embeddings, n_results=n_results)
+
+
+def open_store(path=None):
+    """
+    Open the sharded company knowledge store.
+
+    Args:
+        path: Directory of a persistent Chroma store (see ingest.py). When
+            None, an in-memory store is used and seeded with demo data.
+    """
+    settings = Settings(anonymized_telemetry=False)
+    client = chromadb.PersistentClient(path=path, settings=settings) if path else chromadb.Client(settings)
+    store = ShardedStore(client)
+
+    if not path and store.count() == 0:
+        ids = [f"doc_{i}" for i in range(len(SEED_DOCUMENTS))]
+        store.upsert(ids=ids, documents=SEED_DOCUMENTS, metadatas=SEED_METADATAS)
+    return store
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    The sharded Chroma store, opened (and seeded) on first use.
+
+    The numpy backend never calls this, so it does not open Chroma or
+    embed the demo documents.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = open_store(config.KNOWLEDGE_BASE_PATH)
+        return _store
+
+
+vector_index = None
+if config.RETRIEVER_BACKEND == "numpy":
+    from vector_index import VectorIndex
+    vector_index = VectorIndex(config.VECTOR_INDEX_PATH)
+
+
+if config.RETRIEVER_HYBRID:
+    from bm25_index import BM25Index, reciprocal_rank_fusion
+
+_bm25 = None
+_bm25_key = None
+_bm25_lock = threading.Lock()
+
+
+def get_bm25_index():
+    """
+    BM25 index over the active backend, built on the first hybrid query.
+
+    The Chroma store is rescanned when it has changed since the last build
+    (a write through this process, or a newer write stamp left by another
+    process such as ingest.py, even one that kept the chunk count), so new
+    and edited chunks are searched lexically. The numpy index is read-only.
+    """
+    global _bm25, _bm25_key
+    if vector_index is not None:
+        key = ("numpy", vector_index.count())
     else:
-        results = collection.query(
-            query_texts=[query],
-            n_results=3
-        )
+        key = ("chroma", get_store().version, get_store().updated_at())
+
+    with _bm25_lock:
+        if _bm25 is None or key != _bm25_key:
+            start = time.perf_counter()
+            if vector_index is not None:
+                _bm25 = BM25Index.from_records(
+                    (r["id"], r["document"], r["metadata"]) for r in map(vector_index.record, range(vector_index.count()))
+                )
+            else:
+                _bm25 = BM25Index.from_collection(get_store().global_shard)
+            _bm25_key = key
+            print(f"   [GraphRAG] BM25 index over {len(_bm25)} chunks built in {time.perf_counter() - start:.1f}s")
+        return _bm25
+
+
+def store_count():
+    """Number of chunks in the active retrieval backend."""
+    return vector_index.count() if vector_index is not None else get_store().count()
+
+
+def query_store(query_embeddings, n_results, departments=None, query_texts=None):
+    """
+    Similarity query against the active backend (Chroma or VectorIndex).
+
+    When hybrid retrieval is enabled and ``query_texts`` are given, the
+    vector ranking is fused with a BM25 ranking over the same scope
+    (reciprocal rank fusion), so exact tokens like "SSO" or "burn rate"
+    are not lost to embedding similarity.
+
+    Args:
+        query_embeddings: One embedding per query.
+        n_results: Results per query.
+        departments: Department labels to restrict to, or None for all.
+        query_texts: Query strings, required for the BM25 side.
+
+    Returns:
+        dict: Chroma-shaped results with per-query ids, documents and metadatas.
+    """
+    if not config.RETRIEVER_HYBRID or query_texts is None:
+        return _vector_query(query_embeddings, n_results, departments)
+
+    bm25_index = get_bm25_index()
+
+    candidates = n_results * config.HYBRID_CANDIDATE_FACTOR
+    vector = _vector_query(query_embeddings, candidates, departments)
+    results = {"ids": [], "documents": [], "metadatas": []}
+    for qi, text in enumerate(query_texts):
+        found = dict(zip(vector["ids"][qi], zip(vector["documents"][qi], vector["metadatas"][qi])))
+        docs = [doc for doc, _ in bm25_index.search(text, candidates, departments)]
+        found.update(_lexical_chunks(bm25_index, [d for d in docs if bm25_index.ids[d] not in found]))
+        # A chunk deleted since the BM25 build is missing from the backend.
+        lexical = [bm25_index.ids[d] for d in docs if bm25_index.ids[d] in found]
+
+        fused = reciprocal_rank_fusion([vector["ids"][qi], lexical])[:n_results]
+        results["ids"].append(fused)
+        results["documents"].append([found[i][0] for i in fused])
+        results["metadatas"].append([found[i][1] for i in fused])
+    return results
 
-    if results['documents'] and len(results['documents'][0]) > 0:
+
+def _lexical_chunks(bm25_index, docs):
+    """(document, metadata) by chunk id for BM25 doc numbers, read from the active backend."""
+    if not docs:
+        return {}
+    if vector_index is not None:
+        # The numpy BM25 index is built in row order: doc number == row.
+        records = [vector_index.record(doc) for doc in docs]
+        return {r["id"]: (r["document"], r["metadata"]) for r in records}
+    page = get_store().get(ids=[bm25_index.ids[doc] for doc in docs], include=["documents", "metadatas"])
+    return {i: (d, m) for i, d, m in zip(page["ids"], page["documents"], page["metadatas"])}
+
+
+def _vector_query(query_embeddings, n_results, departments):
+    if vector_index is not None:
+        return vector_index.query(query_embeddings, n_results, departments)
+
+    return get_store().query(query_embeddings, n_results, departments)
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU of query text -> embedding.
+
+    Attributes:
+        max_entries: Entries kept before the least recently used is dropped.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed(self, texts):
+        """Embeddings for ``texts``; only uncached texts reach the model, in one call."""
+        texts = list(texts)
+        found = {}
+        with self._lock:
+            for text in texts:
+                if text in self._entries:
+                    self._entries.move_to_end(text)
+                    found[text] = self._entries[text]
+            missing = list(dict.fromkeys(t for t in texts if t not in found))
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            computed = dict(zip(missing, embedding_function(missing)))
+            found.update(computed)
+            with self._lock:
+                self._entries.update(computed)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return [found[text] for text in texts]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+embedding_cache = EmbeddingCache(config.EMBEDDING_CACHE_SIZE)
+_warm = threading.Event()
+_warm_lock = threading.Lock()
+_warmup_thread = None
+
+
+def warmup(background=False):
+    """
+    Load everything the first query needs before it arrives.
+
+    Chroma's default embedding function loads its ONNX model lazily, the
+    store is opened (and seeded) on first use and the BM25 index is built
+    on the first hybrid query; together they cost the first DEEP_LANE
+    request several seconds. Safe to call more than once and from several
+    threads (e.g. on every Streamlit rerun): only the first call does
+    work, later background calls return the same thread.
+
+    Args:
+        background: Warm up in a daemon thread and return immediately.
+
+    Returns:
+        threading.Thread | None: The warmup thread when ``background``.
+    """
+    global _warmup_thread
+
+    def load():
+        with _warm_lock:
+            if _warm.is_set():
+                return
+            start = time.perf_counter()
+            embedding_function(["warmup"])
+            if vector_index is None:
+                get_store()
+            if config.RETRIEVER_HYBRID:
+                get_bm25_index()
+            _warm.set()
+            print(f"   [GraphRAG] Retriever warm in {time.perf_counter() - start:.1f}s")
+
+    if background:
+        with _warm_lock:
+            if _warmup_thread is None and not _warm.is_set():
+                _warmup_thread = threading.Thread(target=load, name="retriever-warmup", daemon=True)
+                _warmup_thread.start()
+            return _warmup_thread
+    load()
+    return None
+
+
+def embed_query(query):
+    """Embed a query with the same function the collection was built with (LRU cached)."""
+    return embedding_cache.embed([query])[0]
+
+
+def embed_queries(queries):
+    """Batch form of embed_query."""
+    return embedding_cache.embed(queries)
+
+
+def department_key(department_focus):
+    """Map a focus like 'FINANCE DEPT' to its metadata label, or None for global search."""
+    dept_key = department_focus.split()[0] if department_focus else None
+    if dept_key in DEPARTMENTS:
+        return dept_key
+    return dept_key if vector_index is None and get_store().shard(dept_key) is not None else None
+
+
+def format_context(documents, metadatas):
+    if documents:
         context_blocks = []
-        for i, doc in enumerate(results['documents'][0]):
-            source = results['metadatas'][0][i].get('source', 'Unknown')
+        for i, doc in enumerate(documents):
+            source = metadatas[i].get('source', 'Unknown')
             context_blocks.append(f"[{source}]: {doc}")
         return "\n\n".join(context_blocks)
     else:
         return "[No relevant context found in knowledge base]"
+
+
+def search_graph_rag(query, department_focus, n_results=config.RAG_N_RESULTS, query_embedding=None):
+    print(f"   [GraphRAG] Querying vector store for: {department_focus}...")
+
+    with tracing.span("retrieval", department=department_focus):
+        dept_key = department_key(department_focus)
+        if query_embedding is None:
+            query_embedding = embed_query(query)
+
+        results = query_store([query_embedding], n_results, [dept_key] if dept_key else None, [query])
+
+        return format_context(results['documents'][0], results['metadatas'][0])
+
+
+def search_departments_batch(queries, department_focuses, n_results=config.RAG_N_RESULTS, query_embeddings=None, oversample=2):
+    """
+    Retrieve top-k context per department for many queries at once.
+
+    With the sharded Chroma store every scope is its own collection, so
+    the scopes are queried concurrently (``query_embeddings=[...]`` for all
+    queries at once) and each returns an exact top-k.
+
+    With the VectorIndex backend a single similarity query runs over the
+    union of the requested scopes and the hits are partitioned per
+    department. A department that comes back short is topped up with its
+    own filtered query, which only happens when one department dominates
+    the similarity ranking.
+
+    Args:
+        queries: Query strings.
+        department_focuses: Scopes such as 'FINANCE DEPT'; an unrecognised
+            scope means global (unfiltered) top-k.
+        n_results: Documents per department.
+        query_embeddings: Optional precomputed embeddings, one per query.
+        oversample: Extra candidates fetched per scope before partitioning
+            (VectorIndex backend only).
+
+    Returns:
+        list[dict]: Per query, a mapping of department focus to context string.
+    """
+    with tracing.span("retrieval_batch", department=", ".join(department_focuses)):
+        scopes = {focus: department_key(focus) for focus in department_focuses}
+        keys = sorted({k for k in scopes.values() if k})
+        global_scope = any(k is None for k in scopes.values())
+
+        if query_embeddings is None:
+            query_embeddings = embed_queries(queries)
+
+        if vector_index is None:
+            print(f"   [GraphRAG] Fanning out {len(queries)} queries across {len(scopes)} shards...")
+            with ThreadPoolExecutor(max_workers=max(len(scopes), 1)) as pool:
+                scoped = dict(zip(scopes, pool.map(
+                    lambda key: query_store(query_embeddings, n_results, [key] if key else None, list(queries)),
+                    scopes.values(),
+                )))
+            return [
+                {focus: format_context(r['documents'][qi], r['metadatas'][qi]) for focus, r in scoped.items()}
+                for qi in range(len(queries))
+            ]
+
+        print(f"   [GraphRAG] Batched query for {len(queries)} queries x {len(scopes)} scopes...")
+        total = store_count()
+        pool_size = min(total, n_results * max(len(scopes), 1) * oversample)
+        if pool_size == 0:
+            return [{focus: format_context([], []) for focus in scopes} for _ in queries]
+
+        results = query_store(query_embeddings, pool_size, None if global_scope else keys, list(queries))
+
+        batch = []
+        for qi, query in enumerate(queries):
+            documents, metadatas = results['documents'][qi], results['metadatas'][qi]
+            contexts = {}
+            for focus, key in scopes.items():
+                picked = [
+                    (doc, meta) for doc, meta in zip(documents, metadatas)
+                    if key is None or meta.get("department") == key
+                ][:n_results]
+                if len(picked) < n_results and pool_size < total:
+                    contexts[focus] = search_graph_rag(query, focus, n_results, query_embeddings[qi])
+                    continue
+                contexts[focus] = format_context([d for d, _ in picked], [m for _, m in picked])
+            batch.append(contexts)
+        return batch
+
+
+def search_departments(query, department_focuses, n_results=config.RAG_N_RESULTS, query_embedding=None):
+    """Single-query form of search_departments_batch."""
+    embeddings = None if query_embedding is None else [query_embedding]
+    return search_departments_batch([query], department_focuses, n_results, embeddings)[0]
+
+
+class RetrievalContext:
+    """
+    Run-scoped retrieval memo shared by the analyst and the departments.
+
+    The query embedding is computed once per query text, and results are
+    cached per (query, department, n_results). Concurrent requests for the
+    same key wait on the first fetch instead of repeating it.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._embeddings = {}
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def embedding(self, query):
+        with self._lock:
+            if query not in self._embeddings:
+                self._embeddings[query] = embed_query(query)
+            return self._embeddings[query]
+
+    def search(self, query, department_focus, n_results=config.RAG_N_RESULTS):
+        key = (query, department_key(department_focus), n_results)
+        with self._lock:
+            pending = self._results.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._results[key] = Future()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not owner:
+            print(f"   [GraphRAG] Reusing run context for: {department_focus}")
+            return pending.result()
+
+        try:
+            context = search_graph_rag(query, department_focus, n_results, self.embedding(query))
+        except Exception as e:
+            with self._lock:
+                del self._results[key]
+            pending.set_exception(e)
+            raise
+        pending.set_result(context)
+        return context
+
+    def search_many(self, query, department_focuses, n_results=config.RAG_N_RESULTS):
+        """
+        Fetch several department scopes with one batched vector-store pass.
+
+        Scopes already cached (or being fetched by another agent) are
+        reused; the remaining ones are claimed and retrieved together.
+
+        Returns:
+            dict: Department focus to context string.
+        """
+        claimed, waiting = {}, {}
+        with self._lock:
+            for focus in department_focuses:
+                key = (query, department_key(focus), n_results)
+                if key in self._results:
+                    waiting[focus] = self._results[key]
+                    self.hits += 1
+                else:
+                    claimed[focus] = self._results[key] = Future()
+                    self.misses += 1
+
+        if claimed:
+            try:
+                fetched = search_departments(query, list(claimed), n_results, self.embedding(query))
+            except Exception as e:
+                with self._lock:
+                    for focus in claimed:
+                        del self._results[(query, department_key(focus), n_results)]
+                for pending in claimed.values():
+                    pending.set_exception(e)
+                raise
+            for focus, pending in claimed.items():
+                pending.set_result(fetched[focus])
+
+        return {focus: (claimed.get(focus) or waiting[focus]).result() for focus in department_focuses}
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "embeddings": len(self._embeddings)}
@@ -9,22 +9,21 @@ capability.
 Routing Logic:
     - FAST_LANE (score <= 4): Simple queries bypassing council assembly.
     - DEEP_LANE (score > 4): Complex queries requiring full deliberation.
+    - Confidently trivial or strategic queries are settled by the in-process
+      LexicalPreRouter; only the uncertain middle band reaches the LLM.
 """
 
 import dspy
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from config import BOSS_MODEL
+from lexical_router import LexicalPreRouter
+import llm_cache
+from llm_executor import Backoff, bind_run
 
 
-def retry_with_backoff(func, max_retries=3, base_delay=1.0):
-    for attempt in range(max_retries):
-        try:
-            return func()
-        except Exception as e:
-            if attempt == max_retries - 1:
-                raise Exception(f"Failed after {max_retries} attempts: {str(e)}")
-            delay = base_delay * (2 ** attempt)
-            time.sleep(delay)
+RETRY_POLICY = Backoff(verbose=False)
 
 
 class AssessComplexity(dspy.Signature):
@@ -80,10 +79,25 @@ class RouterModule(dspy.Module):
                     reasoning=result.reasoning
                 )
 
-        return retry_with_backoff(execute)
+        return llm_cache.run("router", self.lm, AssessComplexity, {"query": query}, execute, retry=RETRY_POLICY)
 
 
-def route_query(query_text, force_deep=False):
+PRE_ROUTER = LexicalPreRouter()
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """Return the shared, warm RouterModule instance (created on first use)."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = RouterModule()
+        return _router
+
+
+def route_query(query_text, force_deep=False, use_pre_router=True):
     """
     Primary routing interface with manual override support.
     
@@ -91,6 +105,8 @@ def route_query(query_text, force_deep=False):
         query_text: User query string for routing evaluation.
         force_deep: If True, bypasses AI assessment and routes directly
                     to DEEP_LANE for full council assembly.
+        use_pre_router: If True, queries the LexicalPreRouter first and only
+                        falls back to the LLM router for uncertain queries.
                     
     Returns:
         dspy.Prediction: Routing decision with score and reasoning.
@@ -102,5 +118,34 @@ def route_query(query_text, force_deep=False):
             reasoning="MANUAL OVERRIDE: User requested Council assembly explicitly."
         )
 
-    router = RouterModule()
-    return router(query=query_text)
+    if use_pre_router:
+        decision = PRE_ROUTER(query_text)
+        if decision is not None:
+            return decision
+
+    return get_router()(query=query_text)
+
+
+def route_queries(queries, max_workers=8, force_deep=False, use_pre_router=True):
+    """
+    Route many queries concurrently with the shared RouterModule.
+
+    Args:
+        queries: Iterable of query strings.
+        max_workers: Upper bound on queries classified at the same time.
+        force_deep: Passed through to route_query for every query.
+        use_pre_router: Passed through to route_query for every query.
+
+    Returns:
+        list[dspy.Prediction]: One prediction per query, in input order,
+        each carrying its own ``latency`` in seconds.
+    """
+    def timed_route(query_text):
+        start = time.perf_counter()
+        result = route_query(query_text, force_deep=force_deep, use_pre_router=use_pre_router)
+        result.latency = time.perf_counter() - start
+        return result
+
+    get_router()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(bind_run(timed_route), queries))
@@ -0,0 +1,241 @@
+"""
+Tracing - Per-Call Spans and Latency Waterfall Export.
+
+Every council LLM call (router, fast lane, drafts, reviews, boss,
+specialists, openings, rebuttals, Sovereign) and every retrieval records a
+span: kind, model, phase, department, run id, start/end, retries, cache
+hit and prompt/completion tokens. LLM spans are opened in llm_cache.submit,
+the single path all calls share; retrieval spans in retriever.py.
+
+Context:
+    Phase and department are context variables. Callers set them with
+    scope(phase=...) / scope(department=...); they are captured when a call
+    is submitted, so spans are labelled correctly even though the call runs
+    on an llm_executor worker thread.
+
+Export:
+    - Chrome trace / Perfetto JSON (chrome://tracing, ui.perfetto.dev)
+    - JSONL, one span per line
+"""
+
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import llm_executor
+
+
+_phase = ContextVar("trace_phase", default=None)
+_department = ContextVar("trace_department", default=None)
+_active_span = ContextVar("trace_span", default=None)
+
+
+@contextmanager
+def scope(phase=None, department=None):
+    """Label spans submitted inside the block with a phase and/or department."""
+    tokens = []
+    if phase is not None:
+        tokens.append((_phase, _phase.set(phase)))
+    if department is not None:
+        tokens.append((_department, _department.set(department)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def current_phase():
+    return _phase.get()
+
+
+def current_department():
+    return _department.get()
+
+
+def capture():
+    """Snapshot of the caller's trace context, for use on another thread."""
+    return {"phase": _phase.get(), "department": _department.get(), "run_id": llm_executor.current_run()}
+
+
+class Span:
+    """One traced call. Times are wall-clock seconds (time.time())."""
+
+    def __init__(self, kind, model=None, phase=None, department=None, run_id=None):
+        self.kind = kind
+        self.model = model
+        self.phase = phase
+        self.department = department
+        self.run_id = run_id
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+        self.end = None
+        self.retries = 0
+        self.cached = False
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.error = None
+
+    @property
+    def duration(self):
+        return (self.end or time.time()) - self.start
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "model": self.model,
+            "phase": self.phase,
+            "department": self.department,
+            "run_id": self.run_id,
+            "thread": self.thread,
+            "start": self.start,
+            "end": self.end,
+            "duration": self.duration,
+            "retries": self.retries,
+            "cached": self.cached,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "error": self.error,
+        }
+
+
+class Tracer:
+    """Thread-safe, bounded store of finished spans."""
+
+    def __init__(self, max_spans=100_000):
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def record(self, span):
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, run_id=None):
+        with self._lock:
+            return [s for s in self._spans if run_id is None or s.run_id == run_id]
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def chrome_trace(self, run_id=None):
+        """
+        Chrome trace / Perfetto JSON object.
+
+        One process per run, one track per worker thread; complete ("X")
+        events in microseconds relative to the first span.
+        """
+        spans = self.spans(run_id)
+        origin = min((s.start for s in spans), default=0.0)
+        pids = {}
+        events = []
+        for s in spans:
+            pid = pids.setdefault(s.run_id, len(pids) + 1)
+            label = s.kind if not s.department else f"{s.kind} [{s.department}]"
+            events.append({
+                "name": label,
+                "cat": s.phase or "unphased",
+                "ph": "X",
+                "ts": (s.start - origin) * 1e6,
+                "dur": s.duration * 1e6,
+                "pid": pid,
+                "tid": s.thread,
+                "args": {k: v for k, v in s.to_dict().items() if k not in ("start", "end", "thread")},
+            })
+        for run, pid in pids.items():
+            events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"run {run}"}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path, run_id=None):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(run_id), f)
+
+    def jsonl(self, run_id=None):
+        return "".join(json.dumps(s.to_dict(), default=str) + "\n" for s in self.spans(run_id))
+
+    def write_jsonl(self, path, run_id=None):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.jsonl(run_id))
+
+    def summary(self, run_id=None, by="phase"):
+        """Span count, summed seconds and tokens grouped by a span attribute."""
+        groups = defaultdict(lambda: {"spans": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0})
+        for s in self.spans(run_id):
+            group = groups[getattr(s, by) or "-"]
+            group["spans"] += 1
+            group["seconds"] += s.duration
+            group["prompt_tokens"] += s.prompt_tokens
+            group["completion_tokens"] += s.completion_tokens
+        return dict(groups)
+
+
+tracer = Tracer()
+
+
+def _add_usage(span, usage_by_model):
+    for usage in usage_by_model.values():
+        span.prompt_tokens += usage.get("prompt_tokens") or 0
+        span.completion_tokens += usage.get("completion_tokens") or 0
+
+
+@contextmanager
+def span(kind, model=None, context=None, department=None, track_tokens=False):
+    """
+    Record a span around the block.
+
+    Args:
+        kind: Call kind (e.g. "draft", "retrieval").
+        model: Model id, if any.
+        context: capture() from the submitting thread; defaults to the
+            current thread's context.
+        department: Overrides the context's department.
+        track_tokens: Collect token usage of dspy.LM calls in the block.
+    """
+    context = context or capture()
+    current = Span(kind, model, context["phase"], department or context["department"], context["run_id"])
+    token = _active_span.set(current)
+    # Expose the submitter's phase/department to code running inside the
+    # span on a worker thread (e.g. cassette.py's per-phase passthrough).
+    tokens = [(_phase, _phase.set(current.phase)), (_department, _department.set(current.department))]
+    try:
+        if track_tokens:
+            from dspy.utils.usage_tracker import track_usage
+            with track_usage() as usage:
+                try:
+                    yield current
+                finally:
+                    _add_usage(current, usage.get_total_tokens())
+        else:
+            yield current
+    except Exception as e:
+        current.error = str(e)
+        raise
+    finally:
+        for var, var_token in reversed(tokens):
+            var.reset(var_token)
+        _active_span.reset(token)
+        current.end = time.time()
+        tracer.record(current)
+
+
+def traced(kind, lm, context, func, retries=0):
+    """
+    Wrap an LLM job so it runs inside a span captured at submit time.
+
+    ``retries`` is the number of failed attempts before this one.
+    """
+    def run(*args, **kwargs):
+        with span(kind, llm_executor.model_key(lm), context, track_tokens=True) as current:
+            current.retries = retries
+            return func(*args, **kwargs)
+    return run
+
+
+def record_cache_hit(kind, lm, context):
+    """Zero-length span for a call served from the response cache."""
+    with span(kind, llm_executor.model_key(lm), context) as hit:
+        hit.cached = True
+
@@ -0,0 +1,236 @@
+"""
+NumPy Vector Index - Memory-Mapped Brute-Force Retrieval Backend.
+
+An alternative to the in-memory Chroma collection behind the same
+search_graph_rag interface. The index lives in a directory on disk and is
+opened with numpy memory maps, so cold start is near-instant and several
+processes serving the same index share its pages through the OS cache.
+
+On-disk layout:
+    embeddings.npy   N x D L2-normalised matrix (float32 or float16)
+    departments.npy  N uint16 department codes
+    masks.npy        one packed bitmask (np.packbits) per department
+    records.jsonl    id / document / metadata per row (index_layout.py)
+    offsets.npy      N+1 byte offsets into records.jsonl
+    meta.json        dtype, dimensions and department labels
+
+Search is an exact cosine scan: a blocked matmul against the query,
+department filtering through the bitmasks and argpartition top-k.
+
+Usage:
+    python vector_index.py build --out ./vector_index [--dtype float16]
+    python vector_index.py bench --index ./vector_index
+"""
+
+import argparse
+import json
+import pathlib
+import time
+
+import numpy as np
+
+import config  # noqa: F401  (puts the repository root, home of index_layout.py, on sys.path)
+from index_layout import RecordReader, department_codes, write_records
+
+
+BLOCK_ROWS = 65_536
+
+
+def _normalise(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.size == 0:
+        # No rows (e.g. an empty collection): keep it two-dimensional.
+        return matrix.reshape(0, matrix.shape[1] if matrix.ndim == 2 else 0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class VectorIndex:
+    """
+    Read-only, memory-mapped exact-search index.
+
+    Attributes:
+        directory: Index directory.
+        embeddings: Memory-mapped N x D matrix.
+        labels: Department labels, indexed by department code.
+    """
+
+    def __init__(self, directory):
+        self.directory = pathlib.Path(directory)
+        with open(self.directory / "meta.json", "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.embeddings = np.load(self.directory / "embeddings.npy", mmap_mode="r")
+        self.departments = np.load(self.directory / "departments.npy", mmap_mode="r")
+        self.masks = np.load(self.directory / "masks.npy", mmap_mode="r")
+        self.labels = self.meta["departments"]
+        self._codes = {label: code for code, label in enumerate(self.labels)}
+        self._records = RecordReader(self.directory)
+
+    @classmethod
+    def build(cls, directory, ids, documents, metadatas, embeddings, dtype="float32"):
+        """
+        Write an index directory from parallel lists and return it opened.
+
+        An empty input gives an empty index whose searches return no rows.
+
+        Raises:
+            ValueError: More department labels than a uint16 code can hold.
+        """
+        labels, codes = department_codes(metadatas)
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        matrix = _normalise(embeddings).astype(dtype)
+        masks = np.stack([np.packbits(codes == code) for code in range(len(labels))]) if labels else np.zeros((0, 0), np.uint8)
+
+        write_records(directory, ids, documents, metadatas)
+        np.save(directory / "embeddings.npy", matrix)
+        np.save(directory / "departments.npy", codes)
+        np.save(directory / "masks.npy", masks)
+        with open(directory / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({"dtype": dtype, "count": len(ids), "dim": int(matrix.shape[1]) if len(ids) else 0,
+                       "departments": labels}, f, indent=2)
+        return cls(directory)
+
+    @classmethod
+    def from_collection(cls, collection, directory, dtype="float32", page_size=5_000):
+        """Export a Chroma collection (embeddings included) into an index."""
+        ids, documents, metadatas, embeddings = [], [], [], []
+        for offset in range(0, collection.count(), page_size):
+            page = collection.get(include=["documents", "metadatas", "embeddings"], limit=page_size, offset=offset)
+            ids += page["ids"]
+            documents += page["documents"]
+            metadatas += page["metadatas"]
+            embeddings += list(page["embeddings"])
+        return cls.build(directory, ids, documents, metadatas, embeddings, dtype=dtype)
+
+    def count(self):
+        return int(self.embeddings.shape[0])
+
+    def mask_for(self, departments):
+        """Boolean row mask for any of ``departments``, or None for no filter."""
+        if departments is None:
+            return None
+        packed = np.zeros(self.masks.shape[1], dtype=np.uint8)
+        for label in departments:
+            if label in self._codes:
+                packed |= self.masks[self._codes[label]]
+        return np.unpackbits(packed, count=self.count()).astype(bool)
+
+    def search(self, query_embeddings, k, departments=None):
+        """
+        Exact cosine top-k.
+
+        Args:
+            query_embeddings: Q x D query matrix (normalised here).
+            k: Results per query.
+            departments: Optional department labels to restrict to.
+
+        Returns:
+            tuple: (rows, scores), each Q x k' with k' <= k, best first.
+        """
+        queries = _normalise(query_embeddings)
+        n = self.count()
+        scores = np.empty((queries.shape[0], n), dtype=np.float32)
+        for start in range(0, n, BLOCK_ROWS):
+            block = np.asarray(self.embeddings[start:start + BLOCK_ROWS], dtype=np.float32)
+            scores[:, start:start + BLOCK_ROWS] = queries @ block.T
+
+        mask = self.mask_for(departments)
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+            k = min(k, int(mask.sum()))
+        k = min(k, n)
+        if k == 0:
+            return np.zeros((queries.shape[0], 0), np.int64), np.zeros((queries.shape[0], 0), np.float32)
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def record(self, row):
+        """Load one row's id, document and metadata from records.jsonl."""
+        return self._records.record(row)
+
+    def query(self, query_embeddings, n_results, departments=None):
+        """Chroma-compatible query: returns a dict of per-query id/document/metadata lists."""
+        rows, scores = self.search(query_embeddings, n_results, departments)
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for row_list, score_list in zip(rows, scores):
+            records = [self.record(int(row)) for row in row_list]
+            results["ids"].append([r["id"] for r in records])
+            results["documents"].append([r["document"] for r in records])
+            results["metadatas"].append([r["metadata"] for r in records])
+            results["distances"].append([float(1 - s) for s in score_list])
+        return results
+
+
+def benchmark(index, collection, embed, queries, n_results=3, repeats=5):
+    """
+    Compare filtered-query latency and top-k agreement with Chroma.
+
+    Returns:
+        list[dict]: One row per scope with mean latencies and id overlap.
+    """
+    embeddings = [list(e) for e in embed(queries)]
+    scopes = [None] + list(index.labels)
+    rows = []
+    for scope in scopes:
+        where = {"department": scope} if scope else None
+        departments = [scope] if scope else None
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            chroma = collection.query(query_embeddings=embeddings, n_results=n_results, where=where)
+        chroma_ms = (time.perf_counter() - start) / (repeats * len(queries)) * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            numpy_rows, _ = index.search(embeddings, n_results, departments)
+        numpy_ms = (time.perf_counter() - start) / (repeats * len(queries)) * 1000
+
+        overlap = []
+        for qi, chroma_ids in enumerate(chroma["ids"]):
+            ours = {index.record(int(r))["id"] for r in numpy_rows[qi]}
+            overlap.append(len(ours & set(chroma_ids)) / max(len(chroma_ids), 1))
+        rows.append({
+            "scope": scope or "ALL",
+            "chroma_ms": chroma_ms,
+            "numpy_ms": numpy_ms,
+            "topk_overlap": sum(overlap) / len(overlap),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or benchmark the memory-mapped vector index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="Export the configured Chroma collection into an index.")
+    build_cmd.add_argument("--out", required=True)
+    build_cmd.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    bench_cmd = sub.add_parser("bench", help="Benchmark filtered queries against Chroma.")
+    bench_cmd.add_argument("--index", required=True)
+    bench_cmd.add_argument("--queries", nargs="*", default=[
+        "Should we pause the AWS migration to save cash?",
+        "How do we reduce enterprise churn?",
+        "What is blocking enterprise sales?",
+        "Is our infrastructure stable enough?",
+    ])
+    cli = parser.parse_args()
+
+    import retriever
+
+    if cli.command == "build":
+        start = time.perf_counter()
+        index = VectorIndex.from_collection(retriever.get_store().global_shard, cli.out, dtype=cli.dtype)
+        size = index.embeddings.nbytes / 1e6
+        print(f"Built {index.count()} rows ({cli.dtype}, {size:.1f} MB) in {time.perf_counter() - start:.1f}s -> {cli.out}")
+    else:
+        start = time.perf_counter()
+        index = VectorIndex(cli.index)
+        print(f"Opened {index.count()} rows in {(time.perf_counter() - start) * 1000:.1f}ms")
+        print(f"\n{'SCOPE':<10} {'CHROMA ms':>10} {'NUMPY ms':>10} {'TOP-K OVERLAP':>14}")
+        for row in benchmark(index, retriever.get_store().global_shard, retriever.embedding_function, cli.queries):
+            print(f"{row['scope']:<10} {row['chroma_ms']:>10.2f} {row['numpy_ms']:>10.2f} {row['topk_overlap']:>14.0%}")
@@ -0,0 +1,242 @@
+"""
+Fake LM - Deterministic Offline Stand-In for the Council Models.
+
+This module provides a dspy.BaseLM that never leaves the process. It sleeps
+for a latency drawn from a per-model distribution and then answers in the
+ChatAdapter ``[[ ## field ## ]]`` format (or JSON when dspy falls back to
+the JSONAdapter), filling every requested output field with generated
+text. The council's orchestration can therefore be run, timed and
+profiled without an OpenRouter key or a local Ollama.
+
+Profile (JSON; keys of "models" are matched as substrings of the model
+name, first match wins, anything else uses "default"):
+    {
+      "seed": 0,
+      "time_scale": 1.0,
+      "default": {"latency": 1.0, "jitter": 0.3, "distribution": "lognormal",
+                  "tokens": [30, 120], "failure_rate": 0.0},
+      "models": {"405b": {"latency": 3.0}, "llama-3.2-3b": {"latency": 0.4}}
+    }
+
+    latency            Median seconds to the first token ("fixed": exact,
+                       "uniform": latency +- jitter*latency, "lognormal":
+                       sigma = jitter).
+    tokens             [min, max] words per generated text field.
+    tokens_per_second  Generation speed after the first token (unset: instant).
+    failure_rate       Probability that a call raises FakeLMError.
+
+    stand_in_server.py reads the same profile plus error_429_rate,
+    error_5xx_rate, rate_limit_rpm and max_concurrency.
+
+Usage:
+    SOVEREIGN_FAKE_LM=default            built-in profile
+    SOVEREIGN_FAKE_LM=profile.json       profile file
+    SOVEREIGN_FAKE_LM='{"time_scale": 0.1}'
+
+    config.create_model() returns a FakeLM whenever SOVEREIGN_FAKE_LM is
+    set (both config.py files put the repository root on sys.path).
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import dspy
+
+
+DEFAULT_PROFILE = {
+    "seed": 0,
+    "time_scale": 1.0,
+    "default": {
+        "latency": 1.0, "jitter": 0.3, "distribution": "lognormal", "tokens": [30, 120],
+        "tokens_per_second": None, "failure_rate": 0.0,
+        "error_429_rate": 0.0, "error_5xx_rate": 0.0, "rate_limit_rpm": None, "max_concurrency": None,
+    },
+    "models": {
+        "hermes-3-llama-3.1-405b": {"latency": 3.0, "tokens": [60, 180]},
+        "llama-3.3-70b": {"latency": 1.5},
+        "mistral-small": {"latency": 0.9},
+        "mistral-7b": {"latency": 0.6, "tokens": [20, 80]},
+        "llama-3.2-3b": {"latency": 0.4, "tokens": [20, 80]},
+        "gemini": {"latency": 0.8},
+    },
+}
+
+VOCABULARY = (
+    "runway burn revenue churn margin roadmap migration latency capacity budget "
+    "pipeline customers retention pricing hiring vendor compliance risk growth "
+    "stability forecast quarter cost savings infrastructure rollout priority "
+    "tradeoff investment metric target segment launch outage backlog"
+).split()
+
+CHAT_FIELD = re.compile(r"`\[\[ ## (\w+) ## \]\]`")
+JSON_FIELDS = re.compile(r"Respond with a JSON object in the following order of fields: (.*)")
+JSON_FIELD = re.compile(r"`(\w+)`")
+
+
+class FakeLMError(RuntimeError):
+    """Injected provider failure."""
+
+
+def load_profile(spec):
+    """
+    Resolve a SOVEREIGN_FAKE_LM value to a profile dict.
+
+    Args:
+        spec: "default"/"1", a path to a JSON file, or inline JSON. Values
+            given are merged over DEFAULT_PROFILE.
+    """
+    overrides = {}
+    if spec and spec not in ("1", "default", "on", "true"):
+        if os.path.exists(spec):
+            with open(spec, "r", encoding="utf-8") as f:
+                overrides = json.load(f)
+        else:
+            overrides = json.loads(spec)
+
+    profile = {**DEFAULT_PROFILE, **overrides}
+    profile["default"] = {**DEFAULT_PROFILE["default"], **overrides.get("default", {})}
+    profile["models"] = {**DEFAULT_PROFILE["models"], **overrides.get("models", {})}
+    return profile
+
+
+_attempts = Counter()
+_attempts_lock = threading.Lock()
+
+
+def model_spec(profile, model):
+    """Profile settings for ``model``: "default" overlaid with the first matching "models" entry."""
+    spec = dict(profile["default"])
+    for pattern, overrides in profile["models"].items():
+        if pattern in model:
+            spec.update(overrides)
+            break
+    return spec
+
+
+def seeded_rng(profile, model, messages):
+    """RNG keyed by seed, model, prompt and how often that prompt has been seen."""
+    digest = hashlib.sha256(json.dumps([model, messages], sort_keys=True, default=str).encode()).hexdigest()
+    with _attempts_lock:
+        attempt = _attempts[digest]
+        _attempts[digest] += 1
+    return random.Random(f"{profile['seed']}:{digest}:{attempt}")
+
+
+def sample_latency(spec, rng, time_scale=1.0):
+    """Seconds until the first token."""
+    latency, jitter = spec["latency"], spec["jitter"]
+    distribution = spec["distribution"]
+    if distribution == "fixed":
+        seconds = latency
+    elif distribution == "uniform":
+        seconds = rng.uniform(latency * (1 - jitter), latency * (1 + jitter))
+    else:
+        seconds = latency * math.exp(rng.gauss(0.0, jitter))
+    return max(seconds, 0.0) * time_scale
+
+
+def generation_time(spec, content, time_scale=1.0):
+    """Seconds spent emitting ``content`` at the model's tokens_per_second (0 if unset)."""
+    if not spec.get("tokens_per_second"):
+        return 0.0
+    return len(content.split()) / spec["tokens_per_second"] * time_scale
+
+
+def _value(field, spec, rng):
+    if "score" in field:
+        return f"{rng.uniform(1.0, 10.0):.1f}"
+    if field == "route":
+        return rng.choice(["FAST_LANE", "DEEP_LANE"])
+    low, high = spec["tokens"]
+    return " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(low, high))).capitalize() + "."
+
+
+def complete(messages, spec, rng):
+    """
+    Completion text satisfying the output fields requested in the last message.
+
+    ChatAdapter prompts get ``[[ ## field ## ]]`` sections ending with
+    ``[[ ## completed ## ]]``; JSONAdapter prompts get a JSON object. A
+    prompt that names no fields gets plain text.
+    """
+    request = str(messages[-1]["content"])
+    json_fields = JSON_FIELDS.search(request)
+    if json_fields:
+        fields = JSON_FIELD.findall(json_fields.group(1))
+        return json.dumps({field: _value(field, spec, rng) for field in fields})
+
+    fields = [f for f in CHAT_FIELD.findall(request) if f != "completed"]
+    if not fields:
+        return _value("text", spec, rng)
+    content = "\n\n".join(f"[[ ## {field} ## ]]\n{_value(field, spec, rng)}" for field in fields)
+    return content + "\n\n[[ ## completed ## ]]"
+
+
+def usage(messages, content):
+    """Word-count approximation of OpenAI usage."""
+    counts = {
+        "prompt_tokens": sum(len(str(m["content"]).split()) for m in messages),
+        "completion_tokens": len(content.split()),
+    }
+    counts["total_tokens"] = counts["prompt_tokens"] + counts["completion_tokens"]
+    return counts
+
+
+class FakeLM(dspy.BaseLM):
+    """
+    Deterministic fake for dspy.LM.
+
+    The same model, prompt and attempt number always give the same latency,
+    failure and output, so repeated benchmark runs are comparable. Counters
+    are class-wide so a benchmark can read totals across every instance.
+    """
+
+    calls = Counter()
+    failures = Counter()
+    _lock = threading.Lock()
+
+    def __init__(self, model, profile=None, **kwargs):
+        super().__init__(model=model, cache=False, **kwargs)
+        self.profile = profile if isinstance(profile, dict) else load_profile(profile)
+        self.spec = model_spec(self.profile, model)
+
+    @classmethod
+    def reset_counters(cls):
+        with cls._lock:
+            cls.calls.clear()
+            cls.failures.clear()
+        with _attempts_lock:
+            _attempts.clear()
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        messages = messages or [{"role": "user", "content": prompt}]
+        rng = seeded_rng(self.profile, self.model, messages)
+        time.sleep(sample_latency(self.spec, rng, self.profile["time_scale"]))
+
+        with self._lock:
+            FakeLM.calls[self.model] += 1
+        if rng.random() < self.spec["failure_rate"]:
+            with self._lock:
+                FakeLM.failures[self.model] += 1
+            raise FakeLMError(f"{self.model}: injected failure")
+
+        content = complete(messages, self.spec, rng)
+        time.sleep(generation_time(self.spec, content, self.profile["time_scale"]))
+
+        counts = usage(messages, content)
+        if dspy.settings.usage_tracker:
+            dspy.settings.usage_tracker.add_usage(self.model, counts)
+
+        return SimpleNamespace(
+            model=self.model,
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content, tool_calls=None), finish_reason="stop")],
+            usage=counts,
+        )
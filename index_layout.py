@@ -0,0 +1,64 @@
+"""
+Index Layout - Row Records and Department Codes for the Local Indexes.
+
+demo-cloud-version/vector_index.py and sovereign-engine/quantized_index.py
+keep their rows on disk the same way:
+
+    records.jsonl    id / document / metadata per row
+    offsets.npy      N+1 byte offsets into records.jsonl
+    departments.npy  N uint16 department codes (labels listed in meta.json)
+"""
+
+import json
+import pathlib
+import threading
+
+import numpy as np
+
+
+def department_codes(metadatas):
+    """
+    Department labels and per-row codes.
+
+    Returns:
+        tuple: (labels sorted, uint16 array of each row's label index).
+
+    Raises:
+        ValueError: More department labels than a uint16 code can hold.
+    """
+    labels = sorted({m.get("department", "GENERAL") for m in metadatas})
+    if len(labels) > np.iinfo(np.uint16).max + 1:
+        raise ValueError(f"{len(labels)} department labels exceed the uint16 department codes")
+    code_of = {label: code for code, label in enumerate(labels)}
+    codes = np.array([code_of[m.get("department", "GENERAL")] for m in metadatas], dtype=np.uint16)
+    return labels, codes
+
+
+def write_records(directory, ids, documents, metadatas):
+    """Write records.jsonl and offsets.npy into ``directory``."""
+    directory = pathlib.Path(directory)
+    offsets = [0]
+    with open(directory / "records.jsonl", "wb") as f:
+        for record_id, doc, meta in zip(ids, documents, metadatas):
+            line = json.dumps({"id": record_id, "document": doc, "metadata": meta}, ensure_ascii=False)
+            f.write(line.encode("utf-8") + b"\n")
+            offsets.append(f.tell())
+    np.save(directory / "offsets.npy", np.array(offsets, dtype=np.int64))
+
+
+class RecordReader:
+    """Random access to the rows of records.jsonl through offsets.npy."""
+
+    def __init__(self, directory):
+        directory = pathlib.Path(directory)
+        self.offsets = np.load(directory / "offsets.npy", mmap_mode="r")
+        self._file = open(directory / "records.jsonl", "rb")
+        self._lock = threading.Lock()
+
+    def record(self, row):
+        """Load one row's id, document and metadata."""
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        with self._lock:
+            self._file.seek(start)
+            raw = self._file.read(end - start)
+        return json.loads(raw)
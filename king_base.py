@@ -8,15 +8,36 @@ synthesizes the final decision using a higher-capacity model.
 Architecture:
     - Worker Agents: Low-latency models for rapid inference during debate rounds.
     - Sovereign Agent: High-capacity model for final verdict synthesis.
-    - Shared Context: Cumulative transcript enabling cross-agent awareness.
+    - Shared Context: Cumulative transcript enabling cross-agent awareness,
+      or (context_mode="rolling") a bounded rolling state: latest stances,
+      the last K verbatim turns and an incrementally folded summary.
 """
 
 import dspy
 import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from session_log import DEFAULT_LOG_PATH, SessionLog, Transcript
 
 # Model Configuration
-expert_lm = dspy.LM(model='openrouter/google/gemini-3-flash-preview', api_key=os.getenv("OPENROUTER_API_KEY"), api_base="https://openrouter.ai/api/v1")
-leader_lm = dspy.LM(model='openrouter/meta-llama/llama-3.3-70b-instruct', api_key=os.getenv("OPENROUTER_API_KEY"), api_base="https://openrouter.ai/api/v1")
+def create_model(model_name):
+    """
+    OpenRouter LM, or fake_lm.FakeLM when SOVEREIGN_FAKE_LM is set (offline runs).
+
+    SOVEREIGN_API_BASE overrides the endpoint, e.g. a local stand_in_server.py.
+    """
+    if os.getenv("SOVEREIGN_FAKE_LM"):
+        from fake_lm import FakeLM
+        return FakeLM(model_name, os.getenv("SOVEREIGN_FAKE_LM"))
+    api_base = os.getenv("SOVEREIGN_API_BASE", "https://openrouter.ai/api/v1")
+    return dspy.LM(model=model_name, api_key=os.getenv("OPENROUTER_API_KEY"), api_base=api_base)
+
+expert_lm = create_model('openrouter/google/gemini-3-flash-preview')
+leader_lm = create_model('openrouter/meta-llama/llama-3.3-70b-instruct')
 
 dspy.settings.configure(lm=expert_lm)
 
@@ -53,25 +74,98 @@ class CouncilMember:
         self.role = role
         self.objective = objective
         self.brain = dspy.ChainOfThought(DebateTurn)
+        self.current_stance = None
     
     def speak(self, history):
         """
         Generate contextual response based on debate transcript.
         
         Args:
-            history: Full transcript of preceding debate exchanges.
+            history: Full transcript (or rolling context) of preceding exchanges.
             
         Returns:
-            str: Agent's response to current debate state.
+            str: Agent's response to current debate state. The condensed
+            position is kept on ``current_stance``.
         """
         pred = self.brain(
             role=self.role, 
             objective=self.objective, 
             discussion_log=history
         )
+        self.current_stance = pred.current_stance
         return pred.response
 
 
+class SummarizeDebate(dspy.Signature):
+    """
+    Signature for folding older debate turns into a running summary.
+    
+    Keeps the arguments, concessions and open disagreements so members can
+    still rebut points that have left the verbatim window.
+    """
+    previous_summary = dspy.InputField(desc="Summary of the debate so far (may be empty)")
+    new_turns = dspy.InputField(desc="Turns leaving the verbatim window, oldest first")
+    updated_summary = dspy.OutputField(desc="Concise summary covering previous_summary and new_turns")
+
+
+class RollingContext:
+    """
+    Bounded debate state for long round tables.
+    
+    Each member sees the topic, every member's latest stance, the last
+    ``window`` turns verbatim and a summary of everything older. Turns
+    leaving the window are folded into the summary once per round, so the
+    prompt size stays flat however many rounds are run.
+    
+    Attributes:
+        topic: Debate topic.
+        summary: Folded summary of turns older than the window.
+        stances: Member name -> (role, latest stance).
+        summary_calls: LLM calls spent on folding.
+    """
+    
+    def __init__(self, topic, window=3):
+        self.topic = topic
+        self.summary = ""
+        self.stances = {}
+        self.summary_calls = 0
+        self._recent = deque()
+        self._window = window
+        self._evicted = []
+        self._summarizer = dspy.Predict(SummarizeDebate)
+    
+    def record(self, member, entry):
+        """Add a finished turn and the member's updated stance."""
+        self.stances[member.name] = (member.role, member.current_stance)
+        self._recent.append(entry)
+        while len(self._recent) > self._window:
+            self._evicted.append(self._recent.popleft())
+    
+    def fold(self):
+        """Merge evicted turns into the summary with a single LLM call."""
+        if not self._evicted:
+            return
+        pred = self._summarizer(previous_summary=self.summary or "(none)", new_turns="".join(self._evicted))
+        self.summary = pred.updated_summary
+        self.summary_calls += 1
+        self._evicted = []
+    
+    def render(self):
+        """Prompt text for the next speaker."""
+        parts = [f"EMNE: {self.topic}\n"]
+        if self.summary:
+            parts.append(f"\nSUMMARY OF EARLIER DEBATE:\n{self.summary}\n")
+        if self.stances:
+            parts.append("\nCURRENT STANCES:\n" + "".join(
+                f"- {name} ({role}): {stance}\n" for name, (role, stance) in self.stances.items()
+            ))
+        if self._evicted:
+            parts.append("\nEARLIER THIS ROUND:\n" + "".join(self._evicted))
+        if self._recent:
+            parts.append("\nRECENT TURNS:" + "".join(self._recent))
+        return "".join(parts)
+
+
 class FinalVerdict(dspy.Signature):
     """
     Signature for sovereign arbiter's final decision synthesis.
@@ -83,7 +177,145 @@ class FinalVerdict(dspy.Signature):
     decision = dspy.OutputField(desc="Executive decision with resource allocation")
 
 
-def run_round_table(topic, rounds=2):
+def stance_similarity(previous, current):
+    """Word-overlap (Jaccard) similarity of two stance statements, 0..1."""
+    a = set(re.findall(r"\w+", (previous or "").lower()))
+    b = set(re.findall(r"\w+", (current or "").lower()))
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _speak_all(council, context):
+    """All members answer the same context in parallel; replies in council order."""
+    with ThreadPoolExecutor(max_workers=len(council)) as pool:
+        return list(pool.map(lambda member: member.speak(context), council))
+
+
+DEFAULT_COUNCIL = [
+    ("Alpha", "Hardware Extremist", "Maksimer performance, ignorér pris."),
+    ("Beta", "Software Purist", "Alt skal løses med kode. Hardware er spild."),
+    ("Delta", "CFO (Finans)", "Spar penge. Stop unødvendige indkøb."),
+]
+
+
+def build_council(specs=None):
+    """Create CouncilMembers from (name, role, objective) tuples. Default: DEFAULT_COUNCIL."""
+    return [CouncilMember(name, role, objective) for name, role, objective in (specs or DEFAULT_COUNCIL)]
+
+
+def debate(council, topic, rounds=2, context_mode="full", window=3, turn_mode="sequential",
+           adaptive=False, max_rounds=6, convergence=0.8, label="", session_log=None):
+    """
+    Run the debate rounds for one group of members (no verdict).
+    
+    Args:
+        council: CouncilMembers taking part.
+        topic: Strategic question for council deliberation.
+        rounds: Number of complete debate cycles. Default: 2.
+        context_mode: "full" passes the whole transcript to every turn;
+            "rolling" passes a bounded RollingContext (flat per-turn cost,
+            suited to 10+ rounds). Default: "full".
+        window: Verbatim turns kept in rolling mode. Default: 3.
+        turn_mode: "sequential" lets each member see the replies before
+            theirs in the same round; "simultaneous" has all members answer
+            the end-of-previous-round context in parallel, so a round takes
+            as long as its slowest member. Default: "sequential".
+        adaptive: Ignore ``rounds`` and keep debating until every member's
+            current_stance is at least ``convergence`` similar to their
+            previous one (stance_similarity), or ``max_rounds`` is hit.
+        max_rounds: Round cap in adaptive mode. Default: 6.
+        convergence: Similarity threshold in adaptive mode. Default: 0.8.
+        label: Prefix for progress output (used by group debates).
+        session_log: Optional started SessionLog; each turn is flushed to
+            it as soon as it is produced.
+        
+    Returns:
+        dict: transcript, verdict_context (what the Sovereign should read),
+        round_timings and stop_reason.
+    """
+    transcript = Transcript(f"EMNE: {topic}\n")
+    rolling = RollingContext(topic, window) if context_mode == "rolling" else None
+    round_timings = []
+    
+    def record(member, response, context):
+        entry = f"\n[{member.name} ({member.role})]:\n{response}\n"
+        transcript.append(entry)
+        if session_log:
+            session_log.turn(member.name, member.role, response, label=label)
+        if rolling:
+            rolling.record(member, entry)
+        print(f"{label}[{member.name}] ({len(context)} chars context): {response[:100]}...")
+    
+    stop_reason = f"fixed {rounds} rounds"
+    total_rounds = max_rounds if adaptive else rounds
+    
+    for r in range(1, total_rounds + 1):
+        print(f"\n{label}--- ROUND {r} ({turn_mode}) ---")
+        start = time.perf_counter()
+        previous_stances = [member.current_stance for member in council]
+        
+        if turn_mode == "simultaneous":
+            context = rolling.render() if rolling else transcript.text()
+            for member, response in zip(council, _speak_all(council, context)):
+                record(member, response, context)
+        else:
+            for member in council:
+                context = rolling.render() if rolling else transcript.text()
+                record(member, member.speak(context), context)
+        
+        if rolling:
+            rolling.fold()
+        round_timings.append(time.perf_counter() - start)
+        print(f"   {label}[ROUND {r}] {round_timings[-1]:.1f}s")
+        
+        if adaptive and r > 1:
+            agreement = min(
+                stance_similarity(before, member.current_stance)
+                for before, member in zip(previous_stances, council)
+            )
+            print(f"   {label}[CONVERGENCE] min stance similarity {agreement:.2f} (threshold {convergence:.2f})")
+            if agreement >= convergence:
+                # Each skipped round: one call per member, plus the rolling summary fold.
+                saved = (total_rounds - r) * (len(council) + (1 if rolling else 0))
+                stop_reason = f"stances converged after round {r} (min similarity {agreement:.2f}), {saved} LLM calls saved"
+                break
+    else:
+        if adaptive:
+            stop_reason = f"max_rounds={max_rounds} reached without convergence"
+    
+    print(f"\n{label}[STOP] {stop_reason}")
+    if rolling:
+        print(f"   {label}[ROLLING] {rolling.summary_calls} summary folds, window {window} turns")
+    
+    return {
+        "transcript": transcript.text(),
+        "verdict_context": rolling.render() if rolling else transcript.text(),
+        "round_timings": round_timings,
+        "stop_reason": stop_reason,
+    }
+
+
+def _format_timings(result, turn_mode):
+    timings = "".join(f"Round {r}: {t:.1f}s\n" for r, t in enumerate(result["round_timings"], 1))
+    return f"ROUND TIMINGS ({turn_mode}):\n{timings}\nSTOPPED: {result['stop_reason']}"
+
+
+def _sovereign_verdict(debate_context, session_log=None):
+    print("\n[SOVEREIGN] Synthesizing final verdict...")
+    with dspy.context(lm=leader_lm):
+        sov_brain = dspy.ChainOfThought(FinalVerdict)
+        verdict = sov_brain(debate_transcript=debate_context).decision
+    if session_log:
+        session_log.turn("Sovereign", "Final Verdict", verdict)
+    return verdict
+
+
+def _open_log(log_path):
+    return SessionLog(log_path) if log_path else nullcontext()
+
+
+def run_round_table(topic, rounds=2, council=None, log_path=DEFAULT_LOG_PATH, **debate_options):
     """
     Execute multi-round council deliberation on specified topic.
     
@@ -94,43 +326,118 @@ def run_round_table(topic, rounds=2):
     Args:
         topic: Strategic question for council deliberation.
         rounds: Number of complete debate cycles. Default: 2.
+        council: CouncilMembers to seat. Default: build_council().
+        log_path: Session log that every turn is streamed to as it is
+            produced (see session_log.py), or None.
+            Default: .council_logs/session.log.
+        **debate_options: context_mode, window, turn_mode, adaptive,
+            max_rounds and convergence; see debate().
         
     Side Effects:
-        - Writes debate transcript and verdict to council_debate_log.txt
+        - Writes debate transcript, per-round timings and verdict to
+          council_debate_log.txt
         - Prints real-time debate progress to stdout.
     """
     print(f"\n--- COUNCIL CONVENED: '{topic}' ---")
     
-    council = [
-        CouncilMember("Alpha", "Hardware Extremist", "Maksimer performance, ignorér pris."),
-        CouncilMember("Beta", "Software Purist", "Alt skal løses med kode. Hardware er spild."),
-        CouncilMember("Delta", "CFO (Finans)", "Spar penge. Stop unødvendige indkøb.")
-    ]
+    council = council or build_council()
+    with _open_log(log_path) as session_log:
+        result = debate(council, topic, rounds=rounds, session_log=session_log, **debate_options)
+        transcript = result["transcript"]
+        verdict = _sovereign_verdict(result["verdict_context"], session_log)
     
-    transcript = f"EMNE: {topic}\n"
+    print(f"\n{'='*40}\nDEBATE TRANSCRIPT:\n{transcript}\n{'='*40}")
+    print(f"\nVERDICT:\n{verdict}")
     
-    for r in range(1, rounds + 1):
-        print(f"\n--- ROUND {r} ---")
-        
-        for member in council:
-            response = member.speak(transcript)
-            entry = f"\n[{member.name} ({member.role})]:\n{response}\n"
-            transcript += entry
-            print(f"[{member.name}]: {response[:100]}...")
+    turn_mode = debate_options.get("turn_mode", "sequential")
+    with open("council_debate_log.txt", "w", encoding="utf-8") as f:
+        f.write(transcript + "\n\n" + _format_timings(result, turn_mode) + "\n\nVERDICT:\n" + verdict)
+    return verdict
 
-    print("\n[SOVEREIGN] Synthesizing final verdict...")
+
+def _split(members, group_size):
+    """Contiguous groups of at most ``group_size``, sizes differing by at most one."""
+    count = -(-len(members) // group_size)
+    base, extra = divmod(len(members), count)
+    groups, start = [], 0
+    for i in range(count):
+        end = start + base + (1 if i < extra else 0)
+        groups.append(members[start:end])
+        start = end
+    return groups
+
+
+def _representative(level, index, group):
+    """Spokesperson carrying a group's final stances into the next level."""
+    positions = "; ".join(f"{member.name}: {member.current_stance}" for member in group)
+    return CouncilMember(
+        f"L{level}G{index}",
+        f"Spokesperson for {', '.join(member.name for member in group)}",
+        f"Represent the group's conclusions and defend them: {positions}",
+    )
+
+
+def run_hierarchical_debate(topic, council=None, group_size=3, rounds=2, log_path=DEFAULT_LOG_PATH,
+                            **debate_options):
+    """
+    Sharded debate for large councils.
     
-    with dspy.context(lm=leader_lm):
-        sov_brain = dspy.ChainOfThought(FinalVerdict)
-        verdict = sov_brain(debate_transcript=transcript).decision
+    Members are split into groups of ``group_size`` that debate in
+    parallel. Each group is then represented by a spokesperson carrying
+    its members' final stances, and the spokespeople are grouped again
+    until at most ``group_size`` remain. They hold the final round before
+    FinalVerdict. Depth, and so wall-clock, grows with log(N), and every
+    prompt only holds one group's context.
     
-    print(f"\n{'='*40}\nDEBATE TRANSCRIPT:\n{transcript}\n{'='*40}")
+    Args:
+        topic: Strategic question for council deliberation.
+        council: CouncilMembers to seat (any N). Default: build_council().
+        group_size: Members per group. Default: 3.
+        rounds: Rounds per group debate. Default: 2.
+        log_path: Session log streamed by every group, or None.
+        **debate_options: Forwarded to debate().
+        
+    Side Effects:
+        - Writes every group transcript, timings and the verdict to
+          council_debate_log.txt
+    """
+    if group_size < 2:
+        raise ValueError("group_size must be at least 2")
+    members = council or build_council()
+    print(f"\n--- HIERARCHICAL COUNCIL CONVENED: '{topic}' ({len(members)} members, groups of {group_size}) ---")
+    
+    turn_mode = debate_options.get("turn_mode", "sequential")
+    with _open_log(log_path) as session_log:
+        log = []
+        level = 1
+        while len(members) > group_size:
+            groups = _split(members, group_size)
+            print(f"\n=== LEVEL {level}: {len(members)} members in {len(groups)} groups ===")
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+                results = list(pool.map(
+                    lambda numbered: debate(numbered[1], topic, rounds=rounds, label=f"[L{level}G{numbered[0]}] ",
+                                            session_log=session_log, **debate_options),
+                    enumerate(groups, 1),
+                ))
+            print(f"   [LEVEL {level}] {time.perf_counter() - start:.1f}s")
+            for index, result in enumerate(results, 1):
+                log.append(f"--- LEVEL {level} / GROUP {index} ---\n{result['transcript']}\n{_format_timings(result, turn_mode)}")
+            members = [_representative(level, index, group) for index, group in enumerate(groups, 1)]
+            level += 1
+        
+        print(f"\n=== FINAL ROUND: {len(members)} members ===")
+        final = debate(members, topic, rounds=rounds, label="[FINAL] ", session_log=session_log,
+                       **debate_options)
+        log.append(f"--- FINAL ROUND ---\n{final['transcript']}\n{_format_timings(final, turn_mode)}")
+        verdict = _sovereign_verdict(final["verdict_context"], session_log)
     print(f"\nVERDICT:\n{verdict}")
     
     with open("council_debate_log.txt", "w", encoding="utf-8") as f:
-        f.write(transcript + "\n\nVERDICT:\n" + verdict)
+        f.write("\n\n".join(log) + "\n\nVERDICT:\n" + verdict)
+    return verdict
 
 
 if __name__ == "__main__":
     spørgsmål = "Skal vi migrere vores database til Cloud eller bygge vores eget datacenter i kælderen?"
-    run_round_table(spørgsmål, rounds=2)
\ No newline at end of file
+    run_round_table(spørgsmål, rounds=2)
@@ -0,0 +1,87 @@
+"""
+Lexical Pre-Router - In-Process Routing of Obvious Queries.
+
+Shared by demo-cloud-version/router.py and sovereign-engine/router.py,
+which put it in front of their LLM complexity router. Confidently trivial
+or strategic queries are settled from keyword hits and length without an
+LLM call; only the uncertain middle band reaches the model.
+
+Both engines' config.py put the repository root on sys.path, so this
+module imports as ``lexical_router`` from either directory.
+"""
+
+import re
+
+import dspy
+
+
+class LexicalPreRouter:
+    """
+    In-process lexical scorer that settles obvious queries without an LLM call.
+
+    Scores a query on the same 1-10 scale as AssessComplexity from keyword
+    hits and length. Queries below ``fast_below`` or above ``deep_above``
+    are routed immediately; the uncertain middle band returns None so the
+    caller can delegate to RouterModule.
+    """
+
+    STRATEGIC_TERMS = {
+        "should", "strategy", "strategic", "migrate", "migration", "invest",
+        "investment", "budget", "hire", "hiring", "layoff", "layoffs", "pause",
+        "cut", "cuts", "runway", "burn", "churn", "roadmap", "acquire",
+        "acquisition", "pricing", "expand", "expansion", "risk", "risks",
+        "tradeoff", "tradeoffs", "prioritize", "versus", "vs", "allocate",
+        "restructure", "pivot", "enterprise", "compliance", "security",
+        "vendor", "outsource", "roi", "margin", "forecast", "impact",
+    }
+    TRIVIAL_TERMS = {
+        "hi", "hello", "hey", "thanks", "thank", "define", "definition",
+        "meaning", "spell", "translate", "acronym", "stand", "time", "date",
+        "today", "weather", "joke", "name", "who", "where", "when",
+    }
+    DECISION_PHRASES = ("should we", "do we", "is it worth", "what if", "how do we", "pros and cons")
+
+    def __init__(self, fast_below=2.5, deep_above=7.0):
+        self.fast_below = fast_below
+        self.deep_above = deep_above
+
+    def score(self, query):
+        """Lexical complexity estimate on a 1-10 scale."""
+        text = query.lower()
+        tokens = re.findall(r"[a-z0-9$%]+", text)
+        if not tokens:
+            return 1.0
+
+        strategic = sum(1 for t in tokens if t in self.STRATEGIC_TERMS)
+        trivial = sum(1 for t in tokens if t in self.TRIVIAL_TERMS)
+        decisions = sum(1 for p in self.DECISION_PHRASES if p in text)
+        figures = sum(1 for t in tokens if t.startswith("$") or t.endswith("%") or t.isdigit())
+
+        score = 3.0
+        score += 1.5 * min(strategic, 4)
+        score += 1.5 * decisions
+        score += 0.5 * min(figures, 2)
+        score -= 1.0 * min(trivial, 2)
+        if len(tokens) <= 4:
+            score -= 1.5
+        elif len(tokens) >= 25:
+            score += 1.5
+        elif len(tokens) >= 12:
+            score += 0.5
+        return max(1.0, min(10.0, score))
+
+    def __call__(self, query):
+        """Return a routing prediction, or None if the query is in the uncertain band."""
+        score = self.score(query)
+        if score < self.fast_below:
+            route = "FAST_LANE"
+        elif score > self.deep_above:
+            route = "DEEP_LANE"
+        else:
+            return None
+
+        return dspy.Prediction(
+            route=route,
+            score=score,
+            reasoning=f"LEXICAL PRE-ROUTER: confident {route} from keywords and length (no LLM call)."
+        )
@@ -0,0 +1,55 @@
+"""
+Router Batch - Throughput Report for a File of Queries.
+
+Backs ``interactive.py --batch`` in both engines: every query is routed
+with the engine's route_queries, then the routing decisions, throughput
+and latency percentiles are printed.
+"""
+
+import sys
+import time
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def run_batch(source, route_queries, max_workers=8):
+    """
+    Classify every non-empty line of a file (or stdin when source is '-').
+
+    Prints one routing decision per query followed by throughput and
+    latency percentiles for the whole batch.
+
+    Args:
+        source: Path of the query file, or '-' for stdin.
+        route_queries: The engine's router.route_queries.
+        max_workers: Concurrent classifications.
+    """
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    queries = [line.strip() for line in lines if line.strip()]
+    if not queries:
+        print("No queries to route.")
+        return
+
+    print(f"\n--- SOVEREIGN ROUTER BATCH ({len(queries)} queries, {max_workers} workers) ---")
+    start = time.perf_counter()
+    results = route_queries(queries, max_workers=max_workers)
+    elapsed = time.perf_counter() - start
+
+    for query, result in zip(queries, results):
+        lane_icon = "[FAST]" if result.route == "FAST_LANE" else "[DEEP]"
+        print(f"   {lane_icon} {result.score:>4}/10 {result.latency * 1000:9.1f}ms  {query}")
+
+    latencies = sorted(r.latency * 1000 for r in results)
+    print(f"\n   THROUGHPUT: {len(queries) / elapsed:.1f} queries/s ({elapsed:.2f}s total)")
+    print(f"   LATENCY:    p50 {percentile(latencies, 50):.1f}ms | p90 {percentile(latencies, 90):.1f}ms | "
+          f"p99 {percentile(latencies, 99):.1f}ms | max {latencies[-1]:.1f}ms\n")
@@ -0,0 +1,132 @@
+"""
+Session Log - Append-Only Streaming Writer for Council Debate Logs.
+
+This module writes debate turns to disk as they are produced, in the
+timestamped format of council_logs.txt, so a crash mid-debate keeps every
+finished turn. The in-memory transcript used for prompts is accumulated
+in an io.StringIO instead of repeated string concatenation.
+
+Format:
+    ============================================================
+    SESSION START: YYYY-MM-DD HH:MM:SS
+    ============================================================
+    [HH:MM:SS] Name (Role):            ([HH:MM:SS] [L1G2] Name (Role): in group debates)
+    text
+    ------------------------------
+
+Rotation:
+    When the log has reached ``max_bytes`` at the start of a session it is
+    renamed to <log>.1 (gzip-compressed to <log>.1.gz if enabled), older
+    backups shift up by one and at most ``backups`` are kept.
+"""
+
+import gzip
+import io
+import os
+import shutil
+import threading
+import time
+
+
+# Untracked by default (see .gitignore); created on first use.
+DEFAULT_LOG_PATH = os.path.join(".council_logs", "session.log")
+
+SESSION_RULE = "=" * 60
+TURN_RULE = "-" * 30
+
+
+class Transcript:
+    """In-memory debate transcript backed by io.StringIO."""
+
+    def __init__(self, header=""):
+        self._buffer = io.StringIO()
+        self._buffer.write(header)
+
+    def append(self, entry):
+        self._buffer.write(entry)
+
+    def text(self):
+        return self._buffer.getvalue()
+
+    def __str__(self):
+        return self.text()
+
+
+class SessionLog:
+    """
+    Line-buffered, append-only session log with rotation.
+
+    Attributes:
+        path: Active log file.
+        max_bytes: Size at which the log is rotated before a new session.
+        backups: Rotated files kept.
+        compress: Gzip rotated files.
+    """
+
+    def __init__(self, path=DEFAULT_LOG_PATH, max_bytes=5_000_000, backups=5, compress=True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _backup_name(self, index):
+        return f"{self.path}.{index}" + (".gz" if self.compress else "")
+
+    def _rotate(self):
+        """Shift <log>.N backups up by one and move the active log to <log>.1."""
+        oldest = self._backup_name(self.backups)
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(self._backup_name(index)):
+                os.replace(self._backup_name(index), self._backup_name(index + 1))
+
+        if self.compress:
+            with open(self.path, "rb") as src, gzip.open(self._backup_name(1), "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self._backup_name(1))
+        print(f"   [LOG] Rotated {self.path} -> {self._backup_name(1)}")
+
+    def _write(self, text):
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError("SessionLog.start() must be called before writing")
+            self._file.write(text)
+            self._file.flush()
+
+    def start(self):
+        """Begin a session: rotate if needed, open for append and write the header."""
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                if self.backups and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                    self._rotate()
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        self._write(f"\n{SESSION_RULE}\nSESSION START: {time.strftime('%Y-%m-%d %H:%M:%S')}\n{SESSION_RULE}\n")
+        return self
+
+    def turn(self, name, role, text, label=""):
+        """
+        Append one speaker turn and flush it to disk.
+
+        ``label`` (e.g. "[L1G2]") tags the debate group, so turns that
+        parallel group debates interleave in one log stay attributable.
+        """
+        tag = f"{label.strip()} " if label.strip() else ""
+        self._write(f"[{time.strftime('%H:%M:%S')}] {tag}{name} ({role}):\n{text}\n{TURN_RULE}\n")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -5,15 +5,38 @@ This module configures the Sovereign Engine to run entirely on local infrastruct
 using Ollama. No data leaves the perimeter.
 """
 
+import os
+import pathlib
+import sys
+
 import dspy
 
+# Modules shared by both engines (fake_lm.py, lexical_router.py, ...) live
+# at the repository root.
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
+# Ollama endpoint, for inference and embeddings. stand_in_server.py
+# (repository root) serves the same API for offline load tests.
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+
+# Offline runs: a deterministic fake LM (fake_lm.py at the repository root)
+# replaces every model. Value: "default", a profile JSON file or inline JSON.
+FAKE_LM_PROFILE = os.getenv("SOVEREIGN_FAKE_LM")
+
 def create_model(model_name: str):
     """
     Factory for Local Inference using Ollama.
-    Assumes Ollama is running on localhost:11434.
+    Assumes Ollama is running at OLLAMA_URL (default localhost:11434).
+    Returns a fake_lm.FakeLM instead when SOVEREIGN_FAKE_LM is set.
     """
+    if FAKE_LM_PROFILE:
+        from fake_lm import FakeLM
+        return FakeLM(model_name, FAKE_LM_PROFILE)
     return dspy.Ollama(
         model=model_name,
+        base_url=OLLAMA_URL,
         max_tokens=4000,
         timeout=120
     )
@@ -25,4 +48,14 @@ def get_cmo_model():
     return create_model("llama3")
 
 def get_coo_model():
-    return create_model("llama3")
\ No newline at end of file
+    return create_model("llama3")
+
+# Query complexity router (router.py / interactive.py).
+ROUTER_MODEL = os.getenv("SOVEREIGN_ROUTER_MODEL", "mistral")
+
+# --- Retrieval (local) ---
+# Ollama embeddings + quantized index built with
+# `python quantized_index.py build <docs> --out <path> --mode int8|binary|float32`.
+EMBEDDING_MODEL = os.getenv("SOVEREIGN_EMBEDDING_MODEL", "nomic-embed-text")
+QUANTIZED_INDEX_PATH = os.getenv("SOVEREIGN_INDEX_PATH", "kb_index")
+QUANTIZATION_MODE = os.getenv("SOVEREIGN_QUANTIZATION", "int8")
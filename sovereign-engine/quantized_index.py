@@ -0,0 +1,317 @@
+"""
+Quantized Index - Compact Embedding Storage for Air-Gapped Retrieval.
+
+Full-precision embeddings dominate retriever memory once the document set
+grows (a 768-d float32 vector is 3 KB). This index keeps only a compact
+code per chunk in RAM for the first-pass search, then re-scores the best
+candidates at full precision from a memory-mapped file on disk.
+
+Modes:
+    - int8:   symmetric per-row scale, codes in [-127, 127]  (D + 4 bytes)
+    - binary: sign bits packed 8 per byte, Hamming distance  (D / 8 bytes)
+    - float32: no quantization, exact reference              (4 * D bytes)
+
+On-disk layout:
+    codes.npy        N x D int8 codes, or N x D/8 packed bits (binary)
+    scales.npy       N float32 row scales (int8 only)
+    embeddings.npy   N x D float32, L2-normalised (rescoring only)
+    departments.npy  N uint16 department codes
+    records.jsonl    id / document / metadata per row (index_layout.py)
+    offsets.npy      N+1 byte offsets into records.jsonl
+    meta.json        mode, dimensions and department labels
+
+Documents are chunked by the shared chunking.py, the same rules ingest.py
+uses for the cloud engine. Embeddings come from the local Ollama server in
+batches, so nothing leaves the box.
+
+Usage:
+    python quantized_index.py build ./company_docs --out ./kb_index --mode int8
+    python quantized_index.py bench --index ./kb_index [--self-queries 200]
+"""
+
+import argparse
+import json
+import pathlib
+import time
+import urllib.request
+
+import numpy as np
+
+import config
+from chunking import iter_chunks
+from index_layout import RecordReader, department_codes, write_records
+
+
+MODES = ("int8", "binary", "float32")
+BLOCK_ROWS = 16_384
+RESCORE_FACTOR = {"int8": 4, "binary": 10, "float32": 1}
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+EMBED_BATCH = 64
+
+
+def embed(texts, model=None, base_url=None, batch_size=EMBED_BATCH):
+    """Embed texts with the local Ollama /api/embed endpoint, ``batch_size`` texts per request."""
+    model = model or config.EMBEDDING_MODEL
+    base_url = base_url or config.OLLAMA_URL
+    texts = list(texts)
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        request = urllib.request.Request(
+            f"{base_url}/api/embed",
+            data=json.dumps({"model": model, "input": texts[start:start + batch_size]}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=120) as response:
+            vectors.extend(json.load(response)["embeddings"])
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _normalise(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        # One vector becomes one row; an empty list is zero rows.
+        matrix = matrix[None, :] if matrix.size else matrix.reshape(0, 0)
+    if matrix.size == 0:
+        return matrix.reshape(0, matrix.shape[1])
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def quantize_int8(matrix):
+    """Per-row symmetric int8 quantization. Returns (codes, scales)."""
+    if len(matrix) == 0:
+        return np.zeros(matrix.shape, np.int8), np.zeros(0, np.float32)
+    scales = np.maximum(np.abs(matrix).max(axis=1), 1e-12) / 127.0
+    codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(matrix):
+    """Sign bits, packed 8 per byte."""
+    return np.packbits(matrix > 0, axis=1)
+
+
+def resident_bytes_per_vector(mode, dim):
+    """RAM needed per chunk for the first-pass search in ``mode``."""
+    return {"int8": dim + 4, "binary": (dim + 7) // 8, "float32": 4 * dim}[mode] + 2  # + department code
+
+
+class QuantizedIndex:
+    """
+    Two-stage index: quantized first pass in RAM, float32 rescoring from disk.
+
+    Attributes:
+        directory: Index directory.
+        mode: One of MODES.
+        labels: Department labels, indexed by department code.
+    """
+
+    def __init__(self, directory):
+        self.directory = pathlib.Path(directory)
+        with open(self.directory / "meta.json", "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.mode = self.meta["mode"]
+        self.dim = self.meta["dim"]
+        self.labels = self.meta["departments"]
+        self._codes_by_label = {label: code for code, label in enumerate(self.labels)}
+
+        # First-pass data is loaded into RAM; full precision stays on disk.
+        self.embeddings = np.load(self.directory / "embeddings.npy", mmap_mode="r")
+        if self.mode == "float32":
+            self.codes, self.scales = np.array(self.embeddings), None
+        else:
+            self.codes = np.load(self.directory / "codes.npy")
+            self.scales = np.load(self.directory / "scales.npy") if self.mode == "int8" else None
+        self.departments = np.load(self.directory / "departments.npy")
+        self._records = RecordReader(self.directory)
+
+    @classmethod
+    def build(cls, directory, ids, documents, metadatas, embeddings, mode="int8"):
+        """
+        Write an index directory from parallel lists and return it opened.
+
+        An empty input gives an empty index whose searches return no rows.
+
+        Raises:
+            ValueError: Unknown mode, or more department labels than a
+                uint16 code can hold.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        labels, departments = department_codes(metadatas)
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        matrix = _normalise(embeddings)
+
+        if mode == "int8":
+            codes, scales = quantize_int8(matrix)
+            np.save(directory / "codes.npy", codes)
+            np.save(directory / "scales.npy", scales)
+        elif mode == "binary":
+            np.save(directory / "codes.npy", quantize_binary(matrix))
+
+        write_records(directory, ids, documents, metadatas)
+        np.save(directory / "embeddings.npy", matrix)
+        np.save(directory / "departments.npy", departments)
+        with open(directory / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({"mode": mode, "count": len(ids), "dim": int(matrix.shape[1]), "departments": labels}, f, indent=2)
+        return cls(directory)
+
+    def count(self):
+        return int(self.departments.shape[0])
+
+    def resident_bytes(self):
+        """Bytes held in RAM by the first-pass arrays."""
+        total = self.codes.nbytes + self.departments.nbytes
+        return total + (self.scales.nbytes if self.scales is not None else 0)
+
+    def _first_pass(self, query):
+        """Approximate similarity of one normalised query to every row."""
+        n = self.count()
+        scores = np.empty(n, dtype=np.float32)
+        if self.mode == "binary":
+            bits = quantize_binary(query[None, :])[0]
+        for start in range(0, n, BLOCK_ROWS):
+            block = self.codes[start:start + BLOCK_ROWS]
+            if self.mode == "binary":
+                # Higher is better: negative Hamming distance.
+                scores[start:start + len(block)] = -POPCOUNT[np.bitwise_xor(block, bits)].sum(axis=1, dtype=np.int32)
+            elif self.mode == "int8":
+                scores[start:start + len(block)] = (block @ query) * self.scales[start:start + len(block)]
+            else:
+                scores[start:start + len(block)] = block @ query
+        return scores
+
+    def search(self, query_embedding, k, departments=None, rescore_factor=None):
+        """
+        Top-k rows for one query.
+
+        Args:
+            query_embedding: Query vector (normalised here).
+            k: Number of results.
+            departments: Optional department labels to restrict to.
+            rescore_factor: Candidates kept from the first pass, as a
+                multiple of k, before exact rescoring (default per mode,
+                see RESCORE_FACTOR).
+
+        Returns:
+            tuple: (rows, scores) arrays, best first, scores exact cosine.
+        """
+        query = _normalise(query_embedding)[0]
+        scores = self._first_pass(query)
+
+        if departments is not None:
+            codes = [self._codes_by_label[label] for label in departments if label in self._codes_by_label]
+            scores[~np.isin(self.departments, codes)] = -np.inf
+            available = int(np.isfinite(scores).sum())
+        else:
+            available = self.count()
+
+        k = min(k, available)
+        if k == 0:
+            return np.zeros(0, np.int64), np.zeros(0, np.float32)
+
+        candidates = min(available, k * (rescore_factor or RESCORE_FACTOR[self.mode]))
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        if self.mode != "float32":
+            top = np.sort(top)  # sequential disk reads
+            scores_top = np.asarray(self.embeddings[top], dtype=np.float32) @ query
+        else:
+            scores_top = scores[top]
+        order = np.argsort(-scores_top)[:k]
+        return top[order], scores_top[order]
+
+    def record(self, row):
+        """Load one row's id, document and metadata from records.jsonl."""
+        return self._records.record(row)
+
+
+def benchmark(index, reference, queries, ks=(1, 3, 10)):
+    """
+    Recall@k of ``index`` against an unquantized ``reference`` index.
+
+    Args:
+        index: QuantizedIndex under test.
+        reference: float32 QuantizedIndex over the same rows (exact search).
+        queries: Q x D query embeddings.
+
+    Returns:
+        dict: recall per k, mean latencies and memory per million chunks.
+    """
+    recall = {k: [] for k in ks}
+    timings = {"index_ms": 0.0, "reference_ms": 0.0}
+    for query in queries:
+        for k in ks:
+            start = time.perf_counter()
+            exact, _ = reference.search(query, k)
+            timings["reference_ms"] += time.perf_counter() - start
+            start = time.perf_counter()
+            approx, _ = index.search(query, k)
+            timings["index_ms"] += time.perf_counter() - start
+            recall[k].append(len(set(exact.tolist()) & set(approx.tolist())) / max(len(exact), 1))
+
+    calls = len(queries) * len(ks)
+    return {
+        "mode": index.mode,
+        "recall": {k: sum(v) / len(v) for k, v in recall.items()},
+        "index_ms": timings["index_ms"] / calls * 1000,
+        "reference_ms": timings["reference_ms"] / calls * 1000,
+        # bytes per vector x 1M vectors / 1e6 bytes per MB
+        "resident_mb_per_1m": resident_bytes_per_vector(index.mode, index.dim),
+        "float32_mb_per_1m": resident_bytes_per_vector("float32", index.dim),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or benchmark the quantized retrieval index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="Embed a document tree and write an index.")
+    build_cmd.add_argument("root", help="Directory whose top-level folders are departments.")
+    build_cmd.add_argument("--out", default=config.QUANTIZED_INDEX_PATH)
+    build_cmd.add_argument("--mode", choices=MODES, default=config.QUANTIZATION_MODE)
+    bench_cmd = sub.add_parser("bench", help="Recall@k and memory against the unquantized index.")
+    bench_cmd.add_argument("--index", default=config.QUANTIZED_INDEX_PATH)
+    bench_cmd.add_argument("--queries", nargs="*", default=[
+        "Should we pause the AWS migration to save cash?",
+        "How do we reduce enterprise churn?",
+        "Is our infrastructure stable enough?",
+    ])
+    bench_cmd.add_argument("--self-queries", type=int, default=0,
+                           help="Use N stored chunks as queries instead of embedding --queries (no Ollama needed).")
+    cli = parser.parse_args()
+
+    if cli.command == "build":
+        start = time.perf_counter()
+        ids, documents, metadatas = [], [], []
+        for chunk_id, text, meta in iter_chunks(cli.root):
+            ids.append(chunk_id)
+            documents.append(text)
+            metadatas.append(meta)
+        print(f"   [INDEX] Embedding {len(ids)} chunks with {config.EMBEDDING_MODEL}...")
+        index = QuantizedIndex.build(cli.out, ids, documents, metadatas, embed(documents), mode=cli.mode)
+        print(f"Built {index.count()} rows ({cli.mode}, {index.resident_bytes() / 1e6:.1f} MB resident) "
+              f"in {time.perf_counter() - start:.1f}s -> {cli.out}")
+    else:
+        index = QuantizedIndex(cli.index)
+        reference_dir = pathlib.Path(cli.index) / "reference"
+        if not (reference_dir / "meta.json").exists():
+            rows = [index.record(row) for row in range(index.count())]
+            QuantizedIndex.build(reference_dir, [r["id"] for r in rows], [r["document"] for r in rows],
+                                 [r["metadata"] for r in rows], np.asarray(index.embeddings), mode="float32")
+        reference = QuantizedIndex(reference_dir)
+
+        if cli.self_queries:
+            rng = np.random.default_rng(0)
+            picks = rng.choice(index.count(), size=min(cli.self_queries, index.count()), replace=False)
+            queries = np.asarray(index.embeddings[np.sort(picks)]) + rng.normal(0, 0.05, (len(picks), index.dim))
+        else:
+            queries = embed(cli.queries)
+
+        result = benchmark(index, reference, queries)
+        print(f"\n{index.count()} chunks, {index.dim}-d, mode={result['mode']}")
+        print(f"   MEMORY / 1M CHUNKS: {result['resident_mb_per_1m']:.0f} MB resident "
+              f"(float32: {result['float32_mb_per_1m']:.0f} MB)")
+        print(f"   LATENCY:            {result['index_ms']:.2f}ms (exact: {result['reference_ms']:.2f}ms)")
+        for k, value in result["recall"].items():
+            print(f"   RECALL@{k:<3}         {value:.1%}")
@@ -1,20 +1,40 @@
 """
-Retriever Module - Knowledge Graph RAG Interface (Stub Implementation).
+Retriever Module - Knowledge Graph RAG Interface.
 
 This module provides the retrieval interface for department-specific
-context injection. Currently implements a stubbed version with simulated
-company data; production deployment would integrate with a vector database
-(e.g., Pinecone, Weaviate, ChromaDB).
+context injection. When a quantized index has been built (see
+quantized_index.py) queries are embedded with the local Ollama server and
+answered from it; otherwise a stubbed version with simulated company data
+is served.
 
 Note:
-    RAG integration is stubbed for demonstration purposes.
-    Replace search_graph_rag with actual vector DB queries for production.
+    Build the index with
+    `python quantized_index.py build <docs> --out <SOVEREIGN_INDEX_PATH>`.
+    int8 storage cuts resident memory ~4x and binary ~32x versus float32,
+    with full-precision rescoring of the top candidates from disk.
 """
 
+import os
 import time
 
+import config
 
-def search_graph_rag(query, department_focus):
+
+_index = None
+
+
+def get_index():
+    """Return the quantized index if one exists at config.QUANTIZED_INDEX_PATH, else None."""
+    global _index
+    if _index is None and os.path.exists(os.path.join(config.QUANTIZED_INDEX_PATH, "meta.json")):
+        from quantized_index import QuantizedIndex
+        _index = QuantizedIndex(config.QUANTIZED_INDEX_PATH)
+        print(f"   [GraphRAG] Loaded {_index.mode} index: {_index.count()} chunks, "
+              f"{_index.resident_bytes() / 1e6:.1f} MB resident")
+    return _index
+
+
+def search_graph_rag(query, department_focus, n_results=3):
     """
     Retrieve department-specific context from knowledge graph.
     
@@ -25,16 +45,24 @@ def search_graph_rag(query, department_focus):
     Args:
         query: Original user query for context relevance
         department_focus: Department identifier for scoped retrieval
+        n_results: Chunks retrieved when a quantized index is available
         
     Returns:
-        str: Retrieved context documents (currently stubbed data)
-        
-    Note:
-        Production implementation should replace static data with
-        vector similarity search against embedded corporate documents.
+        str: Retrieved context documents (stubbed data without an index)
     """
     print(f"   [GraphRAG] Querying secure vault for context: {department_focus}...")
 
+    index = get_index()
+    if index is not None:
+        from quantized_index import embed
+        label = department_focus.split()[0] if department_focus else None
+        departments = [label] if label in index.labels else None
+        rows, _ = index.search(embed([query])[0], n_results, departments)
+        if len(rows):
+            records = [index.record(int(row)) for row in rows]
+            return "\n\n".join(f"[{r['metadata'].get('source', 'Unknown')}]: {r['document']}" for r in records)
+        return "[No relevant context found in knowledge base]"
+
     # Stubbed corporate data (replace with vector DB retrieval)
     common_knowledge = """
     [CONFIDENTIAL COMPANY DATA]
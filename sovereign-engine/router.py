@@ -8,6 +8,7 @@ responses) or DEEP_LANE (full council deliberation).
 Architecture:
     - AssessComplexity: DSPy signature for complexity scoring
     - RouterModule: Chain-of-thought classification module
+    - LexicalPreRouter: In-process keyword/length scorer for obvious queries
     - route_query: Public API with manual override capability
 
 Routing Logic:
@@ -16,7 +17,11 @@ Routing Logic:
 """
 
 import dspy
-from config import lm
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import config
+from lexical_router import LexicalPreRouter
 
 
 class AssessComplexity(dspy.Signature):
@@ -37,8 +42,9 @@ class RouterModule(dspy.Module):
     """
     
     def __init__(self):
-        """Initialize router with complexity assessment signature."""
+        """Initialize router with its local model and complexity assessment signature."""
         super().__init__()
+        self.lm = config.create_model(config.ROUTER_MODEL)
         self.assess = dspy.ChainOfThought(AssessComplexity)
 
     def forward(self, query):
@@ -51,7 +57,8 @@ class RouterModule(dspy.Module):
         Returns:
             dspy.Prediction: Contains route, score, and reasoning
         """
-        result = self.assess(query=query)
+        with dspy.context(lm=self.lm):
+            result = self.assess(query=query)
 
         try:
             score = float(result.complexity_score)
@@ -67,7 +74,22 @@ class RouterModule(dspy.Module):
         )
 
 
-def route_query(query_text, force_deep=False):
+PRE_ROUTER = LexicalPreRouter()
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """Return the shared, warm RouterModule instance (created on first use)."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = RouterModule()
+        return _router
+
+
+def route_query(query_text, force_deep=False, use_pre_router=True):
     """
     Route query to appropriate processing pipeline.
     
@@ -78,6 +100,8 @@ def route_query(query_text, force_deep=False):
     Args:
         query_text: User's input query
         force_deep: If True, bypass classification and force council assembly
+        use_pre_router: If True, settle confidently trivial or strategic
+            queries lexically and only call the LLM for the uncertain band
         
     Returns:
         dspy.Prediction: Contains route, score, and reasoning fields
@@ -89,5 +113,34 @@ def route_query(query_text, force_deep=False):
             reasoning="MANUAL OVERRIDE: User requested Council assembly explicitly."
         )
 
-    router = RouterModule()
-    return router(query=query_text)
+    if use_pre_router:
+        decision = PRE_ROUTER(query_text)
+        if decision is not None:
+            return decision
+
+    return get_router()(query=query_text)
+
+
+def route_queries(queries, max_workers=8, force_deep=False, use_pre_router=True):
+    """
+    Route many queries concurrently with the shared RouterModule.
+
+    Args:
+        queries: Iterable of query strings.
+        max_workers: Upper bound on queries classified at the same time.
+        force_deep: Passed through to route_query for every query.
+        use_pre_router: Passed through to route_query for every query.
+
+    Returns:
+        list[dspy.Prediction]: One prediction per query, in input order,
+        each carrying its own ``latency`` in seconds.
+    """
+    def timed_route(query_text):
+        start = time.perf_counter()
+        result = route_query(query_text, force_deep=force_deep, use_pre_router=use_pre_router)
+        result.latency = time.perf_counter() - start
+        return result
+
+    get_router()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(timed_route, queries))
@@ -0,0 +1,343 @@
+"""
+Stand-In Server - Local OpenAI/Ollama-Compatible Endpoint for Load Tests.
+
+This module serves the chat-completions API used by demo-cloud-version
+(OpenRouter is OpenAI-compatible) and the Ollama API used by
+sovereign-engine, answering with fake_lm's templated completions. Unlike
+fake_lm.FakeLM, requests go through the real HTTP path: litellm, connection
+pooling, provider errors, retries and the llm_executor concurrency caps.
+
+Endpoints:
+    POST /v1/chat/completions   OpenAI (JSON or SSE with "stream": true)
+    GET  /v1/models
+    POST /api/chat              Ollama (NDJSON stream unless "stream": false)
+    POST /api/generate          Ollama
+    POST /api/embeddings        Ollama, deterministic pseudo-embeddings
+    POST /api/embed             Ollama (batch)
+    GET  /api/tags
+    GET  /stats                 Requests, connections and errors per model
+
+Behaviour per model comes from a fake_lm profile: latency distribution,
+tokens_per_second (streaming pace), error_429_rate, error_5xx_rate,
+rate_limit_rpm (sliding one-minute window) and max_concurrency (requests
+beyond it get a 429 with Retry-After).
+
+Usage:
+    python stand_in_server.py --port 8808 --profile profile.json
+    SOVEREIGN_API_BASE=http://localhost:8808/v1 streamlit run dashboard.py
+    OLLAMA_URL=http://localhost:8808 python sovereign-engine/interactive.py
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fake_lm
+
+
+EMBEDDING_DIM = 768
+
+
+class ModelGate:
+    """Per-model rate limit (requests per minute) and concurrency cap."""
+
+    def __init__(self, rpm=None, max_concurrency=None):
+        self.rpm = rpm
+        self.max_concurrency = max_concurrency
+        self._recent = deque()
+        self._in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Admit a request, or return the Retry-After seconds for a 429."""
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= 60:
+                self._recent.popleft()
+            if self.rpm and len(self._recent) >= self.rpm:
+                return max(1, math.ceil(60 - (now - self._recent[0])))
+            if self.max_concurrency and self._in_flight >= self.max_concurrency:
+                return 1
+            self._recent.append(now)
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+            return None
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+
+class StandInState:
+    """Profile, per-model gates and counters shared by all handler threads."""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.gates = {}
+        self.stats = defaultdict(Counter)
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def spec(self, model):
+        return fake_lm.model_spec(self.profile, model)
+
+    def gate(self, model):
+        with self._lock:
+            if model not in self.gates:
+                spec = self.spec(model)
+                self.gates[model] = ModelGate(spec.get("rate_limit_rpm"), spec.get("max_concurrency"))
+            return self.gates[model]
+
+    def count(self, model, event):
+        with self._lock:
+            self.stats[model][event] += 1
+
+    def snapshot(self):
+        with self._lock:
+            models = {model: dict(counter) for model, counter in self.stats.items()}
+            for model, gate in self.gates.items():
+                models.setdefault(model, {})["peak_in_flight"] = gate.peak_in_flight
+            return {"connections": self.connections, "models": models}
+
+
+def embed(text, dim=EMBEDDING_DIM):
+    """Deterministic unit vector derived from the text's hash."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _chunks(content, words_per_chunk=3):
+    words = content.split(" ")
+    for i in range(0, len(words), words_per_chunk):
+        yield " ".join(words[i:i + words_per_chunk]) + (" " if i + words_per_chunk < len(words) else "")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 keep-alive handler; one instance per connection."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "SovereignStandIn/1.0"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def setup(self):
+        super().setup()
+        with self.state._lock:
+            self.state.connections += 1
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # --- Responses ---
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_chunked(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_chunked(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _error(self, status, message, kind, headers=None):
+        self._send_json(status, {"error": {"message": message, "type": kind, "code": status}}, headers)
+
+    # --- Routing ---
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/models":
+            models = list(self.state.profile["models"])
+            self._send_json(200, {"object": "list", "data": [{"id": m, "object": "model", "owned_by": "stand-in"} for m in models]})
+        elif self.path.rstrip("/") == "/api/tags":
+            self._send_json(200, {"models": [{"name": m, "model": m} for m in self.state.profile["models"]]})
+        elif self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.state.snapshot())
+        else:
+            self._error(404, f"Unknown path {self.path}", "not_found")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._error(400, "Request body is not valid JSON", "invalid_request_error")
+            return
+
+        path = self.path.rstrip("/")
+        if path == "/api/embeddings":
+            self._send_json(200, {"embedding": embed(body.get("prompt", ""))})
+        elif path == "/api/embed":
+            inputs = body.get("input", [])
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            self._send_json(200, {"model": body.get("model"), "embeddings": [embed(text) for text in inputs]})
+        elif path in ("/v1/chat/completions", "/chat/completions"):
+            self._complete(body, body.get("messages") or [], self._openai)
+        elif path == "/api/chat":
+            self._complete(body, body.get("messages") or [], self._ollama)
+        elif path == "/api/generate":
+            self._complete(body, [{"role": "user", "content": body.get("prompt", "")}], self._ollama)
+        else:
+            self._error(404, f"Unknown path {self.path}", "not_found")
+
+    def _complete(self, body, messages, respond):
+        model = body.get("model") or "unknown"
+        spec = self.state.spec(model)
+        scale = self.state.profile["time_scale"]
+        self.state.count(model, "requests")
+
+        gate = self.state.gate(model)
+        retry_after = gate.acquire()
+        if retry_after is not None:
+            self.state.count(model, "rate_limited")
+            self._error(429, f"Rate limit exceeded for {model}", "rate_limit_exceeded", {"Retry-After": str(retry_after)})
+            return
+
+        try:
+            rng = fake_lm.seeded_rng(self.state.profile, model, messages)
+            roll = rng.random()
+            if roll < spec.get("error_429_rate", 0.0):
+                self.state.count(model, "error_429")
+                self._error(429, f"{model} is temporarily rate-limited upstream", "rate_limit_exceeded", {"Retry-After": "1"})
+                return
+            if roll < spec.get("error_429_rate", 0.0) + spec.get("error_5xx_rate", 0.0):
+                status = rng.choice([500, 502, 503])
+                self.state.count(model, f"error_{status}")
+                self._error(status, f"{model}: injected upstream error", "server_error")
+                return
+
+            time.sleep(fake_lm.sample_latency(spec, rng, scale))
+            content = fake_lm.complete(messages, spec, rng)
+            respond(model, body, messages, content, spec, scale)
+            self.state.count(model, "completed")
+        finally:
+            gate.release()
+
+    def _pace(self, spec, piece, scale):
+        time.sleep(fake_lm.generation_time(spec, piece, scale))
+
+    def _openai(self, model, body, messages, content, spec, scale):
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        usage = fake_lm.usage(messages, content)
+
+        if not body.get("stream"):
+            self._pace(spec, content, scale)
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        def event(delta, finish_reason=None, **extra):
+            chunk = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}], **extra,
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+
+        self._start_chunked("text/event-stream")
+        event({"role": "assistant", "content": ""})
+        for piece in _chunks(content):
+            self._pace(spec, piece, scale)
+            event({"content": piece})
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+        event({}, "stop", **({"usage": usage} if include_usage else {}))
+        self._write_chunk("data: [DONE]\n\n")
+        self._end_chunked()
+
+    def _ollama(self, model, body, messages, content, spec, scale):
+        chat = self.path.rstrip("/") == "/api/chat"
+        usage = fake_lm.usage(messages, content)
+        start = time.time()
+
+        def record(text, done):
+            payload = {"model": model, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "done": done}
+            if chat:
+                payload["message"] = {"role": "assistant", "content": text}
+            else:
+                payload["response"] = text
+            if done:
+                payload.update({
+                    "done_reason": "stop",
+                    "total_duration": int((time.time() - start) * 1e9),
+                    "prompt_eval_count": usage["prompt_tokens"],
+                    "eval_count": usage["completion_tokens"],
+                })
+            return payload
+
+        if body.get("stream") is False:
+            self._pace(spec, content, scale)
+            self._send_json(200, record(content, True))
+            return
+
+        self._start_chunked("application/x-ndjson")
+        for piece in _chunks(content):
+            self._pace(spec, piece, scale)
+            self._write_chunk(json.dumps(record(piece, False)) + "\n")
+        self._write_chunk(json.dumps(record("", True)) + "\n")
+        self._end_chunked()
+
+
+def make_server(host="127.0.0.1", port=8808, profile="default", verbose=False):
+    """Create (but do not start) a stand-in server for ``profile`` (see fake_lm.load_profile)."""
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    server.state = StandInState(profile if isinstance(profile, dict) else fake_lm.load_profile(profile))
+    server.verbose = verbose
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenAI/Ollama-compatible stand-in for load testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--profile", default="default", help="fake_lm profile: 'default', a JSON file or inline JSON.")
+    parser.add_argument("--time-scale", type=float, help="Multiply all latencies.")
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.profile, args.verbose)
+    if args.time_scale is not None:
+        server.state.profile["time_scale"] = args.time_scale
+    print(f"\n[STAND-IN] Serving OpenAI (/v1) and Ollama (/api) on http://{args.host}:{args.port}")
+    print(f"   [CONFIG] SOVEREIGN_API_BASE=http://{args.host}:{args.port}/v1  OLLAMA_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[STAND-IN] Stopped")
+        print(json.dumps(server.state.snapshot(), indent=2))
@@ -0,0 +1,38 @@
+"""
+Test setup: the repository root and demo-cloud-version on sys.path.
+
+The engines import their modules by bare name from their own directory
+(and shared ones from the root, see config.py), so the tests do the same.
+Both engines ship a config.py; sovereign-engine modules are loaded with
+the ``sovereign_module`` fixture, which imports them against their own.
+"""
+
+import importlib
+import pathlib
+import sys
+
+import pytest
+
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+SOVEREIGN_DIR = ROOT / "sovereign-engine"
+
+for path in (ROOT, ROOT / "demo-cloud-version"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+@pytest.fixture(scope="session")
+def sovereign_module():
+    """Import a sovereign-engine module by name, with sovereign-engine/config.py as ``config``."""
+    def load(name):
+        demo_config = sys.modules.pop("config", None)
+        sys.path.insert(0, str(SOVEREIGN_DIR))
+        try:
+            return importlib.import_module(name)
+        finally:
+            sys.path.remove(str(SOVEREIGN_DIR))
+            sys.modules.pop("config", None)
+            if demo_config is not None:
+                sys.modules["config"] = demo_config
+    return load
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+pytest.importorskip("dspy")
+pytest.importorskip("dotenv")
+pytest.importorskip("chromadb")
+
+import batch_council
+
+
+def _write_queries(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    """Replace the council with a recorder so run_batch runs offline."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(batch_council, "warmup", lambda: None)
+    ran = []
+
+    def run_pipeline(record, checkpoint_dir, on_phase=None):
+        ran.append(record["id"])
+        on_phase("route", 0.01)
+        return {"id": record["id"], "query": record["query"], "phases": {"route": {"output": {"route": "FAST_LANE"}}}}
+
+    monkeypatch.setattr(batch_council, "run_pipeline", run_pipeline)
+    return ran
+
+
+def test_load_queries_assigns_ids_and_drops_duplicates(tmp_path):
+    path = tmp_path / "queries.jsonl"
+    _write_queries(path, [
+        {"query": "Pause the migration?"},
+        {"query": "Pause the migration?"},
+        {"id": "q1", "query": "Cut marketing?"},
+        {"id": "q1", "query": "Cut marketing spend?"},
+        {"query": "Pause the migration?", "persona": "Growth first."},
+    ])
+
+    records = batch_council.load_queries(path)
+
+    assert len(records) == 3
+    assert records[1] == {"id": "q1", "query": "Cut marketing?", "persona": batch_council.DEFAULT_PERSONA}
+    assert len({r["id"] for r in records}) == 3
+
+
+def test_finished_ids_drops_a_truncated_last_line(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"id": "q1"}\n{"id": "q2"}\n{"id": "q3", "phases": {"ro', encoding="utf-8")
+
+    assert batch_council.finished_ids(str(output)) == {"q1", "q2"}
+    assert output.read_text(encoding="utf-8") == '{"id": "q1"}\n{"id": "q2"}\n'
+
+
+def test_finished_ids_terminates_a_complete_last_line(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"id": "q1"}', encoding="utf-8")
+
+    assert batch_council.finished_ids(str(output)) == {"q1"}
+    assert output.read_text(encoding="utf-8") == '{"id": "q1"}\n'
+
+
+def test_finished_ids_rejects_a_corrupt_middle_line(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"id": "q1"}\n{"id": \n{"id": "q3"}\n', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        batch_council.finished_ids(str(output))
+
+
+def test_resume_after_a_truncated_output_line(pipeline, tmp_path):
+    queries, output = tmp_path / "queries.jsonl", tmp_path / "results.jsonl"
+    _write_queries(queries, [{"id": f"q{i}", "query": f"Question {i}?"} for i in range(4)] + [{"id": "q0", "query": "again"}])
+    output.write_text('{"id": "q0"}\n{"id": "q1", "phases": {"rou', encoding="utf-8")
+
+    stats = batch_council.run_batch(str(queries), str(output), checkpoint_dir=str(tmp_path / "ckpt"), parallel=2)
+
+    assert sorted(pipeline) == ["q1", "q2", "q3"]
+    assert stats["queries_completed"] == 3 and stats["queries_failed"] == 0
+    assert sorted(r["id"] for r in _lines(output)) == ["q0", "q1", "q2", "q3"]
+
+    pipeline.clear()
+    batch_council.run_batch(str(queries), str(output), checkpoint_dir=str(tmp_path / "ckpt"))
+    assert pipeline == []
@@ -0,0 +1,67 @@
+from bm25_index import BM25Index, intersect, reciprocal_rank_fusion, tokenize
+
+
+RECORDS = [
+    ("fin_0", "Burn rate rose to $1.2M per month; runway is 14 months.", {"department": "FINANCE"}),
+    ("fin_1", "Quarterly revenue grew 8% on enterprise renewals.", {"department": "FINANCE"}),
+    ("tech_0", "The AWS migration is blocked on SSO for enterprise tenants.", {"department": "TECH"}),
+    ("tech_1", "Database latency is stable after the last upgrade.", {"department": "TECH"}),
+    ("growth_0", "Churn among enterprise accounts doubled after the price change.", {"department": "GROWTH"}),
+    ("general_0", "Office hours moved to Thursday.", {}),
+]
+
+
+def _index():
+    return BM25Index.from_records(RECORDS)
+
+
+def _ids(index, hits):
+    return [index.ids[doc] for doc, _ in hits]
+
+
+def test_tokenize_keeps_figures_and_bigrams():
+    tokens = tokenize("What is our burn rate at $1.2M?")
+
+    assert "$1.2m" in tokens
+    assert "burn_rate" in tokens
+    assert "what" not in tokens and "is" not in tokens
+
+
+def test_exact_tokens_rank_first():
+    index = _index()
+
+    assert _ids(index, index.search("SSO", 3)) == ["tech_0"]
+    assert _ids(index, index.search("burn rate", 3))[0] == "fin_0"
+    assert index.search("kubernetes", 3) == []
+
+
+def test_department_scope():
+    index = _index()
+
+    assert _ids(index, index.search("enterprise", 5, ["FINANCE"])) == ["fin_1"]
+    assert sorted(_ids(index, index.search("enterprise", 5, ["TECH", "GROWTH"]))) == ["growth_0", "tech_0"]
+    assert _ids(index, index.search("office", 5, ["GENERAL"])) == ["general_0"]
+    assert index.search("enterprise", 5, []) == []
+    assert index.search("enterprise", 5, ["LEGAL"]) == []
+
+
+def test_scope_cache_follows_additions():
+    index = _index()
+    assert len(index.search("enterprise", 5, ["TECH", "GROWTH"])) == 2
+
+    index.add("tech_2", "Enterprise SSO rollout starts next week.", {"department": "TECH"})
+
+    assert "tech_2" in _ids(index, index.search("enterprise", 5, ["GROWTH", "TECH"]))
+    assert len(index) == len(RECORDS) + 1
+
+
+def test_intersect():
+    assert intersect([1, 3, 5, 7], [3, 4, 7]) == [1, 3]
+    assert intersect([1, 2], []) == []
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "d"]])
+
+    assert fused == ["b", "c", "a", "d"]
+    assert reciprocal_rank_fusion([]) == []
@@ -0,0 +1,142 @@
+import gzip
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("dspy")
+pytest.importorskip("dotenv")
+
+import tracing
+from cassette import Cassette, CassetteError, CassetteMiss
+
+
+class EchoLM:
+    """Inner model: answers "<model>: <last message>", or raises on "fail"."""
+
+    def __init__(self, model="openrouter/test-model"):
+        self.model = model
+        self.kwargs = {"temperature": 0.0}
+        self.calls = 0
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        self.calls += 1
+        content = messages[-1]["content"]
+        if content == "fail":
+            raise RuntimeError("upstream 503")
+        return SimpleNamespace(
+            model=self.model,
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"{self.model}: {content}"), finish_reason="stop")],
+            usage={"prompt_tokens": 3, "completion_tokens": 2},
+        )
+
+
+def _ask(lm, text, **kwargs):
+    return lm.forward(messages=[{"role": "user", "content": text}], **kwargs).choices[0].message.content
+
+
+def _record(path, *requests, phase="micro", department="FINANCE"):
+    cassette = Cassette(str(path), mode="record")
+    lm = cassette.wrap(EchoLM())
+    with tracing.scope(phase=phase, department=department):
+        for text in requests:
+            try:
+                _ask(lm, text)
+            except RuntimeError:
+                pass
+    cassette.close()
+    return cassette
+
+
+def _replay(path, **options):
+    inner = EchoLM()
+    return Cassette(str(path), mode="replay", speed="fast", **options).wrap(inner), inner
+
+
+def test_record_then_replay(tmp_path):
+    path = tmp_path / "run.cassette.gz"
+    assert _record(path, "burn rate?", "runway?").counts["recorded"] == 2
+
+    lm, inner = _replay(path)
+    with tracing.scope(phase="micro", department="FINANCE"):
+        assert _ask(lm, "runway?") == "openrouter/test-model: runway?"
+        assert _ask(lm, "burn rate?") == "openrouter/test-model: burn rate?"
+    assert inner.calls == 0
+    assert lm.cassette.stats()["replayed"] == 2
+
+
+def test_repeated_requests_replay_in_order(tmp_path):
+    path = tmp_path / "run.cassette.gz"
+    _record(path, "same", "same")
+
+    lm, _ = _replay(path)
+    _ask(lm, "same")
+    _ask(lm, "same")
+    with pytest.raises(CassetteMiss):
+        _ask(lm, "same")
+
+
+def test_recorded_errors_are_replayed(tmp_path):
+    path = tmp_path / "run.cassette.gz"
+    _record(path, "fail")
+
+    lm, inner = _replay(path)
+    with pytest.raises(CassetteError, match="RuntimeError: upstream 503"):
+        _ask(lm, "fail")
+    assert inner.calls == 0
+
+
+def test_miss_handling(tmp_path):
+    path = tmp_path / "run.cassette.gz"
+    _record(path, "original prompt")
+
+    lm, _ = _replay(path)
+    with pytest.raises(CassetteMiss):
+        _ask(lm, "changed prompt")
+
+    lm, inner = _replay(path, on_miss="live")
+    assert _ask(lm, "changed prompt") == "openrouter/test-model: changed prompt"
+    assert inner.calls == 1 and lm.cassette.stats()["live"] == 1
+
+    lm, inner = _replay(path, on_miss="nearest")
+    with tracing.scope(phase="micro", department="FINANCE"):
+        assert _ask(lm, "changed prompt") == "openrouter/test-model: original prompt"
+        with pytest.raises(CassetteMiss):
+            _ask(lm, "changed prompt")
+    assert inner.calls == 0 and lm.cassette.stats()["nearest"] == 1
+
+
+def test_live_phases_bypass_the_cassette(tmp_path):
+    path = tmp_path / "run.cassette.gz"
+    _record(path, "verdict?", phase="verdict", department=None)
+
+    lm, inner = _replay(path, live_phases=["verdict"])
+    with tracing.scope(phase="verdict"):
+        _ask(lm, "verdict?")
+    assert inner.calls == 1 and lm.cassette.stats()["live"] == 1
+
+
+def test_truncated_cassette_keeps_complete_calls(tmp_path):
+    path = tmp_path / "run.cassette.gz"
+    _record(path, "one", "two")
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("\n".join(lines[:2]) + "\n" + lines[2][:40])
+
+    lm, _ = _replay(path)
+    with tracing.scope(phase="micro", department="FINANCE"):
+        assert _ask(lm, "one") == "openrouter/test-model: one"
+        with pytest.raises(CassetteMiss):
+            _ask(lm, "two")
+
+
+def test_rejects_unknown_modes_and_versions(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "x.gz"), mode="append")
+
+    path = tmp_path / "old.cassette.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"cassette": 0}) + "\n")
+    with pytest.raises(ValueError):
+        Cassette(str(path))
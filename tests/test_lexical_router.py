@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("dspy")
+
+from lexical_router import LexicalPreRouter
+
+
+TRIVIAL = "hi"
+STRATEGIC = ("Should we pause the AWS migration and cut the hiring budget to extend runway, "
+             "given burn is up 20% and enterprise churn risk is rising?")
+MIDDLE = "Summarize last quarter's vendor contracts"
+
+
+def test_scores_stay_on_the_1_to_10_scale():
+    router = LexicalPreRouter()
+
+    assert router.score("") == 1.0
+    assert router.score(TRIVIAL) == 1.0
+    assert router.score(STRATEGIC) == 10.0
+    assert 1.0 < router.score(MIDDLE) < 10.0
+
+
+def test_confident_queries_are_routed_without_an_llm():
+    router = LexicalPreRouter()
+
+    fast, deep = router(TRIVIAL), router(STRATEGIC)
+
+    assert fast.route == "FAST_LANE" and fast.score < router.fast_below
+    assert deep.route == "DEEP_LANE" and deep.score > router.deep_above
+    assert "no LLM call" in deep.reasoning
+
+
+def test_uncertain_band_is_delegated():
+    router = LexicalPreRouter()
+    score = router.score(MIDDLE)
+
+    assert router.fast_below <= score <= router.deep_above
+    assert router(MIDDLE) is None
+
+
+def test_thresholds_are_exclusive_and_configurable():
+    score = LexicalPreRouter().score(MIDDLE)
+
+    assert LexicalPreRouter(fast_below=score, deep_above=9.0)(MIDDLE) is None
+    assert LexicalPreRouter(fast_below=score + 0.1, deep_above=9.0)(MIDDLE).route == "FAST_LANE"
+    assert LexicalPreRouter(fast_below=1.0, deep_above=score)(MIDDLE) is None
+    assert LexicalPreRouter(fast_below=1.0, deep_above=score - 0.1)(MIDDLE).route == "DEEP_LANE"
@@ -0,0 +1,91 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("dspy")
+pytest.importorskip("dotenv")
+
+import llm_executor
+from llm_executor import Backoff, submit_with_retry
+
+
+def _flaky(failures, calls):
+    """make_job whose first ``failures`` attempts raise."""
+    def make_job(attempt):
+        # Built (and queued) in the caller's run, also for retries from the timer thread.
+        run_id = llm_executor.current_run()
+
+        def job():
+            calls.append((attempt, run_id))
+            if attempt < failures:
+                raise RuntimeError(f"429 on attempt {attempt}")
+            return f"ok after {attempt}"
+        return job
+    return make_job
+
+
+def test_backoff_doubles():
+    policy = Backoff(max_retries=4, base_delay=0.5)
+
+    assert [policy.delay(n) for n in range(4)] == [0.5, 1.0, 2.0, 4.0]
+
+
+def test_retries_until_success_in_the_callers_run():
+    calls = []
+    with llm_executor.run_scope("retry-run"):
+        future = submit_with_retry(SimpleNamespace(model="test/retry"), _flaky(2, calls),
+                                   Backoff(max_retries=3, base_delay=0.01, verbose=False))
+
+    assert future.result(timeout=5) == "ok after 2"
+    assert calls == [(0, "retry-run"), (1, "retry-run"), (2, "retry-run")]
+
+
+def test_gives_up_after_max_retries():
+    calls = []
+    future = submit_with_retry(SimpleNamespace(model="test/retry"), _flaky(5, calls),
+                               Backoff(max_retries=3, base_delay=0.01, verbose=False))
+
+    with pytest.raises(Exception, match="Failed after 3 attempts: 429 on attempt 2"):
+        future.result(timeout=5)
+    assert [attempt for attempt, _ in calls] == [0, 1, 2]
+
+
+def test_backoff_does_not_hold_the_model_slot(monkeypatch):
+    executor = llm_executor.get_executor()
+    monkeypatch.setitem(executor.model_limits, "test/one-slot", 1)
+    lm = SimpleNamespace(model="test/one-slot")
+    calls = []
+
+    retrying = submit_with_retry(lm, _flaky(1, calls), Backoff(max_retries=2, base_delay=0.5, verbose=False))
+    while not calls:
+        time.sleep(0.01)
+    other = llm_executor.submit(lm, lambda: "other")
+
+    # The only slot is free while the first call waits out its backoff.
+    assert other.result(timeout=0.4) == "other"
+    assert not retrying.done()
+    assert retrying.result(timeout=5) == "ok after 1"
+    assert executor.stats()["in_flight_by_model"].get("test/one-slot") is None
+
+
+def test_executor_caps_concurrency_per_model(monkeypatch):
+    executor = llm_executor.get_executor()
+    monkeypatch.setitem(executor.model_limits, "test/capped", 2)
+    lm = SimpleNamespace(model="test/capped")
+    lock, running, peak = threading.Lock(), [0], [0]
+
+    def job():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    futures = [llm_executor.submit(lm, job) for _ in range(6)]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert peak[0] <= 2
@@ -0,0 +1,80 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("dspy")
+
+import stand_in_server
+from chunking import iter_chunks
+
+
+@pytest.fixture(scope="module")
+def quantized_index(sovereign_module):
+    return sovereign_module("quantized_index")
+
+
+@pytest.fixture(scope="module")
+def ollama_url():
+    server = stand_in_server.make_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _rows(count, dim=16, labels=None, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = [f"doc_{i}" for i in range(count)]
+    metadatas = [{"department": labels[i] if labels else "GENERAL"} for i in range(count)]
+    return ids, [f"text {i}" for i in range(count)], metadatas, rng.normal(size=(count, dim))
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary", "float32"])
+def test_search_finds_the_query_row(quantized_index, tmp_path, mode):
+    ids, documents, metadatas, embeddings = _rows(200)
+    index = quantized_index.QuantizedIndex.build(tmp_path, ids, documents, metadatas, embeddings, mode=mode)
+
+    rows, scores = index.search(embeddings[17], k=3)
+
+    assert rows[0] == 17
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+    assert list(scores) == sorted(scores, reverse=True)
+    assert index.record(17) == {"id": "doc_17", "document": "text 17", "metadata": {"department": "GENERAL"}}
+
+
+def test_more_than_256_departments(quantized_index, tmp_path):
+    labels = [f"DEPT_{i:03d}" for i in range(300)]
+    ids, documents, metadatas, embeddings = _rows(300, labels=labels)
+    index = quantized_index.QuantizedIndex.build(tmp_path, ids, documents, metadatas, embeddings)
+
+    assert index.departments.dtype == np.uint16
+    assert len(index.labels) == 300
+    rows, _ = index.search(embeddings[0], k=5, departments=["DEPT_299"])
+    assert rows.tolist() == [299]
+    assert index.record(int(rows[0]))["metadata"]["department"] == "DEPT_299"
+
+
+def test_empty_tree_builds_an_empty_index(quantized_index, tmp_path):
+    (tmp_path / "docs").mkdir()
+    assert list(iter_chunks(tmp_path / "docs")) == []
+
+    index = quantized_index.QuantizedIndex.build(tmp_path / "index", [], [], [], np.zeros((0, 0)))
+
+    assert index.count() == 0
+    rows, scores = index.search(np.ones(16), k=3)
+    assert len(rows) == 0 and len(scores) == 0
+
+
+def test_unknown_mode(quantized_index, tmp_path):
+    with pytest.raises(ValueError):
+        quantized_index.QuantizedIndex.build(tmp_path, *_rows(3), mode="int4")
+
+
+def test_embed_batches_through_api_embed(quantized_index, ollama_url):
+    texts = [f"chunk {i}" for i in range(5)]
+
+    vectors = quantized_index.embed(texts, model="nomic-embed-text", base_url=ollama_url, batch_size=2)
+
+    assert vectors.shape == (5, stand_in_server.EMBEDDING_DIM)
+    assert np.allclose(vectors[3], stand_in_server.embed("chunk 3"))
+    assert quantized_index.embed([], model="nomic-embed-text", base_url=ollama_url).size == 0
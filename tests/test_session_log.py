@@ -0,0 +1,66 @@
+import gzip
+import os
+
+import pytest
+
+from session_log import SessionLog, Transcript
+
+
+def _session(path, turns=1, **options):
+    with SessionLog(str(path), **options) as log:
+        for i in range(turns):
+            log.turn("Aria", "CFO", f"turn {i} " + "x" * 40)
+
+
+def test_turns_are_on_disk_before_close(tmp_path):
+    path = tmp_path / "logs" / "session.log"
+    log = SessionLog(str(path)).start()
+    log.turn("Aria", "CFO", "Cut cloud spend.", label="[L1G2] ")
+    log.turn("Bram", "CTO", "Not before the migration.")
+
+    text = path.read_text(encoding="utf-8")
+    log.close()
+
+    assert "SESSION START:" in text
+    assert "] [L1G2] Aria (CFO):\nCut cloud spend.\n" in text
+    assert "] Bram (CTO):\nNot before the migration.\n" in text
+
+
+def test_write_before_start_raises(tmp_path):
+    with pytest.raises(RuntimeError):
+        SessionLog(str(tmp_path / "session.log")).turn("Aria", "CFO", "too early")
+
+
+def test_rotation_compresses_and_keeps_backups(tmp_path):
+    path = tmp_path / "session.log"
+    for session in range(4):
+        _session(path, turns=3, max_bytes=100, backups=2)
+
+    assert sorted(os.listdir(tmp_path)) == ["session.log", "session.log.1.gz", "session.log.2.gz"]
+    with gzip.open(tmp_path / "session.log.1.gz", "rt", encoding="utf-8") as f:
+        assert f.read().count("Aria (CFO)") == 3
+
+
+def test_rotation_without_compression(tmp_path):
+    path = tmp_path / "session.log"
+    _session(path, turns=3, max_bytes=100, compress=False)
+    _session(path, turns=1, max_bytes=100, compress=False)
+
+    assert (tmp_path / "session.log.1").read_text(encoding="utf-8").count("Aria (CFO)") == 3
+    assert path.read_text(encoding="utf-8").count("Aria (CFO)") == 1
+
+
+def test_small_log_is_appended_to(tmp_path):
+    path = tmp_path / "session.log"
+    _session(path)
+    _session(path)
+
+    assert os.listdir(tmp_path) == ["session.log"]
+    assert path.read_text(encoding="utf-8").count("SESSION START:") == 2
+
+
+def test_transcript():
+    transcript = Transcript("TOPIC: runway\n")
+    transcript.append("[Aria (CFO)]: cut\n")
+
+    assert str(transcript) == transcript.text() == "TOPIC: runway\n[Aria (CFO)]: cut\n"
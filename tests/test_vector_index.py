@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("dspy")
+pytest.importorskip("dotenv")
+
+from vector_index import VectorIndex
+
+
+def _build(directory, count=120, dim=12, labels=("FINANCE", "TECH", "GROWTH"), dtype="float32"):
+    rng = np.random.default_rng(1)
+    embeddings = rng.normal(size=(count, dim))
+    metadatas = [{"department": labels[i % len(labels)]} for i in range(count)]
+    index = VectorIndex.build(directory, [f"doc_{i}" for i in range(count)], [f"text {i}" for i in range(count)],
+                              metadatas, embeddings, dtype=dtype)
+    return index, embeddings
+
+
+def _exact(embeddings, query, rows):
+    normalised = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    scores = normalised[rows] @ (query / np.linalg.norm(query))
+    return [rows[i] for i in np.argsort(-scores)]
+
+
+def test_search_matches_brute_force(tmp_path):
+    index, embeddings = _build(tmp_path)
+    queries = embeddings[[3, 50]] + 0.1
+
+    rows, scores = index.search(queries, k=5)
+
+    for qi, query in enumerate(queries):
+        assert rows[qi].tolist() == _exact(embeddings, query, list(range(len(embeddings))))[:5]
+        assert list(scores[qi]) == sorted(scores[qi], reverse=True)
+
+
+def test_department_filter(tmp_path):
+    index, embeddings = _build(tmp_path)
+    tech = [i for i in range(len(embeddings)) if i % 3 == 1]
+
+    rows, _ = index.search(embeddings[:1], k=4, departments=["TECH"])
+
+    assert rows[0].tolist() == _exact(embeddings, embeddings[0], tech)[:4]
+    assert index.search(embeddings[:1], k=4, departments=["LEGAL"])[0].shape == (1, 0)
+
+
+def test_query_is_chroma_shaped(tmp_path):
+    index, embeddings = _build(tmp_path, dtype="float16")
+
+    results = index.query(embeddings[7:8], n_results=2, departments=["TECH", "GROWTH"])
+
+    assert results["ids"][0][0] == "doc_7"
+    assert results["documents"][0][0] == "text 7"
+    assert results["metadatas"][0][0] == {"department": "TECH"}
+    assert results["distances"][0][0] == pytest.approx(0.0, abs=1e-3)
+
+
+def test_more_than_256_departments(tmp_path):
+    index, embeddings = _build(tmp_path, count=300, labels=[f"D{i}" for i in range(300)])
+
+    assert index.departments.dtype == np.uint16
+    assert index.search(embeddings[:1], k=3, departments=["D299"])[0].tolist() == [[299]]
+
+
+def test_empty_index(tmp_path):
+    index = VectorIndex.build(tmp_path, [], [], [], np.zeros((0, 12)))
+
+    assert index.count() == 0
+    assert index.query(np.ones((1, 12)), n_results=3)["ids"] == [[]]